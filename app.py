@@ -2,6 +2,7 @@ import streamlit as st
 import json
 import random
 import os
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -13,15 +14,19 @@ from modules.auth import (
     logout,
     log_user_activity
 )
-from modules.storage import save_assessment, get_user_assessments, load_assessment
+from modules.storage import get_user_assessments, load_assessment
 from modules.interactive_form import (
     render_interactive_assessment,
     save_assessment_json,
-    collect_scores_for_analysis
+    collect_scores_for_analysis,
+    get_session_analysis
 )
-from modules.score_analyzer import analyze_capabilities, create_priority_matrix
+from modules.kb_index import KnowledgeBaseIndex
+from modules.score_analyzer import analyze_capabilities
 from modules.report_generator import generate_strategic_report
-from modules.concurrent_generator import generate_report_concurrent
+from modules.prefetcher import SynthesisPrefetcher
+from modules.report_jobs import report_jobs, ACTIVE_STATUSES
+from modules.benchmarks import score_benchmarks
 from modules.export_handler import export_to_docx, export_to_markdown
 from grid_layout import GRID_LAYOUT
 
@@ -203,11 +208,12 @@ def init_test_mode():
 # Initialize test mode if URL parameter present
 init_test_mode()
 
-# Load knowledge base
-@st.cache_data
-def load_knowledge_base():
+# Load knowledge base, indexed once per process (cache_resource hands every
+# rerun the same immutable index instead of a fresh copy of the JSON)
+@st.cache_resource
+def load_knowledge_base() -> KnowledgeBaseIndex:
     with open("knowledge_base.json") as f:
-        return json.load(f)
+        return KnowledgeBaseIndex(json.load(f))
 
 kb = load_knowledge_base()
 
@@ -392,6 +398,8 @@ with st.sidebar:
                     st.session_state['interactive_scores'] = loaded['scores']
                     if 'report' in loaded:
                         st.session_state['report'] = loaded['report']
+                    # Regenerating reuses every section whose inputs are unchanged
+                    st.session_state['section_artifacts'] = loaded.get('sections', {})
                     st.toast(f"✅ Loaded assessment from {timestamp}", icon="📄")
                     st.rerun()
     else:
@@ -402,10 +410,8 @@ with st.sidebar:
     # Progress tracking
     st.subheader("Progress")
     if 'interactive_scores' in st.session_state and st.session_state.interactive_scores:
-        scores = st.session_state.interactive_scores
-        # Only count capabilities where BOTH I and R are > 0
-        completed = sum(1 for cap_id, data in scores.items()
-                       if data.get("importance", 0) > 0 and data.get("readiness", 0) > 0)
+        # Only count capabilities where BOTH I and R are > 0 (kept up to date per card)
+        completed = get_session_analysis(st.session_state.interactive_scores).scored
         total = 42
         st.progress(min(completed / total, 1.0))
         st.caption(f"{completed}/{total} capabilities scored")
@@ -444,16 +450,13 @@ Each capability card allows you to enter **I** (Importance) and **R** (Readiness
 # Render the interactive grid
 interactive_scores = render_interactive_assessment(kb)
 
-# Helper functions for zero handling
-def count_zero_capabilities(scores: dict) -> int:
-    """Count capabilities with 0 in either I or R."""
-    count = 0
-    for cap_id, data in scores.items():
-        if data.get("importance", 0) == 0 or data.get("readiness", 0) == 0:
-            count += 1
-    return count
-
+# Start urgent gap sections in the background while the user keeps scoring
+if config.PREFETCH_ENABLED:
+    if 'prefetcher' not in st.session_state:
+        st.session_state['prefetcher'] = SynthesisPrefetcher(kb)
+    st.session_state['prefetcher'].update(interactive_scores)
 
+# Helper function for zero handling
 def filter_valid_scores(scores: dict) -> dict:
     """Filter out capabilities where either I or R is 0."""
     return {
@@ -470,7 +473,7 @@ if st.button("🚀 Generate Strategic Report", type="primary", use_container_wid
         st.error("Please fill in at least some capability scores before generating a report.")
     else:
         # Check for zero values
-        zero_count = count_zero_capabilities(interactive_scores)
+        zero_count = get_session_analysis(interactive_scores).unscored
 
         if zero_count > 0:
             st.session_state['show_zero_warning'] = True
@@ -493,7 +496,8 @@ if st.session_state.get('show_zero_warning', False):
             st.session_state['confirm_generate'] = True
             st.rerun()
 
-# Actually generate report
+# Actually generate report - queued as a background job so a refresh or
+# disconnect does not throw away the LLM work
 if st.session_state.get('confirm_generate', False):
     st.session_state['confirm_generate'] = False
 
@@ -503,41 +507,75 @@ if st.session_state.get('confirm_generate', False):
     if len(valid_scores) == 0:
         st.error("No capabilities scored. Please fill in at least one capability with both I and R values > 0.")
     else:
-        with st.spinner("🔄 Generating report with parallel synthesis... This may take 30-60 seconds."):
-            # Convert to analysis format
-            scores_for_analysis = collect_scores_for_analysis(valid_scores)
-
-            # Log activity
-            log_user_activity(user, "generate_report", {"score_count": len(scores_for_analysis)})
-
-            # Generate report with concurrent synthesis
-            report_md = generate_report_concurrent(
-                scores=scores_for_analysis,
-                knowledge_base=kb,
-                user_name=user['name'],
-                max_workers=3
+        # Convert to analysis format
+        scores_for_analysis = collect_scores_for_analysis(valid_scores)
+
+        # Log activity
+        log_user_activity(user, "generate_report", {"score_count": len(scores_for_analysis)})
+
+        # Save all scores, not just valid ones
+        st.session_state['report_job_id'] = report_jobs.submit(
+            user,
+            scores_for_analysis,
+            interactive_scores,
+            kb,
+            section_artifacts=st.session_state.get('section_artifacts'),
+            prefetcher=st.session_state.get('prefetcher'),
+            on_done=lambda job: log_user_activity(
+                user, "report_complete" if job['status'] == "done" else "report_failed",
+                {"assessment_id": job['assessment_id'], "job_id": job['job_id']}
             )
-
-            # Analyze for priority matrix
-            analysis = analyze_capabilities(scores_for_analysis, kb)
-            priority_matrix = create_priority_matrix(analysis)
-
-            # Save to storage (save all scores, not just valid ones)
-            assessment_id = save_assessment(user, interactive_scores, report_md)
-
-            # Log completion
-            log_user_activity(user, "report_complete", {"assessment_id": assessment_id})
-
-            # Store in session state
-            st.session_state['report'] = report_md
-            st.session_state['analysis'] = analysis
-            st.session_state['priority_matrix'] = priority_matrix
-            st.session_state['assessment_id'] = assessment_id
-            st.session_state['customer_context'] = {"user": user['name'], "email": user['email']}
-
-        st.success(f"✅ Report generated and saved! (ID: {assessment_id})")
+        )
         st.rerun()
 
+# A new session picks up the user's running job, or one that finished recently
+if 'report_job_id' not in st.session_state:
+    latest_job = report_jobs.latest(user['email'])
+    resumable = latest_job and (
+        latest_job['status'] in ACTIVE_STATUSES
+        or time.time() - latest_job.get('finished_at', 0) < config.REPORT_JOB_RESUME_SECONDS
+    )
+    st.session_state['report_job_id'] = latest_job['job_id'] if resumable else None
+
+job_id = st.session_state.get('report_job_id')
+job = report_jobs.status(job_id) if job_id else None
+
+if job and job['status'] in ACTIVE_STATUSES:
+    st.subheader("📋 Your Report (live)")
+    if job['status'] == "queued":
+        st.info("⏳ Your report is queued and will start shortly. You can safely refresh this page.")
+    else:
+        st.caption("🔄 Streaming report sections as they are synthesized. You can safely refresh this page.")
+
+    shown_gap_header = False
+    for section_key, markdown in job['sections'].items():
+        if section_key == "executive_summary":
+            st.markdown("## 1. Executive Summary")
+        elif not shown_gap_header:
+            st.markdown("## 3. Urgent Gaps - Detailed Analysis")
+            shown_gap_header = True
+        st.markdown(markdown)
+
+    time.sleep(config.REPORT_JOB_POLL_SECONDS)
+    st.rerun()
+
+elif job and job['status'] == "done":
+    st.session_state['report_job_id'] = None
+    loaded = load_assessment(user['email'], job['assessment_id'])
+    if loaded and 'report' in loaded:
+        # Store in session state
+        st.session_state['report'] = loaded['report']
+        st.session_state['analysis'] = analyze_capabilities(job['scores'], kb)
+        st.session_state['priority_matrix'] = job['priority_matrix']
+        st.session_state['assessment_id'] = job['assessment_id']
+        st.session_state['section_artifacts'] = job['section_artifacts']
+        st.session_state['customer_context'] = {"user": user['name'], "email": user['email']}
+        st.success(f"✅ Report generated and saved! (ID: {job['assessment_id']})")
+
+elif job and job['status'] == "failed":
+    st.session_state['report_job_id'] = None
+    st.error(f"Report generation failed: {job['error']}. Please try again.")
+
 
 # ============================================================================
 # REPORT DISPLAY
@@ -563,6 +601,19 @@ if 'report' in st.session_state:
         else:
             st.info("Priority matrix data not available. Please generate a report first.")
 
+    # Where this user's readiness sits among every saved assessment
+    ranked = []
+    for cap in st.session_state.get('analysis', []):
+        percentile = score_benchmarks.percentile(cap['capability_id'], "readiness", cap['readiness'])
+        if percentile is not None:
+            ranked.append((percentile, cap))
+    if ranked:
+        with st.expander("📊 How You Compare", expanded=False):
+            st.caption("Readiness percentile among all saved assessments (lowest first)")
+            for percentile, cap in sorted(ranked, key=lambda item: item[0])[:10]:
+                st.markdown(f"- **{cap['capability_name']}**: readiness {cap['readiness']}/10 "
+                            f"is in the {percentile:.0f}th percentile")
+
     # Full Report
     st.markdown("""
     <style>
@@ -16,6 +16,44 @@ ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 CLAUDE_MODEL = os.getenv("CLAUDE_MODEL", "claude-opus-4-20250514")
 CLAUDE_MAX_TOKENS = int(os.getenv("CLAUDE_MAX_TOKENS", "2000"))
 
+# Claude backend - "anthropic" (the real API, or ANTHROPIC_BASE_URL if set) or
+# "fake" (in-process stand-in from modules.fake_claude for load/latency testing)
+CLAUDE_BACKEND = os.getenv("CLAUDE_BACKEND", "anthropic")
+ANTHROPIC_BASE_URL = os.getenv("ANTHROPIC_BASE_URL") or None
+
+# Fake Claude behaviour (CLAUDE_BACKEND=fake or python -m modules.fake_claude serve):
+# lognormal time to first token, then output streamed at a fixed token rate
+FAKE_CLAUDE_TTFT_MEDIAN = float(os.getenv("FAKE_CLAUDE_TTFT_MEDIAN", "0.8"))
+FAKE_CLAUDE_TTFT_SIGMA = float(os.getenv("FAKE_CLAUDE_TTFT_SIGMA", "0.5"))
+FAKE_CLAUDE_TOKENS_PER_SECOND = float(os.getenv("FAKE_CLAUDE_TOKENS_PER_SECOND", "60"))
+FAKE_CLAUDE_OUTPUT_TOKENS = int(os.getenv("FAKE_CLAUDE_OUTPUT_TOKENS", "400"))
+FAKE_CLAUDE_RATE_LIMIT_RATE = float(os.getenv("FAKE_CLAUDE_RATE_LIMIT_RATE", "0.0"))
+FAKE_CLAUDE_OVERLOAD_RATE = float(os.getenv("FAKE_CLAUDE_OVERLOAD_RATE", "0.0"))
+FAKE_CLAUDE_SEED = int(os.getenv("FAKE_CLAUDE_SEED")) if os.getenv("FAKE_CLAUDE_SEED") else None
+FAKE_CLAUDE_PORT = int(os.getenv("FAKE_CLAUDE_PORT", "8788"))
+
+# Async synthesis engine - adaptive (AIMD) limit on concurrent Claude requests per
+# process: grows while responses are healthy, shrinks on 429/529 or rising latency
+SYNTHESIS_MAX_IN_FLIGHT = int(os.getenv("SYNTHESIS_MAX_IN_FLIGHT", "64"))
+SYNTHESIS_MIN_IN_FLIGHT = int(os.getenv("SYNTHESIS_MIN_IN_FLIGHT", "2"))
+SYNTHESIS_INITIAL_IN_FLIGHT = int(os.getenv("SYNTHESIS_INITIAL_IN_FLIGHT", "8"))
+CONCURRENCY_DECREASE_FACTOR = float(os.getenv("CONCURRENCY_DECREASE_FACTOR", "0.5"))
+CONCURRENCY_LATENCY_TOLERANCE = float(os.getenv("CONCURRENCY_LATENCY_TOLERANCE", "3.0"))
+CONCURRENCY_DECREASE_COOLDOWN = float(os.getenv("CONCURRENCY_DECREASE_COOLDOWN", "2.0"))
+
+# Most urgent gaps detailed in a report (the rest are listed by name)
+MAX_URGENT_GAPS_IN_REPORT = int(os.getenv("MAX_URGENT_GAPS_IN_REPORT", "10"))
+
+# Speculative synthesis - start urgent_gap sections once a card has kept its
+# URGENT_GAP scores for the debounce period, while the user is still scoring
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "true").lower() == "true"
+PREFETCH_DEBOUNCE_SECONDS = float(os.getenv("PREFETCH_DEBOUNCE_SECONDS", "3.0"))
+PREFETCH_MAX_PENDING = int(os.getenv("PREFETCH_MAX_PENDING", str(MAX_URGENT_GAPS_IN_REPORT)))
+
+# Batched gap synthesis - pack up to N urgent gaps per request (0 or 1 disables)
+SYNTHESIS_BATCH_SIZE = int(os.getenv("SYNTHESIS_BATCH_SIZE", "0"))
+SYNTHESIS_BATCH_MAX_TOKENS = int(os.getenv("SYNTHESIS_BATCH_MAX_TOKENS", "16000"))
+
 # Validate in production
 if IS_PRODUCTION and not ANTHROPIC_API_KEY:
     raise ValueError("ANTHROPIC_API_KEY environment variable required in production")
@@ -35,11 +73,90 @@ USER_LOGS_DIR = os.path.join(STORAGE_BASE, "user_logs")
 Path(USER_DATA_DIR).mkdir(parents=True, exist_ok=True)
 Path(USER_LOGS_DIR).mkdir(parents=True, exist_ok=True)
 
+# Synthesis response cache (content-addressed, on the storage volume)
+SYNTHESIS_CACHE_ENABLED = os.getenv("SYNTHESIS_CACHE_ENABLED", "true").lower() == "true"
+SYNTHESIS_CACHE_DIR = os.path.join(STORAGE_BASE, "synthesis_cache")
+SYNTHESIS_CACHE_MAX_BYTES = int(os.getenv("SYNTHESIS_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+SYNTHESIS_CACHE_TTL_SECONDS = int(os.getenv("SYNTHESIS_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+# Cache hit/miss metadata is batched in memory and merged into the index
+# after this many lookups or seconds (and on every cache write)
+SYNTHESIS_CACHE_FLUSH_EVERY = int(os.getenv("SYNTHESIS_CACHE_FLUSH_EVERY", "50"))
+SYNTHESIS_CACHE_FLUSH_SECONDS = float(os.getenv("SYNTHESIS_CACHE_FLUSH_SECONDS", "30"))
+
+# Claude rate limits (0 disables a bucket) - set to the account's tier limits
+CLAUDE_REQUESTS_PER_MINUTE = int(os.getenv("CLAUDE_REQUESTS_PER_MINUTE", "1000"))
+CLAUDE_INPUT_TOKENS_PER_MINUTE = int(os.getenv("CLAUDE_INPUT_TOKENS_PER_MINUTE", "450000"))
+CLAUDE_OUTPUT_TOKENS_PER_MINUTE = int(os.getenv("CLAUDE_OUTPUT_TOKENS_PER_MINUTE", "90000"))
+RATE_LIMIT_STATE_PATH = os.path.join(STORAGE_BASE, "rate_limits", "claude.json")
+
+# Claude retries - decorrelated-jitter backoff honoring retry-after, capped per report
+CLAUDE_RETRY_MAX_ATTEMPTS = int(os.getenv("CLAUDE_RETRY_MAX_ATTEMPTS", "4"))
+CLAUDE_RETRY_BASE_DELAY = float(os.getenv("CLAUDE_RETRY_BASE_DELAY", "1.0"))
+CLAUDE_RETRY_MAX_DELAY = float(os.getenv("CLAUDE_RETRY_MAX_DELAY", "30.0"))
+REPORT_RETRY_BUDGET = int(os.getenv("REPORT_RETRY_BUDGET", "20"))
+
+# Claude circuit breaker - open after N consecutive outage failures (or slow calls),
+# serve template sections while open, probe again after the reset timeout
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_SLOW_CALL_SECONDS = float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "60"))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+
+# Report deadline - sections still running after this many seconds render from
+# the KB template (0 disables)
+REPORT_DEADLINE_SECONDS = float(os.getenv("REPORT_DEADLINE_SECONDS", "90"))
+
+# Hedged requests - duplicate a call still running past the observed latency
+# percentile; the first response wins (hedges draw from the report retry budget)
+HEDGING_ENABLED = os.getenv("HEDGING_ENABLED", "true").lower() == "true"
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0.95"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+LATENCY_WINDOW = int(os.getenv("LATENCY_WINDOW", "200"))
+
+# Prompt caching - mark the static synthesis prefix with cache_control breakpoints
+PROMPT_CACHING_ENABLED = os.getenv("PROMPT_CACHING_ENABLED", "true").lower() == "true"
+USAGE_STATE_PATH = os.path.join(STORAGE_BASE, "usage", "claude.json")
+# Usage totals are accumulated in memory and written after this many calls or
+# seconds, and with every saved report
+USAGE_FLUSH_EVERY = int(os.getenv("USAGE_FLUSH_EVERY", "20"))
+USAGE_FLUSH_SECONDS = float(os.getenv("USAGE_FLUSH_SECONDS", "30"))
+
+# Claude pricing (USD per million tokens) for usage cost estimates
+CLAUDE_PRICE_INPUT_PER_MTOK = float(os.getenv("CLAUDE_PRICE_INPUT_PER_MTOK", "15.0"))
+CLAUDE_PRICE_OUTPUT_PER_MTOK = float(os.getenv("CLAUDE_PRICE_OUTPUT_PER_MTOK", "75.0"))
+CLAUDE_PRICE_CACHE_WRITE_PER_MTOK = float(os.getenv("CLAUDE_PRICE_CACHE_WRITE_PER_MTOK", "18.75"))
+CLAUDE_PRICE_CACHE_READ_PER_MTOK = float(os.getenv("CLAUDE_PRICE_CACHE_READ_PER_MTOK", "1.50"))
+
+# Report jobs - generation runs on a worker pool outside the Streamlit script
+# run; job state lives on the volume so a reconnecting session can resume it
+REPORT_JOBS_DIR = os.path.join(STORAGE_BASE, "report_jobs")
+REPORT_JOB_WORKERS = int(os.getenv("REPORT_JOB_WORKERS", "4"))
+REPORT_JOB_POLL_SECONDS = float(os.getenv("REPORT_JOB_POLL_SECONDS", "1.0"))
+REPORT_JOB_PROGRESS_INTERVAL = float(os.getenv("REPORT_JOB_PROGRESS_INTERVAL", "0.5"))
+REPORT_JOB_STALE_SECONDS = float(os.getenv("REPORT_JOB_STALE_SECONDS", "600"))
+# Owners refresh their active jobs' heartbeat this often (keep well below the stale limit)
+REPORT_JOB_HEARTBEAT_SECONDS = float(os.getenv("REPORT_JOB_HEARTBEAT_SECONDS", "30"))
+# Job files are deleted this long after their last update
+REPORT_JOB_RETENTION_SECONDS = float(os.getenv("REPORT_JOB_RETENTION_SECONDS", str(7 * 24 * 3600)))
+REPORT_JOB_RESUME_SECONDS = float(os.getenv("REPORT_JOB_RESUME_SECONDS", "3600"))
+
+# Benchmarks - per-capability score statistics across all saved assessments,
+# updated on save; percentiles are shown once a capability has enough scores
+BENCHMARKS_STATE_PATH = os.path.join(STORAGE_BASE, "benchmarks", "scores.json")
+BENCHMARK_MIN_SAMPLES = int(os.getenv("BENCHMARK_MIN_SAMPLES", "5"))
+
+# Analytics export - Parquet dataset of every stored assessment, appended to
+# incrementally; part files are merged once there are more than MAX_PARTS
+ANALYTICS_EXPORT_DIR = os.path.join(STORAGE_BASE, "analytics", "assessments")
+ANALYTICS_EXPORT_MAX_PARTS = int(os.getenv("ANALYTICS_EXPORT_MAX_PARTS", "20"))
+
 # File Paths
 BASE_DIR = Path(__file__).parent
 KNOWLEDGE_BASE_PATH = BASE_DIR / "knowledge_base.json"
 TEMPLATE_DIR = BASE_DIR / "templates"
 
+# Precomputed gap/strength syntheses (build: python -m modules.synthesis_library)
+SYNTHESIS_LIBRARY_PATH = os.getenv("SYNTHESIS_LIBRARY_PATH", str(BASE_DIR / "synthesis_library.json"))
+
 # Analysis Thresholds
 IMPORTANCE_HIGH_THRESHOLD = 7
 IMPORTANCE_LOW_THRESHOLD = 3
@@ -47,5 +164,10 @@ READINESS_HIGH_THRESHOLD = 7
 READINESS_LOW_THRESHOLD = 4
 
 # Report Configuration
-MAX_REPORT_LENGTH = 12000
+# Output-token budget shared by a report's synthesized sections (see modules.token_budget)
+MAX_REPORT_LENGTH = int(os.getenv("MAX_REPORT_LENGTH", "12000"))
+TOKEN_BUDGET_MIN_SECTION = int(os.getenv("TOKEN_BUDGET_MIN_SECTION", "250"))
+TOKEN_BUDGET_PERCENTILE = float(os.getenv("TOKEN_BUDGET_PERCENTILE", "0.9"))
+TOKEN_BUDGET_HEADROOM = float(os.getenv("TOKEN_BUDGET_HEADROOM", "1.25"))
+TOKEN_BUDGET_MIN_SAMPLES = int(os.getenv("TOKEN_BUDGET_MIN_SAMPLES", "10"))
 INCLUDE_TECHNICAL_DETAILS = True
@@ -0,0 +1,276 @@
+# modules/assessment_export.py
+import argparse
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+
+import config
+from modules import storage
+from modules.assessment_scores import CAPABILITY_ORDER, MAX_SCORE
+from modules.file_lock import locked_file, read_json, write_json_atomic
+
+EXPORT_FORMAT_VERSION = 2
+# A save's scores file is on disk moments after it takes its (timestamped)
+# id, so ids older than this can no longer appear behind the export's mark
+SETTLE_SECONDS = 60
+METADATA_COLUMNS = {
+    "assessment_id": "string",
+    "user_key": "string",
+    "user_email": "string",
+    "user_name": "string",
+    "timestamp": "datetime64[us]",
+    "capabilities_scored": "int16",
+    "report_cost_usd": "float64",
+}
+
+
+def score_columns() -> Dict[str, str]:
+    """One nullable column per capability per dimension, in CAPABILITY_ORDER."""
+    return {
+        f"{cap_id}_{dimension}": "UInt8"
+        for cap_id in CAPABILITY_ORDER
+        for dimension in ("importance", "readiness")
+    }
+
+
+def export_schema() -> Dict[str, str]:
+    return {**METADATA_COLUMNS, **score_columns()}
+
+
+def schema_fingerprint() -> str:
+    """Changes whenever the columns do; a new schema re-exports from scratch."""
+    payload = f"{EXPORT_FORMAT_VERSION}:{','.join(f'{k}={v}' for k, v in export_schema().items())}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _score(value):
+    """A 0-10 integer score, or None (null) for anything the column cannot hold."""
+    return value if type(value) is int and 0 <= value <= MAX_SCORE else None
+
+
+def _settled_through() -> str:
+    """Assessment id prefix at or below which every save is already on disk."""
+    return (datetime.now() - timedelta(seconds=SETTLE_SECONDS)).strftime("%Y%m%d_%H%M%S")
+
+
+def assessment_row(user_key: str, data: dict, usage: dict = None) -> dict:
+    """
+    One stored assessment as a dataset row. Unscored capabilities, and
+    values that are not 0-10 integers (old dict-format files), are null.
+    """
+    scores = data.get("scores", {})
+    cost = (usage or {}).get("totals", {}).get("cost_usd")
+    row = {
+        "assessment_id": data.get("assessment_id"),
+        "user_key": user_key,
+        "user_email": data.get("user", {}).get("email"),
+        "user_name": data.get("user", {}).get("name"),
+        "timestamp": data.get("timestamp"),
+        "capabilities_scored": 0,
+        "report_cost_usd": cost if type(cost) in (int, float) else None,
+    }
+    for cap_id in CAPABILITY_ORDER:
+        cap_scores = scores.get(cap_id)
+        if not isinstance(cap_scores, dict):
+            cap_scores = {}
+        importance = row[f"{cap_id}_importance"] = _score(cap_scores.get("importance"))
+        readiness = row[f"{cap_id}_readiness"] = _score(cap_scores.get("readiness"))
+        if importance and readiness:
+            row["capabilities_scored"] += 1
+    return row
+
+
+def to_frame(rows: List[dict]) -> pd.DataFrame:
+    """Rows as a DataFrame with the fixed export dtypes, so every part file shares one schema."""
+    schema = export_schema()
+    frame = pd.DataFrame(rows, columns=list(schema))
+    frame["timestamp"] = pd.to_datetime(frame["timestamp"], format="ISO8601", errors="coerce")
+    return frame.astype(schema)
+
+
+def capability_means(frame: pd.DataFrame) -> List[dict]:
+    """Per-capability count and mean importance/readiness over scored (non-zero) cells."""
+    rows = []
+    for cap_id in CAPABILITY_ORDER:
+        importance = frame[f"{cap_id}_importance"]
+        readiness = frame[f"{cap_id}_readiness"]
+        scored = (importance > 0) & (readiness > 0)
+        count = int(scored.sum())
+        rows.append({
+            "capability": cap_id,
+            "assessments": count,
+            "importance": round(float(importance[scored].mean()), 1) if count else None,
+            "readiness": round(float(readiness[scored].mean()), 1) if count else None,
+        })
+    return rows
+
+
+class AssessmentExporter:
+    """
+    Columnar (Parquet) dataset of every stored assessment, for admin
+    analytics and offline notebooks.
+
+    One row per assessment: metadata plus an importance and a readiness
+    column per capability. Each run() lists scores_*.json names under the
+    storage directory and parses only those not exported yet, appending
+    them as a new part file. The manifest lists the parts and, per user
+    directory, a high-water mark: assessment ids sort by save time, so
+    everything at or below the mark is exported, and only ids saved within
+    the last SETTLE_SECONDS are listed individually. Parts are merged once
+    there are more than max_parts, and a schema change (e.g. new
+    capabilities) re-exports everything.
+    load() reads the whole dataset in one call.
+    """
+
+    def __init__(self, export_dir: str, max_parts: int = None):
+        self.export_dir = Path(export_dir)
+        self.max_parts = config.ANALYTICS_EXPORT_MAX_PARTS if max_parts is None else max_parts
+        self._lock = threading.Lock()
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.export_dir / "manifest.json"
+
+    @property
+    def lock_path(self) -> Path:
+        return self.export_dir / ".export.lock"
+
+    def _manifest(self) -> dict:
+        manifest = read_json(self.manifest_path, default=None)
+        if not isinstance(manifest, dict) or manifest.get("schema") != schema_fingerprint():
+            return {"schema": schema_fingerprint(), "exported": {}, "parts": [], "rows": 0}
+        return manifest
+
+    def _write_part(self, frame: pd.DataFrame, manifest: dict) -> str:
+        name = f"part-{manifest.get('next_part', 0):05d}.parquet"
+        manifest["next_part"] = manifest.get("next_part", 0) + 1
+        path = self.export_dir / name
+        temp_file = self.export_dir / f".{name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            frame.to_parquet(temp_file, index=False)
+            # Atomic rename - readers never see a partial part
+            os.replace(temp_file, path)
+        except Exception as e:
+            if temp_file.exists():
+                temp_file.unlink()
+            raise e
+        return name
+
+    def _new_assessments(self, exported: dict) -> List[tuple]:
+        """(user_key, assessment_id, scores file) for every assessment not exported yet."""
+        found = []
+        storage_dir = Path(storage.STORAGE_DIR)
+        if not storage_dir.exists():
+            return found
+        for user_dir in sorted(storage_dir.iterdir()):
+            if not user_dir.is_dir():
+                continue
+            mark = exported.get(user_dir.name, {})
+            through, recent = mark.get("through", ""), set(mark.get("recent", []))
+            for scores_file in sorted(user_dir.glob("scores_*.json")):
+                assessment_id = scores_file.stem[len("scores_"):]
+                if assessment_id > through and assessment_id not in recent:
+                    found.append((user_dir.name, assessment_id, scores_file))
+        return found
+
+    def run(self) -> Dict:
+        """Append assessments saved since the last run; returns counts."""
+        started = time.time()
+        with self._lock, locked_file(self.lock_path):
+            manifest = self._manifest()
+            through = _settled_through()
+
+            rows, added, skipped = [], {}, set()
+            for user_key, assessment_id, scores_file in self._new_assessments(manifest["exported"]):
+                try:
+                    data = storage.read_scores_file(scores_file)
+                except (OSError, ValueError) as e:
+                    # A file being written or damaged is picked up on a later run
+                    print(f"Skipping {scores_file} in export: {e}")
+                    skipped.add(user_key)
+                    continue
+                usage = read_json(scores_file.with_name(f"usage_{assessment_id}.json"), default=None)
+                rows.append(assessment_row(user_key, data, usage))
+                added.setdefault(user_key, []).append(assessment_id)
+
+            if rows:
+                manifest["parts"].append(self._write_part(to_frame(rows), manifest))
+                manifest["rows"] += len(rows)
+                for user_key, assessment_ids in added.items():
+                    mark = manifest["exported"].setdefault(user_key, {"through": "", "recent": []})
+                    # Never move the mark past a file still to be retried
+                    if user_key not in skipped:
+                        mark["through"] = max(mark["through"], through)
+                    mark["recent"] = sorted(
+                        assessment_id for assessment_id in mark["recent"] + assessment_ids
+                        if assessment_id > mark["through"]
+                    )
+
+            compacted = False
+            if len(manifest["parts"]) > self.max_parts:
+                merged = self._read_parts(manifest["parts"])
+                manifest["parts"] = [self._write_part(merged, manifest)]
+                compacted = True
+
+            if rows or compacted or not self.manifest_path.exists():
+                manifest["updated_at"] = time.time()
+                write_json_atomic(self.manifest_path, manifest)
+            self._remove_stray_parts(manifest["parts"])
+
+        return {
+            "added": len(rows),
+            "rows": manifest["rows"],
+            "parts": len(manifest["parts"]),
+            "seconds": round(time.time() - started, 3),
+        }
+
+    def _read_parts(self, parts: List[str]) -> pd.DataFrame:
+        if not parts:
+            return to_frame([])
+        return pd.concat([pd.read_parquet(self.export_dir / name) for name in parts], ignore_index=True)
+
+    def _remove_stray_parts(self, parts: List[str]):
+        """Delete parts no longer in the manifest (merged, or from an interrupted run)."""
+        for path in self.export_dir.glob("part-*.parquet"):
+            if path.name not in parts:
+                path.unlink()
+
+    def load(self) -> pd.DataFrame:
+        """Every exported assessment as one DataFrame."""
+        manifest = read_json(self.manifest_path, default=None) or {}
+        if manifest.get("schema") != schema_fingerprint():
+            return to_frame([])
+        return self._read_parts(manifest.get("parts", []))
+
+    def snapshot(self) -> Dict:
+        manifest = read_json(self.manifest_path, default=None) or {}
+        return {
+            "rows": manifest.get("rows", 0),
+            "parts": len(manifest.get("parts", [])),
+            "updated_at": manifest.get("updated_at"),
+        }
+
+
+# Process-wide exporter for the admin page
+assessment_exporter = AssessmentExporter(config.ANALYTICS_EXPORT_DIR)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append new assessments to the Parquet analytics export.")
+    parser.add_argument("--output", default=str(config.ANALYTICS_EXPORT_DIR),
+                        help="Export directory (default: ANALYTICS_EXPORT_DIR)")
+    args = parser.parse_args()
+
+    result = AssessmentExporter(args.output).run()
+    print(f"Exported {result['added']} new assessments to {args.output} "
+          f"({result['rows']} rows in {result['parts']} parts, {result['seconds']}s)")
+
+
+if __name__ == "__main__":
+    main()
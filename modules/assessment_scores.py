@@ -0,0 +1,120 @@
+# modules/assessment_scores.py
+import base64
+from array import array
+from typing import Dict, Iterator, Optional, Tuple
+
+from grid_layout import get_all_capabilities
+
+# Fixed capability order: the assessment grid, row by row
+CAPABILITY_ORDER = tuple(cap["id"] for cap in get_all_capabilities())
+CAPABILITY_INDEX = {cap_id: position for position, cap_id in enumerate(CAPABILITY_ORDER)}
+CAPABILITY_PHASES = {cap["id"]: cap["phase_id"] for cap in get_all_capabilities()}
+
+SCORES_ENCODING = "assessment-scores-v1"
+ABSENT = 0xFF  # capability not in the scores dict (distinct from 0, "not scored")
+MAX_SCORE = 10
+ENCODED_BYTES = 2 * len(CAPABILITY_ORDER)
+
+
+class AssessmentScores:
+    """
+    One assessment's form scores as a fixed-order uint8 array.
+
+    values holds every capability's importance in CAPABILITY_ORDER, then
+    every readiness - 2 bytes per capability (84 for the 42-card grid)
+    instead of a dict of dicts. phase_id is implied by the grid, so
+    conversion to and from the form-scores dict ({cap_id: {"importance",
+    "readiness", "phase_id"}}) is loss-free; from_dict raises ValueError
+    for anything the array cannot represent exactly.
+    """
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: Optional[array] = None):
+        if values is None:
+            values = array("B", [ABSENT]) * ENCODED_BYTES
+        if len(values) != ENCODED_BYTES:
+            raise ValueError(f"Expected {ENCODED_BYTES} score bytes, got {len(values)}")
+        self.values = values
+
+    @classmethod
+    def from_dict(cls, scores: Dict[str, Dict]) -> "AssessmentScores":
+        compact = cls()
+        for cap_id, data in scores.items():
+            if cap_id not in CAPABILITY_INDEX:
+                raise ValueError(f"Unknown capability: {cap_id}")
+            if not isinstance(data, dict) or set(data) != {"importance", "readiness", "phase_id"}:
+                raise ValueError(f"Scores for {cap_id} are not importance/readiness/phase_id")
+            if data["phase_id"] != CAPABILITY_PHASES[cap_id]:
+                raise ValueError(f"{cap_id} is not in phase {data['phase_id']}")
+            compact.set(cap_id, data["importance"], data["readiness"])
+        return compact
+
+    def to_dict(self) -> Dict[str, Dict]:
+        return {
+            cap_id: {"importance": importance, "readiness": readiness, "phase_id": CAPABILITY_PHASES[cap_id]}
+            for cap_id, (importance, readiness) in self.items()
+        }
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "AssessmentScores":
+        compact = cls(array("B", data))
+        values, count = compact.values, len(CAPABILITY_ORDER)
+        if any(value > MAX_SCORE and value != ABSENT for value in values):
+            raise ValueError("Score bytes out of range")
+        if any((values[i] == ABSENT) != (values[i + count] == ABSENT) for i in range(count)):
+            raise ValueError("Score bytes have importance without readiness")
+        return compact
+
+    def to_bytes(self) -> bytes:
+        return self.values.tobytes()
+
+    @classmethod
+    def decode(cls, text: str) -> "AssessmentScores":
+        """Inverse of encode()."""
+        return cls.from_bytes(base64.b64decode(text, validate=True))
+
+    def encode(self) -> str:
+        """Base64 of to_bytes(), for JSON files."""
+        return base64.b64encode(self.to_bytes()).decode("ascii")
+
+    def get(self, cap_id: str) -> Optional[Tuple[int, int]]:
+        """(importance, readiness), or None if the capability is absent."""
+        position = CAPABILITY_INDEX[cap_id]
+        importance = self.values[position]
+        if importance == ABSENT:
+            return None
+        return importance, self.values[position + len(CAPABILITY_ORDER)]
+
+    def set(self, cap_id: str, importance: int, readiness: int):
+        for score in (importance, readiness):
+            if type(score) is not int or not 0 <= score <= MAX_SCORE:
+                raise ValueError(f"Scores must be integers 0-{MAX_SCORE}, got {score!r} for {cap_id}")
+        position = CAPABILITY_INDEX[cap_id]
+        self.values[position] = importance
+        self.values[position + len(CAPABILITY_ORDER)] = readiness
+
+    def discard(self, cap_id: str):
+        position = CAPABILITY_INDEX[cap_id]
+        self.values[position] = self.values[position + len(CAPABILITY_ORDER)] = ABSENT
+
+    def items(self) -> Iterator[Tuple[str, Tuple[int, int]]]:
+        count = len(CAPABILITY_ORDER)
+        for position, cap_id in enumerate(CAPABILITY_ORDER):
+            if self.values[position] != ABSENT:
+                yield cap_id, (self.values[position], self.values[position + count])
+
+    def __iter__(self) -> Iterator[str]:
+        return (cap_id for cap_id, _ in self.items())
+
+    def __contains__(self, cap_id: str) -> bool:
+        return cap_id in CAPABILITY_INDEX and self.values[CAPABILITY_INDEX[cap_id]] != ABSENT
+
+    def __len__(self) -> int:
+        return len(CAPABILITY_ORDER) - self.values[:len(CAPABILITY_ORDER)].count(ABSENT)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, AssessmentScores) and self.values == other.values
+
+    def __repr__(self) -> str:
+        return f"AssessmentScores({len(self)} capabilities)"
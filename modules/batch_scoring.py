@@ -0,0 +1,132 @@
+# modules/batch_scoring.py
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import config
+from modules.assessment_scores import ABSENT, CAPABILITY_ORDER, AssessmentScores
+from modules.score_analyzer import TIMELINE_MAPPING, calculate_gap_score, categorize_priority
+
+# Category codes index CATEGORIES; timeline indices index TIMELINES (the
+# TIMELINE_MAPPING entry for each category, in the same order)
+CATEGORIES = tuple(TIMELINE_MAPPING)
+TIMELINES = tuple(TIMELINE_MAPPING[category] for category in CATEGORIES)
+SCORE_LEVELS = 11  # scores are 0-10, 0 meaning not scored
+
+
+@lru_cache(maxsize=4)
+def _lookup_tables(thresholds: Tuple[int, int, int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    category = np.empty((SCORE_LEVELS, SCORE_LEVELS), dtype=np.int8)
+    gap_score = np.empty((SCORE_LEVELS, SCORE_LEVELS), dtype=np.int8)
+    for importance in range(SCORE_LEVELS):
+        for readiness in range(SCORE_LEVELS):
+            category[importance, readiness] = CATEGORIES.index(categorize_priority(importance, readiness))
+            gap_score[importance, readiness] = calculate_gap_score(importance, readiness)
+    timeline = np.array([CATEGORIES.index(name) for name in TIMELINE_MAPPING], dtype=np.int8)
+    for table in (category, gap_score, timeline):
+        table.setflags(write=False)
+    return category, gap_score, timeline
+
+
+def lookup_tables() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (category, gap_score, timeline) lookup tables.
+
+    category and gap_score are 11x11, indexed [importance, readiness], and
+    are built from categorize_priority and calculate_gap_score themselves,
+    so batch results match the scalar functions exactly. timeline maps a
+    category code to its TIMELINES index. Rebuilt if the thresholds change.
+    """
+    return _lookup_tables((
+        config.IMPORTANCE_LOW_THRESHOLD,
+        config.IMPORTANCE_HIGH_THRESHOLD,
+        config.READINESS_LOW_THRESHOLD
+    ))
+
+
+def score_batch(importance, readiness) -> Dict[str, np.ndarray]:
+    """
+    Score N assessments x C capabilities at once.
+
+    Args:
+        importance: N x C integer array (any shape works) of scores 0-10
+        readiness: Array of the same shape
+
+    Returns:
+        Dict of arrays shaped like the input: "category" (CATEGORIES code),
+        "gap_score" and "timeline" (TIMELINES index)
+    """
+    importance = np.asarray(importance)
+    readiness = np.asarray(readiness)
+    if importance.shape != readiness.shape:
+        raise ValueError(f"importance {importance.shape} and readiness {readiness.shape} differ in shape")
+    for name, scores in (("importance", importance), ("readiness", readiness)):
+        if scores.size and not np.issubdtype(scores.dtype, np.integer):
+            raise ValueError(f"{name} scores must be integers, got {scores.dtype}")
+        if scores.size and (scores.min() < 0 or scores.max() >= SCORE_LEVELS):
+            raise ValueError(f"{name} scores must be between 0 and {SCORE_LEVELS - 1}")
+
+    category_table, gap_table, timeline_table = lookup_tables()
+    # One flat index gathers from both tables
+    cells = importance.astype(np.intp) * SCORE_LEVELS + readiness
+    category = category_table.ravel().take(cells)
+    return {
+        "category": category,
+        "gap_score": gap_table.ravel().take(cells),
+        "timeline": timeline_table.take(category),
+    }
+
+
+def assessment_matrix(
+    assessments: Sequence[Dict[str, Dict]],
+    capability_ids: Optional[List[str]] = None
+) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """
+    Stack stored form scores ({cap_id: {"importance", "readiness"}}, as saved
+    by save_assessment) into N x C importance and readiness matrices.
+
+    Capabilities an assessment did not score are 0. Columns follow
+    capability_ids (default: every capability seen, in first-seen order).
+    """
+    if capability_ids is None:
+        capability_ids = list(dict.fromkeys(cap_id for scores in assessments for cap_id in scores))
+    columns = {cap_id: column for column, cap_id in enumerate(capability_ids)}
+
+    importance = np.zeros((len(assessments), len(capability_ids)), dtype=np.int8)
+    readiness = np.zeros_like(importance)
+    for row, scores in enumerate(assessments):
+        for cap_id, data in scores.items():
+            column = columns.get(cap_id)
+            if column is not None:
+                importance[row, column] = data.get("importance", 0)
+                readiness[row, column] = data.get("readiness", 0)
+    return importance, readiness, capability_ids
+
+
+def stack_scores(assessments: Sequence[AssessmentScores]) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """
+    assessment_matrix for AssessmentScores: N x C importance and readiness
+    straight from the packed bytes, columns in CAPABILITY_ORDER.
+    """
+    packed = np.frombuffer(b"".join(scores.to_bytes() for scores in assessments), dtype=np.uint8)
+    packed = packed.reshape(len(assessments), 2, len(CAPABILITY_ORDER))
+    # Absent capabilities count as not scored
+    packed = np.where(packed == ABSENT, 0, packed).astype(np.int8)
+    return packed[:, 0], packed[:, 1], list(CAPABILITY_ORDER)
+
+
+def category_counts(category: np.ndarray, scored: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    N x len(CATEGORIES) counts per assessment (the batch create_priority_matrix).
+
+    scored, if given, is a boolean mask of cells to count - typically
+    (importance > 0) & (readiness > 0), matching the app's zero filter.
+    """
+    rows = category.reshape(-1, category.shape[-1])
+    # Offset each row's codes so one bincount counts every row at once
+    codes = rows.astype(np.intp) + np.arange(rows.shape[0])[:, np.newaxis] * len(CATEGORIES)
+    if scored is not None:
+        codes = codes[scored.reshape(rows.shape)]
+    counts = np.bincount(codes.ravel(), minlength=rows.shape[0] * len(CATEGORIES))
+    return counts.reshape(category.shape[:-1] + (len(CATEGORIES),))
@@ -0,0 +1,117 @@
+# modules/benchmarks.py
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import config
+from modules.file_lock import locked_file, read_json, write_json_atomic
+
+DIMENSIONS = ("importance", "readiness")
+SCORE_LEVELS = 11  # scores are 0-10; 0 means not scored and is not counted
+
+
+def _empty_stat() -> Dict:
+    return {"count": 0, "mean": 0.0, "m2": 0.0, "histogram": [0] * SCORE_LEVELS}
+
+
+def _add_score(stat: Dict, score: int):
+    """Welford update of count/mean/m2, plus the score's histogram bin."""
+    stat["count"] += 1
+    delta = score - stat["mean"]
+    stat["mean"] += delta / stat["count"]
+    stat["m2"] += delta * (score - stat["mean"])
+    stat["histogram"][score] += 1
+
+
+def percentile_rank(stat: Dict, score: int) -> float:
+    """
+    Share of stored scores below score, counting ties as half (0-100).
+
+    Scores are integers 0-10, so the 11-bin histogram is exact - no
+    t-digest approximation needed.
+    """
+    histogram = stat["histogram"]
+    below = sum(histogram[:score])
+    return 100.0 * (below + 0.5 * histogram[score]) / stat["count"]
+
+
+class BenchmarkStore:
+    """
+    Cross-user score statistics per capability.
+
+    save_assessment adds each stored assessment to a per-capability running
+    count, mean and variance (Welford) and a fixed-bin histogram, under the
+    file lock on the storage volume - nothing rescans USER_DATA_DIR.
+    Lookups read the state file only when it has changed since the last
+    read, so a percentile is a dict lookup plus an 11-bin sum.
+    """
+
+    def __init__(self, state_path: str, min_samples: int = None):
+        self.state_path = Path(state_path)
+        self.min_samples = config.BENCHMARK_MIN_SAMPLES if min_samples is None else min_samples
+        self._cache_lock = threading.Lock()
+        self._cached = (None, None)  # (file signature, state)
+
+    @property
+    def lock_path(self) -> Path:
+        return self.state_path.parent / f".{self.state_path.name}.lock"
+
+    def record(self, scores: Dict[str, Dict]):
+        """Add one assessment's form scores ({cap_id: {"importance", "readiness"}})."""
+        try:
+            with locked_file(self.lock_path):
+                state = read_json(self.state_path, default=None)
+                if not isinstance(state, dict):
+                    state = {"assessments": 0, "capabilities": {}}
+                state["assessments"] += 1
+                for cap_id, data in scores.items():
+                    if not isinstance(data, dict):
+                        continue
+                    for dimension in DIMENSIONS:
+                        score = data.get(dimension, 0)
+                        if isinstance(score, int) and 0 < score < SCORE_LEVELS:
+                            capability = state["capabilities"].setdefault(cap_id, {})
+                            _add_score(capability.setdefault(dimension, _empty_stat()), score)
+                state["updated_at"] = time.time()
+                write_json_atomic(self.state_path, state)
+        except OSError as e:
+            # Benchmarks are best-effort - never fail a save over them
+            print(f"Benchmark update failed: {e}")
+
+    def _state(self) -> Dict:
+        try:
+            stat = self.state_path.stat()
+            signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return {}
+        with self._cache_lock:
+            if self._cached[0] == signature:
+                return self._cached[1]
+        state = read_json(self.state_path, default=None) or {}
+        with self._cache_lock:
+            self._cached = (signature, state)
+        return state
+
+    def stats(self, cap_id: str, dimension: str) -> Optional[Dict]:
+        """count, mean, variance and histogram for one capability dimension."""
+        stat = self._state().get("capabilities", {}).get(cap_id, {}).get(dimension)
+        if not stat:
+            return None
+        variance = stat["m2"] / (stat["count"] - 1) if stat["count"] > 1 else 0.0
+        return {**stat, "variance": variance}
+
+    def percentile(self, cap_id: str, dimension: str, score: int) -> Optional[float]:
+        """Percentile rank of score, or None until min_samples scores are stored."""
+        stat = self._state().get("capabilities", {}).get(cap_id, {}).get(dimension)
+        if not stat or stat["count"] < self.min_samples or not 0 < score < SCORE_LEVELS:
+            return None
+        return percentile_rank(stat, score)
+
+    def snapshot(self) -> Dict:
+        state = self._state()
+        return {"assessments": state.get("assessments", 0), "capabilities": len(state.get("capabilities", {}))}
+
+
+# Process-wide store; statistics are shared with other workers via the volume
+score_benchmarks = BenchmarkStore(config.BENCHMARKS_STATE_PATH)
@@ -0,0 +1,150 @@
+# modules/circuit_breaker.py
+import threading
+import time
+from typing import Dict, Optional
+
+import anthropic
+
+import config
+from modules.retry_policy import is_retryable
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling Claude while the breaker is open."""
+
+
+def counts_as_outage(error: Exception) -> bool:
+    """
+    Failures that suggest the API is down or degraded.
+    Rate limits (our quota) and client errors (our request) prove the API
+    is reachable, so they do not trip the breaker.
+    """
+    if isinstance(error, anthropic.RateLimitError):
+        return False
+    if isinstance(error, anthropic.APIStatusError) and error.status_code == 429:
+        return False
+    return is_retryable(error)
+
+
+class CircuitBreaker:
+    """
+    Process-wide circuit breaker for the Claude API.
+
+    CLOSED: calls flow normally. Consecutive outage failures - or calls slower
+    than slow_call_seconds - are counted; reaching failure_threshold opens it.
+    OPEN: calls are refused immediately so reports render from templates in
+    seconds. After reset_timeout one probe call is let through (HALF_OPEN).
+    HALF_OPEN: the single probe's outcome closes or re-opens the breaker;
+    other calls keep short-circuiting until it lands (or is cancelled,
+    which frees the probe for the next call).
+    """
+
+    def __init__(self, failure_threshold: int, slow_call_seconds: float, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Close the breaker and clear its counters."""
+        with self._lock:
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.last_failure = None
+            self.probe_in_flight = False
+            self.short_circuited = 0
+            self.times_opened = 0
+
+    def allow_request(self) -> bool:
+        """True if a call may go to the API now (may claim the half-open probe)."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+
+            if self.state == OPEN and time.time() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self.probe_in_flight = False
+
+            if self.state == HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+
+            self.short_circuited += 1
+            return False
+
+    def record_success(self, latency_seconds: float):
+        """A call returned; slow calls still count against the breaker."""
+        if latency_seconds > self.slow_call_seconds:
+            self._record_outage(f"Slow call ({latency_seconds:.1f}s)")
+            return
+
+        with self._lock:
+            if self.state != CLOSED:
+                print("Claude circuit breaker closed: probe succeeded.")
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.probe_in_flight = False
+
+    def release_probe(self):
+        """
+        A call was abandoned (cancelled) without an outcome. If it was the
+        half-open probe, let the next call probe instead; neither a success
+        nor a failure is counted.
+        """
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.probe_in_flight = False
+
+    def record_failure(self, error: Exception):
+        """A call raised. Only outage-type errors count against the breaker."""
+        if counts_as_outage(error):
+            self._record_outage(f"{type(error).__name__}: {error}")
+        else:
+            # The API answered, so it is up
+            self.record_success(0.0)
+
+    def _record_outage(self, reason: str):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_failure = {"reason": reason[:200], "at": time.time()}
+            self.probe_in_flight = False
+
+            if self.state == HALF_OPEN or (
+                self.state == CLOSED and self.consecutive_failures >= self.failure_threshold
+            ):
+                self.state = OPEN
+                self.opened_at = time.time()
+                self.times_opened += 1
+                print(f"Claude circuit breaker OPEN after {self.consecutive_failures} failures ({reason}). "
+                      f"Serving template sections for {self.reset_timeout:.0f}s.")
+
+    def snapshot(self) -> Dict:
+        """Current state for the admin page."""
+        with self._lock:
+            retry_in: Optional[float] = None
+            if self.state == OPEN:
+                retry_in = max(self.reset_timeout - (time.time() - self.opened_at), 0.0)
+            return {
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "opened_at": self.opened_at,
+                "probe_in": retry_in,
+                "last_failure": self.last_failure,
+                "short_circuited": self.short_circuited,
+                "times_opened": self.times_opened,
+            }
+
+
+# Process-wide breaker shared by every report
+claude_breaker = CircuitBreaker(
+    failure_threshold=config.CIRCUIT_FAILURE_THRESHOLD,
+    slow_call_seconds=config.CIRCUIT_SLOW_CALL_SECONDS,
+    reset_timeout=config.CIRCUIT_RESET_TIMEOUT
+)
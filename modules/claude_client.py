@@ -0,0 +1,36 @@
+# modules/claude_client.py
+import anthropic
+
+import config
+
+
+def make_client(max_retries: int = 0):
+    """
+    Sync Claude client for the configured backend.
+
+    CLAUDE_BACKEND=fake returns the in-process stand-in from
+    modules.fake_claude; otherwise the real SDK client, pointed at
+    ANTHROPIC_BASE_URL when set (e.g. the fake HTTP server).
+    """
+    if config.CLAUDE_BACKEND == "fake":
+        from modules.fake_claude import FakeAnthropic
+        return FakeAnthropic()
+
+    return anthropic.Anthropic(
+        api_key=config.ANTHROPIC_API_KEY,
+        base_url=config.ANTHROPIC_BASE_URL,
+        max_retries=max_retries
+    )
+
+
+def make_async_client(max_retries: int = 0):
+    """Async counterpart of make_client."""
+    if config.CLAUDE_BACKEND == "fake":
+        from modules.fake_claude import FakeAsyncAnthropic
+        return FakeAsyncAnthropic()
+
+    return anthropic.AsyncAnthropic(
+        api_key=config.ANTHROPIC_API_KEY,
+        base_url=config.ANTHROPIC_BASE_URL,
+        max_retries=max_retries
+    )
@@ -0,0 +1,132 @@
+# modules/concurrency_controller.py
+import asyncio
+import time
+from collections import deque
+from typing import Dict
+
+import anthropic
+
+from modules.latency_tracker import synthesis_latency
+
+# 429 (rate limited) and 529 (overloaded) mean "send less"
+OVERLOAD_STATUS_CODES = {429, 529}
+
+
+def is_overload(error: Exception) -> bool:
+    """True for responses that ask the client to back off."""
+    if isinstance(error, anthropic.RateLimitError):
+        return True
+    return isinstance(error, anthropic.APIStatusError) and error.status_code in OVERLOAD_STATUS_CODES
+
+
+class AdaptiveConcurrencyLimit:
+    """
+    AIMD limit on in-flight Claude requests.
+
+    Every healthy response raises the limit by 1/limit (about +1 per full
+    window of requests); a 429/529 or a response slower than
+    latency_tolerance x the section's median multiplies it by
+    decrease_factor. Decreases are spaced by decrease_cooldown so one burst
+    of rejections from the same window only backs off once.
+
+    Lives on the synthesis engine's event loop: acquire/release must be
+    called from that loop. snapshot() is safe from any thread.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        decrease_factor: float,
+        latency_tolerance: float,
+        decrease_cooldown: float
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.decrease_cooldown = decrease_cooldown
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.increases = 0
+        self.decreases = 0
+        self.last_decrease = 0.0
+        self._waiters = deque()
+
+    def _has_room(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def _take(self):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _wake(self):
+        while self._waiters and self._has_room():
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._take()
+                waiter.set_result(None)
+
+    async def acquire(self):
+        if not self._waiters and self._has_room():
+            self._take()
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # Granted a slot just as we were cancelled
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            raise
+
+    def release(self):
+        self.in_flight -= 1
+        self._wake()
+
+    def on_success(self, section_type: str, latency_seconds: float):
+        """Additive increase, unless latency is rising well above normal."""
+        median = synthesis_latency.percentile(section_type, 0.5)
+        if median is not None and latency_seconds > median * self.latency_tolerance:
+            self._decrease(f"{section_type} latency {latency_seconds:.1f}s > {self.latency_tolerance:g}x median")
+            return
+
+        if self.limit < self.max_limit:
+            self.limit = min(self.limit + 1.0 / self.limit, float(self.max_limit))
+            self.increases += 1
+            self._wake()
+
+    def on_error(self, error: Exception):
+        """Multiplicative decrease on 429/529; other errors leave the limit alone."""
+        if is_overload(error):
+            self._decrease(f"{type(error).__name__}")
+
+    def _decrease(self, reason: str):
+        now = time.time()
+        if now - self.last_decrease < self.decrease_cooldown:
+            return
+        previous = self.limit
+        self.limit = max(self.limit * self.decrease_factor, float(self.min_limit))
+        self.last_decrease = now
+        self.decreases += 1
+        print(f"Synthesis concurrency {previous:.1f} -> {self.limit:.1f} ({reason})")
+
+    def snapshot(self) -> Dict:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "peak_in_flight": self.peak_in_flight,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "increases": self.increases,
+            "decreases": self.decreases,
+        }
@@ -1,19 +1,33 @@
 # modules/concurrent_generator.py
-import concurrent.futures
+import time
 from datetime import datetime
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional
 
-from modules.score_analyzer import analyze_capabilities, create_priority_matrix, get_capabilities_by_category
+import config
+
+from modules.score_analyzer import (
+    analyze_capabilities,
+    create_priority_matrix,
+    get_capabilities_by_category,
+    get_phase_summary
+)
 from modules.report_generator import (
-    synthesize_with_claude,
     format_gap_context,
     format_executive_context,
     find_capability_in_kb,
     filter_by_importance_threshold,
+    format_phase_table,
     MCP_GUIDE_SECTION,
-    AGENT_GUIDE_SECTION,
-    VALID_AGENTS
+    AGENT_GUIDE_SECTION
 )
+from modules.synthesis_engine import synthesis_engine
+from modules.retry_policy import new_report_budget
+from modules.synthesis_library import synthesis_library
+from modules.usage_tracker import ReportUsage
+from modules.section_artifacts import SectionArtifacts
+from modules.token_budget import token_planner
+from modules.rate_limiter import estimate_tokens
+from modules.report_dag import ReportDAG
 
 
 def generate_priority_matrix_table(analyzed_capabilities: List[Dict]) -> str:
@@ -42,20 +56,84 @@ def generate_priority_matrix_table(analyzed_capabilities: List[Dict]) -> str:
     return table
 
 
+def format_gap_section(gap: Dict, synthesis: str) -> str:
+    """Render one urgent gap card: header line plus synthesized body."""
+    return f"""### {gap['capability_name']}
+**Phase:** {gap['phase_name']} | **Scores:** I={gap['importance']}, R={gap['readiness']}, Gap={gap.get('gap_score', 0)}
+
+{synthesis}
+"""
+
+
+def format_remaining_gaps(gaps: List[Dict], shown: int) -> str:
+    """List urgent gaps beyond the detailed ones so none are silently dropped."""
+    lines = "\n".join(
+        f"- **{gap['capability_name']}** ({gap['phase_name']}): "
+        f"I={gap['importance']}, R={gap['readiness']}, Gap={gap.get('gap_score', 0)}"
+        for gap in gaps
+    )
+    return f"""### Additional Urgent Gaps
+*The {shown} highest-priority gaps are detailed above. {len(gaps)} more also need attention:*
+
+{lines}
+"""
+
+
 def generate_report_concurrent(
     scores: List[Dict],
     knowledge_base: dict,
     user_name: str,
-    max_workers: int = 3
+    on_section_update: Optional[Callable[[str, str], None]] = None,
+    batch_size: int = None,
+    deadline_seconds: float = None,
+    report_usage: Optional[ReportUsage] = None,
+    prefetcher=None,
+    artifacts: Optional[SectionArtifacts] = None
 ) -> str:
     """
     Generate report with concurrent section processing.
 
-    Splits synthesis into parallel tasks for:
-    - Executive summary
-    - Each urgent gap (parallel)
-    - MCP sections (static, no wait)
+    Runs every synthesis as a coroutine on the process-wide async engine,
+    so concurrency is bounded per process rather than per report.
+
+    The report is a section DAG (see modules.report_dag):
+    - Executive summary (LLM)
+    - Each urgent gap (LLM, parallel)
+    - Priority matrix, remaining gaps, MCP sections (static, no wait)
+    Every section is validated, bullet-fixed and branding-sanitized as it
+    finishes, with any validation warnings appended at the end.
+
+    If on_section_update is given, sections are streamed: it is called from
+    the calling thread with (section_key, markdown) - once per section in
+    report order with a placeholder, then with partial text as tokens
+    arrive, and finally with the finished section.
+
+    batch_size (default config.SYNTHESIS_BATCH_SIZE) packs up to that many
+    urgent gaps into each Claude request; gaps missing from a batched
+    response fall back to their own request.
+
+    deadline_seconds (default config.REPORT_DEADLINE_SECONDS) bounds the whole
+    synthesis step: sections still running then are rendered from the KB
+    template, so one slow call cannot hold back the report.
+
+    report_usage, if given, collects every Claude call's token usage, latency
+    and cost; pass its summary() to save_assessment to store it with the report.
+
+    Output tokens are planned across sections within config.MAX_REPORT_LENGTH
+    (see modules.token_budget); low-priority gaps that do not fit are listed
+    rather than detailed.
+
+    prefetcher, if given, is the session's SynthesisPrefetcher: gaps it has
+    already synthesized for these exact scores are used as-is, and gaps it
+    still has in flight are joined rather than requested again.
+
+    artifacts, if given, holds the previous assessment's sections: any
+    section whose inputs are unchanged is reused instead of synthesized, and
+    every section of this report is recorded on it for save_assessment.
     """
+    if deadline_seconds is None:
+        deadline_seconds = config.REPORT_DEADLINE_SECONDS
+    deadline = time.time() + deadline_seconds if deadline_seconds > 0 else None
 
     # Step 1: Compute priorities (fast, no LLM)
     analyzed = analyze_capabilities(scores, knowledge_base)
@@ -71,75 +149,74 @@ def generate_report_concurrent(
     avg_importance = sum(all_i) / len(all_i) if all_i else 0
     avg_readiness = sum(all_r) / len(all_r) if all_r else 0
 
-    # Step 2: Prepare all synthesis tasks
-    tasks = []
+    # Step 2: Prepare all synthesis tasks (result key -> section type, context)
+    tasks = {}
+    contexts = {}
+    # Sections needing no LLM call: unchanged since the last generation,
+    # library entries and prefetched gaps
+    precomputed = {}
 
     # Executive summary task
     exec_context = format_executive_context(
         user_name, len(analyzed), urgent_gaps, critical_gaps,
         avg_importance, avg_readiness
     )
-    tasks.append(("executive_summary", exec_context))
+    contexts["executive_summary"] = ("executive_summary", exec_context)
+    previous_text = artifacts.reuse("executive_summary", "executive_summary", exec_context) if artifacts else None
+    if previous_text is not None:
+        precomputed["executive_summary"] = previous_text
+    else:
+        tasks["executive_summary"] = ("executive_summary", exec_context)
 
     # Gap tasks (one per gap)
-    for gap in urgent_gaps[:10]:  # Limit to top 10 urgent gaps
+    # Detail the top gaps; the rest are listed by name rather than dropped
+    detailed_gaps = urgent_gaps[:config.MAX_URGENT_GAPS_IN_REPORT]
+    for gap in detailed_gaps:
         kb_data = find_capability_in_kb(gap['capability_id'], knowledge_base)
         if kb_data:
             context = format_gap_context(gap, kb_data)
-            tasks.append((f"gap_{gap['capability_id']}", context, gap))
-
-    # Step 3: Run synthesis concurrently
-    results = {}
-
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_task = {}
-
-        for task in tasks:
-            if task[0] == "executive_summary":
-                future = executor.submit(
-                    synthesize_with_claude,
-                    "executive_summary",
-                    task[1],
-                    VALID_AGENTS
-                )
-                future_to_task[future] = ("executive_summary", None)
-            else:
-                future = executor.submit(
-                    synthesize_with_claude,
-                    "urgent_gap",
-                    task[1],
-                    VALID_AGENTS
-                )
-                future_to_task[future] = ("gap", task[2])
-
-        # Collect results as they complete
-        for future in concurrent.futures.as_completed(future_to_task):
-            task_type, gap_data = future_to_task[future]
-            try:
-                result = future.result()
-                if task_type == "executive_summary":
-                    results["executive_summary"] = result
-                else:
-                    results[gap_data['capability_id']] = {
-                        "gap": gap_data,
-                        "synthesis": result
-                    }
-            except Exception as e:
-                print(f"Synthesis error: {e}")
-
-    # Step 4: Assemble report
-    urgent_sections = []
-    for gap in urgent_gaps[:10]:
-        if gap['capability_id'] in results:
-            gap_result = results[gap['capability_id']]
-            section = f"""### {gap['capability_name']}
-**Phase:** {gap['phase_name']} | **Scores:** I={gap['importance']}, R={gap['readiness']}, Gap={gap.get('gap_score', 0)}
+            contexts[gap['capability_id']] = ("urgent_gap", context)
+            if artifacts is not None:
+                previous_text = artifacts.reuse(gap['capability_id'], "urgent_gap", context)
+                if previous_text is not None:
+                    precomputed[gap['capability_id']] = previous_text
+                    continue
+            library_text = synthesis_library.lookup(
+                "urgent_gap", gap['capability_id'], gap['importance'], gap['readiness']
+            )
+            if library_text is not None:
+                precomputed[gap['capability_id']] = library_text
+                continue
+            if prefetcher is not None:
+                prefetched = prefetcher.lookup(gap['capability_id'], gap['importance'], gap['readiness'])
+                if prefetched is not None:
+                    precomputed[gap['capability_id']] = prefetched
+                    continue
+            tasks[gap['capability_id']] = ("urgent_gap", context)
+
+    # Split the report's output budget (precomputed text counts against it); gaps
+    # that do not fit are listed by name with the rest
+    token_budgets = token_planner.plan(
+        [(key, section_type) for key, (section_type, _) in tasks.items()],
+        reserved=sum(estimate_tokens(text) for text in precomputed.values())
+    )
+    for position, gap in enumerate(detailed_gaps):
+        if gap['capability_id'] in tasks and gap['capability_id'] not in token_budgets:
+            detailed_gaps = detailed_gaps[:position]
+            break
+    detailed_ids = {gap['capability_id'] for gap in detailed_gaps}
+    tasks = {key: task for key, task in tasks.items() if key in token_budgets}
+    precomputed = {
+        key: text for key, text in precomputed.items()
+        if key in detailed_ids or key == "executive_summary"
+    }
 
-{gap_result['synthesis']}
-"""
-            urgent_sections.append(section)
+    # Step 3: Describe the report as a section DAG and run it on the shared
+    # async engine; each section is validated and post-processed as it finishes
+    remaining_gaps = urgent_gaps[len(detailed_gaps):]
 
-    report = f"""# O2C AI & MCP Readiness Assessment
+    dag = ReportDAG()
+    dag.static("title", f"""# O2C AI & MCP Readiness Assessment
 **Prepared for:** {user_name}
 *Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}*
 
@@ -147,7 +224,13 @@ def generate_report_concurrent(
 
 ## 1. Executive Summary
 
-{results.get('executive_summary', 'Unable to generate summary.')}
+""")
+    dag.llm(
+        "executive_summary", "executive_summary", exec_context,
+        wrap=lambda text: text or 'Unable to generate summary.',
+        precomputed=precomputed.get("executive_summary")
+    )
+    dag.static("priority_matrix", f"""
 
 ---
 
@@ -155,11 +238,25 @@ def generate_report_concurrent(
 
 {generate_priority_matrix_table(analyzed)}
 
+{format_phase_table(get_phase_summary(analyzed))}
 ---
 
 ## 3. Urgent Gaps - Detailed Analysis
 
-{chr(10).join(urgent_sections) if urgent_sections else "*No urgent gaps identified.*"}
+""")
+    for gap in detailed_gaps:
+        key = gap['capability_id']
+        if key in tasks or key in precomputed:
+            dag.llm(
+                key, "urgent_gap", contexts[key][1],
+                wrap=lambda text, gap=gap: format_gap_section(gap, text) + "\n" if text is not None else "",
+                precomputed=precomputed.get(key)
+            )
+    if remaining_gaps:
+        dag.static("remaining_gaps", format_remaining_gaps(remaining_gaps, len(detailed_gaps)))
+    if not detailed_gaps and not remaining_gaps:
+        dag.static("no_gaps", "*No urgent gaps identified.*")
+    dag.static("guides", f"""
 
 ---
 
@@ -172,6 +269,21 @@ def generate_report_concurrent(
 ## 5. Building Your First Zuora Agent
 
 {AGENT_GUIDE_SECTION}
-"""
+""")
+    dag.add_validation()
+
+    if batch_size is None:
+        batch_size = config.SYNTHESIS_BATCH_SIZE
+
+    dag.run(
+        synthesis_engine, on_section_update=on_section_update, batch_size=batch_size,
+        retry_budget=new_report_budget(), deadline=deadline, report_usage=report_usage,
+        token_budgets=token_budgets
+    )
+
+    if artifacts is not None:
+        for key, text in dag.texts.items():
+            section_type, context = contexts[key]
+            artifacts.record(key, section_type, context, text)
 
-    return report
+    return dag.assemble()
@@ -0,0 +1,586 @@
+# modules/fake_claude.py
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import anthropic
+from anthropic.types import Message
+
+import config
+from modules.rate_limiter import estimate_tokens
+
+# Seconds an injected 429/529 takes to come back
+ERROR_LATENCY = 0.05
+
+# Output tokens per streamed text delta
+STREAM_CHUNK_TOKENS = 8
+
+# Shortest prefix the API will cache (Opus/Sonnet); shorter breakpoints are ignored
+MIN_CACHEABLE_TOKENS = 1024
+
+# Batched gap prompts list each gap under this header (see build_batch_gap_messages)
+BATCH_GAP_PATTERN = re.compile(r"=== capability_id: (\S+) ===")
+
+FILLER_WORDS = (
+    "Automate exception handling so billing issues are resolved before they reach "
+    "collections, keep pricing rules in one catalog, and report revenue from the "
+    "same subscription data the finance team already reconciles each period."
+).split()
+
+ERROR_TYPES = {
+    429: ("rate_limit_error", "Number of request tokens has exceeded your per-minute rate limit"),
+    529: ("overloaded_error", "Overloaded"),
+}
+
+
+class FakeProfile:
+    """
+    How the fake API behaves: lognormal time to first token, output at a
+    fixed token rate, and a share of requests rejected with 429 or 529.
+    Defaults come from the FAKE_CLAUDE_* settings.
+    """
+
+    def __init__(
+        self,
+        ttft_median: float = None,
+        ttft_sigma: float = None,
+        tokens_per_second: float = None,
+        output_tokens: int = None,
+        rate_limit_rate: float = None,
+        overload_rate: float = None,
+        seed: int = None
+    ):
+        self.ttft_median = config.FAKE_CLAUDE_TTFT_MEDIAN if ttft_median is None else ttft_median
+        self.ttft_sigma = config.FAKE_CLAUDE_TTFT_SIGMA if ttft_sigma is None else ttft_sigma
+        self.tokens_per_second = config.FAKE_CLAUDE_TOKENS_PER_SECOND if tokens_per_second is None else tokens_per_second
+        self.output_tokens = config.FAKE_CLAUDE_OUTPUT_TOKENS if output_tokens is None else output_tokens
+        self.rate_limit_rate = config.FAKE_CLAUDE_RATE_LIMIT_RATE if rate_limit_rate is None else rate_limit_rate
+        self.overload_rate = config.FAKE_CLAUDE_OVERLOAD_RATE if overload_rate is None else overload_rate
+        self.seed = config.FAKE_CLAUDE_SEED if seed is None else seed
+
+
+def request_blocks(request: Dict) -> List[Dict]:
+    """System and message content blocks of a Messages request, in prompt order."""
+    blocks = []
+    system = request.get("system")
+    if isinstance(system, str):
+        blocks.append({"type": "text", "text": system})
+    elif system:
+        blocks.extend(system)
+
+    for message in request.get("messages", []):
+        content = message.get("content", "")
+        if isinstance(content, str):
+            blocks.append({"type": "text", "text": content})
+        else:
+            blocks.extend(content)
+    return blocks
+
+
+def filler_text(tokens: int) -> str:
+    """Synthesis-shaped prose of roughly the given token count."""
+    words = [FILLER_WORDS[i % len(FILLER_WORDS)] for i in range(max(tokens * 3 // 4, 1))]
+    return "**Why This Matters:**\n" + " ".join(words)
+
+
+def default_responder(request: Dict, output_tokens: int) -> str:
+    """
+    Plausible response text for the app's prompts: score JSON for image
+    extraction, a JSON object keyed by capability_id for batched gaps, and
+    prose for everything else.
+    """
+    blocks = request_blocks(request)
+    if any(block.get("type") == "image" for block in blocks):
+        return json.dumps({"scores": [], "extraction_confidence": "low", "notes": "Fake Claude response"})
+
+    text = "\n".join(block.get("text", "") for block in blocks)
+    gap_ids = BATCH_GAP_PATTERN.findall(text)
+    if gap_ids:
+        return json.dumps({cap_id: filler_text(output_tokens) for cap_id in gap_ids})
+    return filler_text(output_tokens)
+
+
+def error_body(status_code: int) -> Dict:
+    error_type, message = ERROR_TYPES.get(status_code, ("api_error", "Internal server error"))
+    return {"type": "error", "error": {"type": error_type, "message": message}}
+
+
+def error_headers(status_code: int) -> Dict[str, str]:
+    headers = {"x-should-retry": "true"}
+    if status_code == 429:
+        headers["retry-after"] = "1"
+    return headers
+
+
+class _ErrorResponse:
+    """Just enough of an HTTP response for the SDK's error constructors."""
+
+    def __init__(self, status_code: int, headers: Dict[str, str]):
+        self.status_code = status_code
+        self.headers = headers
+        self.request = None
+
+
+def fake_api_error(status_code: int) -> anthropic.APIStatusError:
+    """The SDK exception the real client raises for a 429 or 529."""
+    body = error_body(status_code)
+    error_class = anthropic.RateLimitError if status_code == 429 else anthropic.InternalServerError
+    return error_class(
+        body["error"]["message"],
+        response=_ErrorResponse(status_code, error_headers(status_code)),
+        body=body
+    )
+
+
+def text_chunks(text: str) -> List[str]:
+    size = STREAM_CHUNK_TOKENS * 4
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class FakeClaude:
+    """
+    Shared core of the fake clients and the fake HTTP server.
+
+    plan() decides how one request plays out - an injected error, or a
+    response with its usage and timing - and the transports just sleep
+    accordingly. Prompt caching is simulated: a cache_control prefix seen
+    before is billed as a cache read, a new one as a cache write.
+    """
+
+    def __init__(self, profile: FakeProfile = None, responder: Callable[[Dict, int], str] = None):
+        self.profile = profile or FakeProfile()
+        self.responder = responder or default_responder
+        self._rng = random.Random(self.profile.seed)
+        self._lock = threading.Lock()
+        self._cached_prefixes = set()
+        self.requests = 0
+        self.errors = 0
+
+    def plan(self, request: Dict) -> Dict:
+        """
+        Returns {"error": status, "delay": s} or
+        {"message": payload, "ttft": s, "duration": s}.
+        """
+        profile = self.profile
+        with self._lock:
+            self.requests += 1
+            roll = self._rng.random()
+            ttft = self._rng.lognormvariate(math.log(profile.ttft_median), profile.ttft_sigma)
+            length_jitter = self._rng.uniform(0.75, 1.25)
+
+        if roll < profile.rate_limit_rate + profile.overload_rate:
+            status_code = 429 if roll < profile.rate_limit_rate else 529
+            with self._lock:
+                self.errors += 1
+            return {"error": status_code, "delay": ERROR_LATENCY}
+
+        text = self.responder(request, max(int(profile.output_tokens * length_jitter), 1))
+        max_tokens = request.get("max_tokens", config.CLAUDE_MAX_TOKENS)
+        output_tokens = min(estimate_tokens(text), max_tokens)
+        usage = self._input_usage(request)
+        usage["output_tokens"] = output_tokens
+
+        return {
+            "message": {
+                "id": f"msg_fake_{uuid.uuid4().hex[:20]}",
+                "type": "message",
+                "role": "assistant",
+                "model": request.get("model", config.CLAUDE_MODEL),
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "max_tokens" if estimate_tokens(text) > max_tokens else "end_turn",
+                "stop_sequence": None,
+                "usage": usage,
+            },
+            "ttft": ttft,
+            "duration": ttft + output_tokens / profile.tokens_per_second,
+        }
+
+    def _input_usage(self, request: Dict) -> Dict[str, int]:
+        blocks = request_blocks(request)
+        texts = [block.get("text", "") for block in blocks]
+        total = estimate_tokens("".join(texts))
+
+        breakpoints = [i for i, block in enumerate(blocks) if block.get("cache_control")]
+        usage = {"input_tokens": total, "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
+        if not breakpoints:
+            return usage
+
+        prefix = "".join(texts[:breakpoints[-1] + 1])
+        prefix_tokens = estimate_tokens(prefix)
+        if prefix_tokens < MIN_CACHEABLE_TOKENS:
+            return usage
+
+        key = hashlib.sha256(f"{request.get('model')}\n{prefix}".encode("utf-8")).hexdigest()
+        with self._lock:
+            hit = key in self._cached_prefixes
+            self._cached_prefixes.add(key)
+
+        usage["input_tokens"] = max(total - prefix_tokens, 0)
+        usage["cache_read_input_tokens" if hit else "cache_creation_input_tokens"] = prefix_tokens
+        return usage
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"requests": self.requests, "errors": self.errors}
+
+
+def _outcome(plan: Dict, timeout: Optional[float]):
+    """(seconds to wait, exception to raise or None) for a non-streamed call."""
+    if "error" in plan:
+        return plan["delay"], fake_api_error(plan["error"])
+    if timeout is not None and plan["duration"] > timeout:
+        return timeout, anthropic.APITimeoutError(request=None)
+    return plan["duration"], None
+
+
+class _StreamPlan:
+    """Deltas and pacing of one streamed response."""
+
+    def __init__(self, plan: Dict, timeout: Optional[float]):
+        self.message = plan["message"]
+        self.ttft = plan["ttft"]
+        self.chunks = text_chunks(self.message["content"][0]["text"])
+        self.chunk_delay = (plan["duration"] - plan["ttft"]) / max(len(self.chunks), 1)
+        self.deadline = time.time() + timeout if timeout is not None else None
+
+    def check_deadline(self):
+        if self.deadline is not None and time.time() > self.deadline:
+            raise anthropic.APITimeoutError(request=None)
+
+
+class _MessageStream:
+    """Sync stand-in for client.messages.stream(...)."""
+
+    def __init__(self, fake: FakeClaude, request: Dict):
+        self._fake = fake
+        self._request = request
+        self._stream = None
+
+    def __enter__(self):
+        timeout = self._request.pop("timeout", None)
+        plan = self._fake.plan(self._request)
+        if "error" in plan:
+            time.sleep(plan["delay"])
+            raise fake_api_error(plan["error"])
+        self._stream = _StreamPlan(plan, timeout)
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    @property
+    def text_stream(self):
+        time.sleep(self._stream.ttft)
+        for chunk in self._stream.chunks:
+            self._stream.check_deadline()
+            yield chunk
+            time.sleep(self._stream.chunk_delay)
+
+    def get_final_message(self) -> Message:
+        return Message.model_validate(self._stream.message)
+
+
+class _AsyncMessageStream:
+    """Async stand-in for client.messages.stream(...)."""
+
+    def __init__(self, fake: FakeClaude, request: Dict):
+        self._fake = fake
+        self._request = request
+        self._stream = None
+
+    async def __aenter__(self):
+        timeout = self._request.pop("timeout", None)
+        plan = self._fake.plan(self._request)
+        if "error" in plan:
+            await asyncio.sleep(plan["delay"])
+            raise fake_api_error(plan["error"])
+        self._stream = _StreamPlan(plan, timeout)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    @property
+    async def text_stream(self):
+        await asyncio.sleep(self._stream.ttft)
+        for chunk in self._stream.chunks:
+            self._stream.check_deadline()
+            yield chunk
+            await asyncio.sleep(self._stream.chunk_delay)
+
+    async def get_final_message(self) -> Message:
+        return Message.model_validate(self._stream.message)
+
+
+class _Messages:
+    def __init__(self, fake: FakeClaude):
+        self._fake = fake
+
+    def create(self, **request) -> Message:
+        timeout = request.pop("timeout", None)
+        plan = self._fake.plan(request)
+        delay, error = _outcome(plan, timeout)
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        return Message.model_validate(plan["message"])
+
+    def stream(self, **request) -> _MessageStream:
+        return _MessageStream(self._fake, request)
+
+
+class _AsyncMessages:
+    def __init__(self, fake: FakeClaude):
+        self._fake = fake
+
+    async def create(self, **request) -> Message:
+        timeout = request.pop("timeout", None)
+        plan = self._fake.plan(request)
+        delay, error = _outcome(plan, timeout)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return Message.model_validate(plan["message"])
+
+    def stream(self, **request) -> _AsyncMessageStream:
+        return _AsyncMessageStream(self._fake, request)
+
+
+class FakeAnthropic:
+    """Drop-in for anthropic.Anthropic (messages.create / messages.stream)."""
+
+    def __init__(self, fake: FakeClaude = None):
+        self.fake = fake or fake_claude
+        self.messages = _Messages(self.fake)
+
+
+class FakeAsyncAnthropic:
+    """Drop-in for anthropic.AsyncAnthropic (messages.create / messages.stream)."""
+
+    def __init__(self, fake: FakeClaude = None):
+        self.fake = fake or fake_claude
+        self.messages = _AsyncMessages(self.fake)
+
+
+class FakeClaudeHandler(BaseHTTPRequestHandler):
+    """POST /v1/messages in the Messages API shape, including SSE streaming."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        if self.path.split("?")[0] != "/v1/messages":
+            self._send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": "Not found"}})
+            return
+
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        stream = request.pop("stream", False)
+        plan = self.server.fake.plan(request)
+
+        if "error" in plan:
+            time.sleep(plan["delay"])
+            self._send_json(plan["error"], error_body(plan["error"]), error_headers(plan["error"]))
+        elif stream:
+            self._send_stream(plan)
+        else:
+            time.sleep(plan["duration"])
+            self._send_json(200, plan["message"])
+
+    def _send_json(self, status_code: int, payload: Dict, headers: Dict[str, str] = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_event(self, event_type: str, data: Dict):
+        self.wfile.write(f"event: {event_type}\ndata: {json.dumps({'type': event_type, **data})}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def _send_stream(self, plan: Dict):
+        message = plan["message"]
+        stream = _StreamPlan(plan, None)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        start_usage = {**message["usage"], "output_tokens": 1}
+        self._send_event("message_start", {"message": {**message, "content": [], "stop_reason": None,
+                                                       "usage": start_usage}})
+        time.sleep(stream.ttft)
+        self._send_event("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})
+        for chunk in stream.chunks:
+            self._send_event("content_block_delta", {"index": 0, "delta": {"type": "text_delta", "text": chunk}})
+            time.sleep(stream.chunk_delay)
+        self._send_event("content_block_stop", {"index": 0})
+        self._send_event("message_delta", {
+            "delta": {"stop_reason": message["stop_reason"], "stop_sequence": None},
+            "usage": {"output_tokens": message["usage"]["output_tokens"]},
+        })
+        self._send_event("message_stop", {})
+
+    def log_message(self, format, *args):
+        pass  # Load tests would drown in access logs
+
+
+def make_server(port: int, fake: FakeClaude = None, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """HTTP server for ANTHROPIC_BASE_URL=http://host:port (port 0 picks a free one)."""
+    server = ThreadingHTTPServer((host, port), FakeClaudeHandler)
+    server.daemon_threads = True
+    server.fake = fake or fake_claude
+    return server
+
+
+def random_scores(knowledge_base: dict, rng: random.Random) -> List[Dict]:
+    """One uniformly random I/R score per capability, like the app's ?test=random mode."""
+    return [
+        {
+            "capability_id": cap["id"],
+            "phase_id": phase["id"],
+            "importance": rng.randint(1, 10),
+            "readiness": rng.randint(1, 10),
+        }
+        for phase in knowledge_base.get("phases", [])
+        for cap in phase.get("capabilities", [])
+    ]
+
+
+@contextmanager
+def isolated_state():
+    """
+    Point the file-backed rate limiter, usage tracker and synthesis cache at
+    a temporary directory, so a benchmark neither spends the shared
+    production rate-limit budget nor shows up in the admin cost totals.
+    """
+    from modules.rate_limiter import claude_rate_limiter
+    from modules.synthesis_cache import synthesis_cache
+    from modules.usage_tracker import usage_tracker
+
+    with tempfile.TemporaryDirectory(prefix="fake-claude-bench-") as state_dir:
+        saved = [
+            (claude_rate_limiter, "state_path", Path(state_dir) / "rate_limits" / "claude.json"),
+            (usage_tracker, "state_path", Path(state_dir) / "usage" / "claude.json"),
+            (synthesis_cache, "cache_dir", Path(state_dir) / "synthesis_cache"),
+        ]
+        saved = [(target, name, getattr(target, name), value) for target, name, value in saved]
+        # Pending production counts go to the real files before the switch
+        synthesis_cache.flush()
+        usage_tracker.flush()
+        for target, name, _, value in saved:
+            setattr(target, name, value)
+        try:
+            yield
+        finally:
+            # Batched state belongs to the temporary directory too
+            synthesis_cache.flush()
+            usage_tracker.flush()
+            for target, name, original, _ in saved:
+                setattr(target, name, original)
+
+
+def run_benchmark(reports: int, parallel: int, use_cache: bool = False, seed: int = 0) -> Dict:
+    """
+    Generate reports with generate_report_concurrent against the fake
+    backend and return makespan statistics (seconds per report).
+    Rate limits, usage and the cache (if use_cache) live in a temporary
+    directory for the run.
+    """
+    config.CLAUDE_BACKEND = "fake"
+
+    # Imported here: the generators create their clients from CLAUDE_BACKEND
+    from modules.synthesis_cache import synthesis_cache
+
+    cache_enabled = synthesis_cache.enabled
+    synthesis_cache.enabled = use_cache
+    try:
+        with isolated_state():
+            return _run_benchmark(reports, parallel, seed)
+    finally:
+        synthesis_cache.enabled = cache_enabled
+
+
+def _run_benchmark(reports: int, parallel: int, seed: int) -> Dict:
+    from modules.concurrent_generator import generate_report_concurrent
+    from modules.synthesis_engine import synthesis_engine
+
+    with open(config.KNOWLEDGE_BASE_PATH) as f:
+        knowledge_base = json.load(f)
+
+    rng = random.Random(seed)
+    score_sets = [random_scores(knowledge_base, rng) for _ in range(reports)]
+
+    def generate(scores):
+        started = time.time()
+        generate_report_concurrent(scores, knowledge_base, "Benchmark User")
+        return time.time() - started
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        makespans = sorted(pool.map(generate, score_sets))
+    wall = time.time() - started
+
+    def percentile(fraction):
+        return makespans[max(math.ceil(fraction * len(makespans)) - 1, 0)]
+
+    return {
+        "reports": reports,
+        "parallel": parallel,
+        "wall_seconds": wall,
+        "p50": percentile(0.50),
+        "p95": percentile(0.95),
+        "max": makespans[-1],
+        **synthesis_engine.client.fake.stats(),
+    }
+
+
+# Process-wide fake shared by the fake clients (and the server, unless given one)
+fake_claude = FakeClaude()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline stand-in for the Claude Messages API.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Run the fake HTTP server (use with ANTHROPIC_BASE_URL)")
+    serve.add_argument("--port", type=int, default=config.FAKE_CLAUDE_PORT)
+
+    bench = commands.add_parser("bench", help="Measure report makespan against the in-process fake")
+    bench.add_argument("--reports", type=int, default=20)
+    bench.add_argument("--parallel", type=int, default=4, help="Reports generated at once")
+    bench.add_argument("--cache", action="store_true", help="Keep the synthesis response cache on (in a temporary directory)")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        server = make_server(args.port)
+        print(f"Fake Claude listening on http://127.0.0.1:{server.server_address[1]} "
+              f"(set ANTHROPIC_BASE_URL to this)")
+        server.serve_forever()
+        return
+
+    result = run_benchmark(args.reports, args.parallel, use_cache=args.cache)
+    print(f"{result['reports']} reports, {result['parallel']} at a time: "
+          f"wall {result['wall_seconds']:.1f}s, makespan p50 {result['p50']:.1f}s, "
+          f"p95 {result['p95']:.1f}s, max {result['max']:.1f}s "
+          f"({result['requests']} requests, {result['errors']} injected errors)")
+
+
+if __name__ == "__main__":
+    main()
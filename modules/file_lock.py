@@ -0,0 +1,67 @@
+# modules/file_lock.py
+import json
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+# Import file locking (fcntl for Unix, msvcrt for Windows)
+if sys.platform == "win32":
+    import msvcrt
+    USE_FCNTL = False
+else:
+    import fcntl
+    USE_FCNTL = True
+
+
+@contextmanager
+def locked_file(lock_path: Path):
+    """
+    Hold an exclusive inter-process lock for the duration of the block.
+    Uses a sidecar lock file so the protected data file can still be
+    replaced atomically (temp file + rename) while the lock is held.
+    """
+    lock_path = Path(lock_path)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(lock_path, "a+") as f:
+        if USE_FCNTL:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if USE_FCNTL:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def read_json(path: Path, default=None):
+    """Read a JSON file, returning default if missing or corrupt."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return default
+
+
+def write_json_atomic(path: Path, data) -> None:
+    """Write JSON with an atomic rename so readers never see partial files."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = path.parent / f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    try:
+        with open(temp_file, "w") as f:
+            json.dump(data, f)
+        # Atomic rename - prevents partial writes
+        os.replace(temp_file, path)
+    except Exception as e:
+        # Cleanup temp file on error
+        if temp_file.exists():
+            temp_file.unlink()
+        raise e
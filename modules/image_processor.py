@@ -4,6 +4,7 @@ import json
 from pathlib import Path
 from typing import Tuple, Dict, List
 import config
+from modules.claude_client import make_client
 
 EXTRACTION_PROMPT = """
 Analyze this Recurring Revenue Management Lifecycle Assessment image and extract all Importance (I) and Readiness (R) scores.
@@ -48,7 +49,7 @@ def extract_scores_from_image(image_path: str) -> Tuple[Dict, List[str]]:
     Use Claude Vision to extract I/R scores from assessment image.
     Returns tuple of (extracted data dict, warnings list)
     """
-    client = anthropic.Anthropic(api_key=config.ANTHROPIC_API_KEY)
+    client = make_client(max_retries=anthropic.DEFAULT_MAX_RETRIES)
 
     # Determine media type from file extension
     path = Path(image_path)
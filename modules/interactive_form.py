@@ -2,7 +2,9 @@ import streamlit as st
 import json
 from datetime import datetime
 from typing import Dict, List, Tuple
-from grid_layout import GRID_LAYOUT, PHASES, get_all_capabilities, IMPORTANCE_STYLE, READINESS_STYLE, get_capability_full_description, get_capabilities_by_phase
+from grid_layout import GRID_LAYOUT, PHASES, get_all_capabilities, IMPORTANCE_STYLE, READINESS_STYLE, get_capability_full_description
+from modules.kb_index import KnowledgeBaseIndex
+from modules.session_analysis import SessionAnalysis
 
 def render_interactive_assessment(knowledge_base: dict) -> Dict:
     """
@@ -263,6 +265,7 @@ def render_interactive_assessment(knowledge_base: dict) -> Dict:
 
     # Render by phase for proper mobile grouping
     # Each phase header is followed by its capabilities
+    index = KnowledgeBaseIndex.of(knowledge_base)
     for phase in PHASES:
         # Phase header (full width)
         st.markdown(f'''
@@ -280,8 +283,8 @@ def render_interactive_assessment(knowledge_base: dict) -> Dict:
         </div>
         ''', unsafe_allow_html=True)
 
-        # Get capabilities for THIS phase only
-        phase_caps = get_capabilities_by_phase(phase['id'])
+        # Get capabilities for THIS phase only (precomputed in the index)
+        phase_caps = index.grid_phase(phase['id'])
 
         # Render in responsive grid
         # On desktop: 3 cards per row within phase
@@ -355,12 +358,10 @@ def render_capability_card(cell: Dict, knowledge_base: dict):
                 label_visibility="collapsed"
             )
 
-        # Update session state
-        st.session_state.interactive_scores[cap_id] = {
-            "importance": i_score,
-            "readiness": r_score,
-            "phase_id": cell["phase_id"]
-        }
+        # Update session state (re-analyzes this capability only if it changed)
+        get_session_analysis(st.session_state.interactive_scores).set(
+            cap_id, i_score, r_score, cell["phase_id"]
+        )
 
 
 def get_priority_class(importance: int, readiness: int) -> str:
@@ -379,33 +380,41 @@ def get_priority_class(importance: int, readiness: int) -> str:
 
 def get_capability_tooltip(cap_id: str, knowledge_base: dict) -> str:
     """Get tooltip content for a capability from knowledge base."""
-    # Find capability in knowledge base
-    for phase in knowledge_base.get("phases", []):
-        for cap in phase.get("capabilities", []):
-            if cap.get("id") == cap_id:
-                agents = cap.get("agent_mapping", {}).get("primary_agents", [])
-                timeline = cap.get("whats_coming", {}).get("timeline", "")
-                why = cap.get("why_it_matters", "")[:150]
+    cap = KnowledgeBaseIndex.of(knowledge_base).capability(cap_id)
+    if cap is None:
+        return "No additional context available"
+
+    agents = cap.get("agent_mapping", {}).get("primary_agents", [])
+    timeline = cap.get("whats_coming", {}).get("timeline", "")
+    why = cap.get("why_it_matters", "")[:150]
 
-                tooltip = f"Why it matters: {why}..."
-                if agents:
-                    tooltip += f"\n\nAI Agents: {', '.join(agents[:3])}"
-                if timeline:
-                    tooltip += f"\n\nTimeline: {timeline}"
+    tooltip = f"Why it matters: {why}..."
+    if agents:
+        tooltip += f"\n\nAI Agents: {', '.join(agents[:3])}"
+    if timeline:
+        tooltip += f"\n\nTimeline: {timeline}"
 
-                return tooltip
+    return tooltip
 
-    return "No additional context available"
+
+def get_session_analysis(scores: Dict) -> SessionAnalysis:
+    """The session's running analysis of scores, rebuilt only when the dict is replaced."""
+    analysis = st.session_state.get("score_analysis")
+    if analysis is None or analysis.scores is not scores:
+        analysis = SessionAnalysis(scores)
+        st.session_state["score_analysis"] = analysis
+    return analysis
 
 
 def render_progress_sidebar(scores: Dict):
     """Show assessment completion progress in sidebar."""
+    analysis = get_session_analysis(scores)
+
     # Use actual number of scores being tracked
-    total_capabilities = len(scores) if scores else 42
+    total_capabilities = analysis.total or 42
 
-    # Count non-default scores (assuming default is 5,5)
-    completed = sum(1 for cap_id, data in scores.items()
-                    if data["importance"] != 5 or data["readiness"] != 5)
+    # Count capabilities scored on both I and R
+    completed = analysis.scored
 
     # Ensure progress doesn't exceed 1.0
     progress_value = min(completed / total_capabilities, 1.0) if total_capabilities > 0 else 0
@@ -413,9 +422,8 @@ def render_progress_sidebar(scores: Dict):
     st.sidebar.metric("Assessment Progress", f"{completed}/{total_capabilities}")
     st.sidebar.progress(progress_value)
 
-    # Calculate urgent gaps
-    urgent_count = sum(1 for cap_id, data in scores.items()
-                      if data["importance"] >= 7 and data["readiness"] <= 4)
+    # Urgent gaps are counted as scores change
+    urgent_count = analysis.urgent
 
     if urgent_count > 0:
         st.sidebar.warning(f"⚠️ {urgent_count} Urgent Gaps Identified")
@@ -423,12 +431,8 @@ def render_progress_sidebar(scores: Dict):
     # Phase-level summary
     st.sidebar.subheader("Phase Summary")
     for phase in PHASES:
-        phase_caps = [cap_id for cap_id, data in scores.items()
-                     if data.get("phase_id") == phase["id"]]
-        if phase_caps:
-            phase_urgent = sum(1 for cap_id in phase_caps
-                             if scores[cap_id]["importance"] >= 7
-                             and scores[cap_id]["readiness"] <= 4)
+        if analysis.phase_total[phase["id"]]:
+            phase_urgent = analysis.phase_urgent[phase["id"]]
 
             icon = "🔴" if phase_urgent > 0 else "🟢"
             st.sidebar.write(f"{icon} {phase['name'].replace(chr(10), ' ')}: {phase_urgent} urgent")
@@ -0,0 +1,124 @@
+# modules/kb_index.py
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Dict, Optional, Tuple
+
+from grid_layout import GRID_LAYOUT, PHASES
+
+# Record fields copied from a capability's phase (see capability_record)
+PHASE_FIELDS = {"phase_name": "name", "phase_id": "id", "phase_color": "color", "agentic_goal": "agentic_goal"}
+
+
+class KnowledgeBaseIndex(Mapping):
+    """
+    Read-only index over the knowledge base, built once at load time.
+
+    Replaces the nested scans over knowledge_base["phases"] with O(1) lookups
+    by capability id, phase, agent and assessment-grid position. It is also
+    a Mapping over the raw KB's top-level keys, so code that reads
+    knowledge_base["phases"] or .get("agent_inventory") keeps working.
+
+    Functions that take a knowledge_base accept either form; of() returns
+    the index for a raw dict, rebuilding only when given a different dict.
+    The KB is treated as immutable once indexed.
+    """
+
+    _last: Tuple[Optional[dict], Optional["KnowledgeBaseIndex"]] = (None, None)
+
+    def __init__(self, knowledge_base: dict):
+        self.raw = knowledge_base
+
+        capabilities = {}
+        records = {}
+        phases = {}
+        phase_capabilities = {}
+        agents: Dict[str, list] = {}
+        for phase in knowledge_base.get("phases", []):
+            phases[phase["id"]] = MappingProxyType(phase)
+            phase_capabilities[phase["id"]] = tuple(
+                MappingProxyType(cap) for cap in phase.get("capabilities", [])
+            )
+            for cap in phase.get("capabilities", []):
+                # First occurrence wins, as with the old linear scan
+                if cap["id"] in capabilities:
+                    continue
+                capabilities[cap["id"]] = MappingProxyType(cap)
+                records[cap["id"]] = MappingProxyType({
+                    **cap, **{field: phase[key] for field, key in PHASE_FIELDS.items()}
+                })
+                mapping = cap.get("agent_mapping", {})
+                for agent in mapping.get("primary_agents", []) + mapping.get("supporting_agents", []):
+                    agents.setdefault(agent, [])
+                    if cap["id"] not in agents[agent]:
+                        agents[agent].append(cap["id"])
+
+        grid = {}
+        grid_phases: Dict[str, list] = {phase["id"]: [] for phase in PHASES}
+        for row_idx, row in enumerate(GRID_LAYOUT):
+            for col_idx, cell in enumerate(row):
+                if cell is not None:
+                    grid[(row_idx, col_idx)] = MappingProxyType({
+                        **cell, "row": row_idx, "col": col_idx, "phase_color": PHASES[col_idx]["color"]
+                    })
+        # Phase order is grid order (row by row), as get_capabilities_by_phase returned it
+        for position in sorted(grid):
+            grid_phases.setdefault(grid[position]["phase_id"], []).append(grid[position])
+
+        self._capabilities = MappingProxyType(capabilities)
+        self._records = MappingProxyType(records)
+        self._phases = MappingProxyType(phases)
+        self._phase_capabilities = MappingProxyType(phase_capabilities)
+        self._agents = MappingProxyType({agent: tuple(ids) for agent, ids in agents.items()})
+        self._grid = MappingProxyType(grid)
+        self._grid_phases = MappingProxyType({phase_id: tuple(cells) for phase_id, cells in grid_phases.items()})
+
+    @classmethod
+    def of(cls, knowledge_base) -> "KnowledgeBaseIndex":
+        """The index for knowledge_base (itself if it already is one)."""
+        if isinstance(knowledge_base, KnowledgeBaseIndex):
+            return knowledge_base
+        raw, index = cls._last
+        if raw is not knowledge_base:
+            index = cls(knowledge_base)
+            cls._last = (knowledge_base, index)
+        return index
+
+    # Mapping over the raw KB
+    def __getitem__(self, key):
+        return self.raw[key]
+
+    def __iter__(self):
+        return iter(self.raw)
+
+    def __len__(self):
+        return len(self.raw)
+
+    def capability(self, cap_id: str) -> Optional[Mapping]:
+        """The KB capability entry, or None."""
+        return self._capabilities.get(cap_id)
+
+    def capability_record(self, cap_id: str) -> Optional[Mapping]:
+        """The capability entry plus its phase's name, id, color and agentic goal."""
+        return self._records.get(cap_id)
+
+    def capability_ids(self) -> Tuple[str, ...]:
+        return tuple(self._capabilities)
+
+    def phase(self, phase_id: str) -> Optional[Mapping]:
+        return self._phases.get(phase_id)
+
+    def phase_capabilities(self, phase_id: str) -> Tuple[Mapping, ...]:
+        """KB capabilities of a phase, in KB order."""
+        return self._phase_capabilities.get(phase_id, ())
+
+    def agent_capabilities(self, agent: str) -> Tuple[str, ...]:
+        """Ids of capabilities that list agent as a primary or supporting agent."""
+        return self._agents.get(agent, ())
+
+    def grid_cell(self, row: int, col: int) -> Optional[Mapping]:
+        """The assessment-grid card at (row, col), or None for an empty cell."""
+        return self._grid.get((row, col))
+
+    def grid_phase(self, phase_id: str) -> Tuple[Mapping, ...]:
+        """Assessment-grid cards of a phase, in grid order."""
+        return self._grid_phases.get(phase_id, ())
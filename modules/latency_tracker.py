@@ -0,0 +1,68 @@
+# modules/latency_tracker.py
+import math
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+import config
+
+
+class RollingPercentiles:
+    """
+    Rolling window of recent samples per section type, with nearest-rank
+    percentiles once min_samples are recorded. Kept in memory per process.
+    """
+
+    def __init__(self, window: int, min_samples: int):
+        self.window = window
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._samples: Dict[str, deque] = {}
+
+    def record(self, section_type: str, value: float):
+        with self._lock:
+            samples = self._samples.setdefault(section_type, deque(maxlen=self.window))
+            samples.append(value)
+
+    def percentile(self, section_type: str, fraction: float) -> Optional[float]:
+        """Nearest-rank percentile, or None until min_samples are recorded."""
+        with self._lock:
+            samples = sorted(self._samples.get(section_type, ()))
+        if len(samples) < self.min_samples:
+            return None
+        rank = max(math.ceil(fraction * len(samples)) - 1, 0)
+        return samples[rank]
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Sample count and p50/p95 per section type."""
+        with self._lock:
+            section_types = list(self._samples)
+        return {
+            section_type: {
+                "samples": len(self._samples.get(section_type, ())),
+                "p50": self.percentile(section_type, 0.50),
+                "p95": self.percentile(section_type, 0.95),
+            }
+            for section_type in section_types
+        }
+
+
+class LatencyTracker(RollingPercentiles):
+    """
+    Rolling window of recent Claude call latencies (seconds) per section type.
+
+    Feeds request hedging: once enough samples exist, a call still running
+    past the observed percentile gets a duplicate request. Latency is a
+    property of this worker's recent traffic, so it is not shared.
+    """
+
+
+# Process-wide latency history shared by every report
+synthesis_latency = LatencyTracker(
+    window=config.LATENCY_WINDOW,
+    min_samples=config.HEDGE_MIN_SAMPLES
+)
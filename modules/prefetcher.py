@@ -0,0 +1,145 @@
+# modules/prefetcher.py
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Dict, Optional, Tuple
+
+import config
+from modules.score_analyzer import analyze_capabilities, calculate_gap_score, categorize_priority
+from modules.report_generator import (
+    find_capability_in_kb,
+    format_gap_context,
+    render_template_section,
+    VALID_AGENTS
+)
+from modules.synthesis_engine import synthesis_engine
+from modules.synthesis_library import synthesis_library
+
+# (capability_id, importance, readiness)
+ScoreKey = Tuple[str, int, int]
+
+
+class SynthesisPrefetcher:
+    """
+    Speculative urgent_gap synthesis for one assessment session.
+
+    update() runs on every form rerun with the current scores. A card whose
+    scores make it an URGENT_GAP gets its section synthesized on the engine
+    once the scores have been left alone for the debounce period; changing
+    them cancels the pending call (before the debounce, at no API cost).
+    Finished sections are kept by score tuple, so generate_report_concurrent
+    can assemble them instead of waiting, and sections still in flight are
+    joined through single-flight rather than requested twice.
+    """
+
+    def __init__(
+        self,
+        knowledge_base: dict,
+        engine=None,
+        debounce_seconds: float = None,
+        max_pending: int = None
+    ):
+        self.knowledge_base = knowledge_base
+        self.engine = engine or synthesis_engine
+        self.debounce_seconds = config.PREFETCH_DEBOUNCE_SECONDS if debounce_seconds is None else debounce_seconds
+        self.max_pending = config.PREFETCH_MAX_PENDING if max_pending is None else max_pending
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Tuple[ScoreKey, Future]] = {}
+        self._results: Dict[ScoreKey, str] = {}
+        self.started = 0
+        self.cancelled = 0
+
+    def update(self, scores: Dict[str, Dict]):
+        """Reconcile speculative work with the form's current scores."""
+        wanted = {}
+        for cap_id, data in scores.items():
+            importance, readiness = data.get("importance", 0), data.get("readiness", 0)
+            if importance > 0 and readiness > 0 and categorize_priority(importance, readiness) == "URGENT_GAP":
+                wanted[cap_id] = (cap_id, importance, readiness)
+
+        stale, started = [], []
+        with self._lock:
+            for cap_id, (key, future) in list(self._pending.items()):
+                if wanted.get(cap_id) != key:
+                    stale.append(future)
+                    del self._pending[cap_id]
+                    self.cancelled += 1
+
+            # Most urgent first, in case the pending cap is reached
+            for cap_id, key in sorted(wanted.items(), key=lambda item: -calculate_gap_score(*item[1][1:])):
+                if key in self._results or cap_id in self._pending:
+                    continue
+                if len(self._pending) >= self.max_pending:
+                    break
+                if synthesis_library.lookup("urgent_gap", *key) is not None:
+                    continue
+                context = self._gap_context(key)
+                if context is None:
+                    continue
+
+                future = self.engine.submit(self._prefetch(context))
+                self._pending[cap_id] = (key, future)
+                self.started += 1
+                started.append((cap_id, key, context, future))
+
+        # Outside the lock: callbacks run synchronously on an already-done
+        # future, and cancel() runs them in this thread
+        for cap_id, key, context, future in started:
+            future.add_done_callback(
+                lambda done, cap_id=cap_id, key=key, context=context: self._finished(cap_id, key, context, done)
+            )
+        for future in stale:
+            future.cancel()
+
+    def _gap_context(self, key: ScoreKey) -> Optional[str]:
+        """The same context generate_report_concurrent builds for this gap."""
+        cap_id, importance, readiness = key
+        kb_data = find_capability_in_kb(cap_id, self.knowledge_base)
+        if not kb_data:
+            return None
+        gap = analyze_capabilities(
+            [{"capability_id": cap_id, "importance": importance, "readiness": readiness}],
+            self.knowledge_base
+        )[0]
+        return format_gap_context(gap, kb_data)
+
+    async def _prefetch(self, context: str) -> str:
+        # Debounce: a score still being edited is cancelled during this sleep
+        await asyncio.sleep(self.debounce_seconds)
+        return await self.engine.synthesize("urgent_gap", context, VALID_AGENTS)
+
+    def _finished(self, cap_id: str, key: ScoreKey, context: str, future: Future):
+        with self._lock:
+            if self._pending.get(cap_id, (None, None))[1] is future:
+                del self._pending[cap_id]
+        if future.cancelled() or future.exception() is not None:
+            return
+
+        text = future.result()
+        # Template fallbacks are left for the report to retry
+        if text in (context, render_template_section("urgent_gap", context)):
+            return
+        with self._lock:
+            self._results[key] = text
+
+    def lookup(self, cap_id: str, importance: int, readiness: int) -> Optional[str]:
+        """Finished synthesis for these exact scores, if any."""
+        with self._lock:
+            return self._results.get((cap_id, importance, readiness))
+
+    def cancel_all(self):
+        with self._lock:
+            stale = [future for _, future in self._pending.values()]
+            self.cancelled += len(stale)
+            self._pending.clear()
+        for future in stale:
+            future.cancel()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "ready": len(self._results),
+                "started": self.started,
+                "cancelled": self.cancelled,
+            }
@@ -0,0 +1,155 @@
+# modules/rate_limiter.py
+import asyncio
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+
+import config
+from modules.file_lock import locked_file, read_json, write_json_atomic
+
+# Longest single sleep while waiting for capacity, so waiters re-check often
+MAX_WAIT_SLICE = 1.0
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough input token estimate (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+class TokenBucketRateLimiter:
+    """
+    Token-bucket limiter for Claude requests/min, input tokens/min and
+    output tokens/min.
+
+    Bucket levels live in a JSON state file on the storage volume guarded by
+    a file lock, so every thread and every Streamlit worker process draws
+    from the same budget. Buckets refill continuously at limit/60 per second
+    and hold at most one minute of capacity, matching how the API meters.
+
+    Output tokens are reserved at max_tokens when a request starts and the
+    unused part is refunded once the real usage is known.
+    """
+
+    def __init__(
+        self,
+        state_path: str,
+        requests_per_minute: int,
+        input_tokens_per_minute: int,
+        output_tokens_per_minute: int
+    ):
+        self.state_path = Path(state_path)
+        self.limits = {
+            "requests": requests_per_minute,
+            "input_tokens": input_tokens_per_minute,
+            "output_tokens": output_tokens_per_minute,
+        }
+        self._thread_lock = threading.Lock()
+
+    @property
+    def lock_path(self) -> Path:
+        return self.state_path.parent / f".{self.state_path.name}.lock"
+
+    def _load_state(self, now: float) -> dict:
+        state = read_json(self.state_path, default=None)
+        if not isinstance(state, dict) or "levels" not in state:
+            state = {"updated_at": now, "levels": {}}
+
+        # Start full; new or changed limits are clamped to capacity
+        for bucket, limit in self.limits.items():
+            level = state["levels"].get(bucket, limit)
+            state["levels"][bucket] = min(level, limit)
+        return state
+
+    def _refill(self, state: dict, now: float):
+        elapsed = max(now - state["updated_at"], 0)
+        for bucket, limit in self.limits.items():
+            if limit > 0:
+                level = state["levels"][bucket] + elapsed * limit / 60.0
+                state["levels"][bucket] = min(level, limit)
+        state["updated_at"] = now
+
+    def try_acquire(self, input_tokens: int, output_tokens: int) -> float:
+        """
+        Take capacity for one request if all buckets have enough.
+        Returns 0 on success, otherwise the seconds until it should fit.
+        """
+        needs = {"requests": 1, "input_tokens": input_tokens, "output_tokens": output_tokens}
+
+        with self._thread_lock, locked_file(self.lock_path):
+            now = time.time()
+            state = self._load_state(now)
+            self._refill(state, now)
+
+            wait = 0.0
+            for bucket, limit in self.limits.items():
+                if limit <= 0:
+                    continue  # Limit disabled
+                # A request larger than the bucket waits for a full bucket
+                need = min(needs[bucket], limit)
+                shortfall = need - state["levels"][bucket]
+                if shortfall > 0:
+                    wait = max(wait, shortfall * 60.0 / limit)
+
+            if wait == 0:
+                for bucket, limit in self.limits.items():
+                    if limit > 0:
+                        state["levels"][bucket] -= min(needs[bucket], limit)
+
+            write_json_atomic(self.state_path, state)
+
+        return wait
+
+    def acquire(self, input_tokens: int, output_tokens: int) -> Tuple[int, int]:
+        """Block until the request fits; returns the reservation made."""
+        while True:
+            wait = self.try_acquire(input_tokens, output_tokens)
+            if wait == 0:
+                return input_tokens, output_tokens
+            time.sleep(min(wait, MAX_WAIT_SLICE))
+
+    async def acquire_async(self, input_tokens: int, output_tokens: int) -> Tuple[int, int]:
+        """
+        Async acquire: waits without blocking the event loop. The locked
+        read-modify-write of the shared state file runs on a worker thread.
+        """
+        while True:
+            wait = await asyncio.to_thread(self.try_acquire, input_tokens, output_tokens)
+            if wait == 0:
+                return input_tokens, output_tokens
+            await asyncio.sleep(min(wait, MAX_WAIT_SLICE))
+
+    def record_usage(self, reservation: Tuple[int, int], input_tokens: int, output_tokens: int):
+        """Settle a reservation against the tokens the API actually billed."""
+        reserved_input, reserved_output = reservation
+        adjustments = {
+            "input_tokens": reserved_input - input_tokens,
+            "output_tokens": reserved_output - output_tokens,
+        }
+
+        with self._thread_lock, locked_file(self.lock_path):
+            now = time.time()
+            state = self._load_state(now)
+            self._refill(state, now)
+            for bucket, delta in adjustments.items():
+                limit = self.limits[bucket]
+                if limit > 0:
+                    # Under-estimates may push a bucket negative (debt)
+                    state["levels"][bucket] = min(state["levels"][bucket] + delta, limit)
+            write_json_atomic(self.state_path, state)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Current bucket levels, refilled to now (read-only)."""
+        now = time.time()
+        state = self._load_state(now)
+        self._refill(state, now)
+        return dict(state["levels"])
+
+
+# Process-wide limiter; state is shared with other workers via the volume
+claude_rate_limiter = TokenBucketRateLimiter(
+    state_path=config.RATE_LIMIT_STATE_PATH,
+    requests_per_minute=config.CLAUDE_REQUESTS_PER_MINUTE,
+    input_tokens_per_minute=config.CLAUDE_INPUT_TOKENS_PER_MINUTE,
+    output_tokens_per_minute=config.CLAUDE_OUTPUT_TOKENS_PER_MINUTE
+)
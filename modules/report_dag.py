@@ -0,0 +1,201 @@
+# modules/report_dag.py
+from typing import Callable, Dict, List, Optional
+
+from modules.report_generator import (
+    fix_all_bullet_sections,
+    sanitize_branding,
+    validate_report,
+    VALID_AGENTS
+)
+from modules.synthesis_engine import synthesis_engine
+
+STATIC = "static"
+TEMPLATE = "template"
+LLM = "llm"
+
+SYNTHESIZING = "*Synthesizing...*"
+
+
+def postprocess_section(markdown: str) -> str:
+    """Per-section equivalent of the whole-report clean-up passes."""
+    # Fix bullet formatting (ensure bullets on separate lines)
+    markdown = fix_all_bullet_sections(markdown)
+    # Sanitize branding (remove Zuora except MCP references)
+    return sanitize_branding(markdown)
+
+
+def format_validation_warnings(warnings: List[str]) -> str:
+    """Report Validation Warnings block (empty when there are none)."""
+    if not warnings:
+        return ""
+    lines = "".join(f"- {warning}\n" for warning in warnings)
+    return f"\n\n---\n\n## Report Validation Warnings\n\n{lines}"
+
+
+class SectionNode:
+    """
+    One section of a report.
+
+    STATIC nodes are fixed text. TEMPLATE nodes call render(results) once
+    every node in depends_on has finished. LLM nodes synthesize
+    (section_type, context) - or use precomputed text - and wrap(text) turns
+    the synthesis into the section's markdown (text is None if it failed;
+    return "" to leave the section out).
+    """
+
+    def __init__(
+        self,
+        key: str,
+        kind: str,
+        text: str = "",
+        render: Optional[Callable[[Dict[str, str]], str]] = None,
+        section_type: str = None,
+        context: str = None,
+        wrap: Optional[Callable[[Optional[str]], str]] = None,
+        precomputed: Optional[str] = None,
+        depends_on: tuple = ()
+    ):
+        self.key = key
+        self.kind = kind
+        self.text = text
+        self.render = render
+        self.section_type = section_type
+        self.context = context
+        self.wrap = wrap or (lambda synthesis: synthesis or "")
+        self.precomputed = precomputed
+        self.depends_on = tuple(depends_on)
+
+
+class ReportDAG:
+    """
+    A report described as sections in document order plus their dependencies.
+
+    run() finishes nodes in dependency waves: static and template nodes as
+    soon as their inputs are ready, and every ready LLM node together in one
+    synthesize_many call on the async engine (concurrent, batched, under the
+    report deadline). Each section is validated and post-processed as it
+    finishes, so streamed and final sections are already clean; the
+    validation warnings collected along the way are available to a template
+    node that depends on the rest (see add_validation).
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, SectionNode] = {}
+        self.results: Dict[str, str] = {}
+        self.texts: Dict[str, str] = {}
+        self.warnings: List[str] = []
+
+    def _add(self, node: SectionNode) -> SectionNode:
+        if node.key in self.nodes:
+            raise ValueError(f"Duplicate report section: {node.key}")
+        missing = [key for key in node.depends_on if key not in self.nodes]
+        if missing:
+            raise ValueError(f"Section {node.key} depends on unknown sections: {missing}")
+        self.nodes[node.key] = node
+        return node
+
+    def static(self, key: str, text: str) -> SectionNode:
+        return self._add(SectionNode(key, STATIC, text=text))
+
+    def template(
+        self,
+        key: str,
+        render: Callable[[Dict[str, str]], str],
+        depends_on: tuple = ()
+    ) -> SectionNode:
+        return self._add(SectionNode(key, TEMPLATE, render=render, depends_on=depends_on))
+
+    def llm(
+        self,
+        key: str,
+        section_type: str,
+        context: str,
+        wrap: Optional[Callable[[Optional[str]], str]] = None,
+        precomputed: Optional[str] = None
+    ) -> SectionNode:
+        return self._add(SectionNode(
+            key, LLM, section_type=section_type, context=context, wrap=wrap, precomputed=precomputed
+        ))
+
+    def add_validation(self, key: str = "validation") -> SectionNode:
+        """Warnings block rendered after every section added so far."""
+        return self.template(
+            key, lambda results: format_validation_warnings(self.warnings), depends_on=tuple(self.nodes)
+        )
+
+    def _finish(self, node: SectionNode, markdown: str):
+        if markdown:
+            for warning in validate_report(markdown):
+                if warning not in self.warnings:
+                    self.warnings.append(warning)
+            markdown = postprocess_section(markdown)
+        self.results[node.key] = markdown
+
+    def run(
+        self,
+        engine=None,
+        on_section_update: Optional[Callable[[str, str], None]] = None,
+        **synthesis_options
+    ) -> Dict[str, str]:
+        """
+        Finish every node; returns section key -> final markdown.
+
+        on_section_update(key, markdown) is called from the calling thread for
+        LLM sections only: once each in document order with a placeholder (or
+        the precomputed text), then with partial text as tokens arrive, and
+        finally with the post-processed section. synthesis_options are passed
+        to engine.synthesize_many (batch_size, retry_budget, deadline, ...).
+        """
+        engine = engine or synthesis_engine
+        llm_nodes = [node for node in self.nodes.values() if node.kind == LLM]
+
+        if on_section_update is not None:
+            # Announce sections in report order so the UI can lay them out
+            for node in llm_nodes:
+                if node.precomputed is not None:
+                    on_section_update(node.key, postprocess_section(node.wrap(node.precomputed)))
+                else:
+                    on_section_update(node.key, node.wrap(SYNTHESIZING))
+
+        on_update = None
+        if on_section_update is not None:
+            def on_update(key, text, done):
+                node = self.nodes[key]
+                if done:
+                    on_section_update(key, postprocess_section(node.wrap(text)))
+                else:
+                    on_section_update(key, node.wrap(text))
+
+        pending = dict(self.nodes)
+        while pending:
+            ready = [node for node in pending.values() if all(key in self.results for key in node.depends_on)]
+            if not ready:
+                raise ValueError(f"Report sections have a dependency cycle: {list(pending)}")
+
+            tasks = {}
+            for node in ready:
+                del pending[node.key]
+                if node.kind == STATIC:
+                    self._finish(node, node.text)
+                elif node.kind == TEMPLATE:
+                    self._finish(node, node.render(self.results))
+                elif node.precomputed is not None:
+                    self.texts[node.key] = node.precomputed
+                    self._finish(node, node.wrap(node.precomputed))
+                else:
+                    tasks[node.key] = (node.section_type, node.context)
+
+            if tasks:
+                synthesized = engine.synthesize_many(
+                    tasks, VALID_AGENTS, on_update=on_update, **synthesis_options
+                )
+                for key in tasks:
+                    if key in synthesized:
+                        self.texts[key] = synthesized[key]
+                    self._finish(self.nodes[key], self.nodes[key].wrap(synthesized.get(key)))
+
+        return self.results
+
+    def assemble(self) -> str:
+        """The finished report: every section in document order."""
+        return "".join(self.results.get(key, "") for key in self.nodes)
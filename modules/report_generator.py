@@ -1,24 +1,27 @@
-import anthropic
 import json
-import os
 import re
 import time
 from typing import Dict, List
 from datetime import datetime
 import config
+from modules.kb_index import KnowledgeBaseIndex
 from modules.score_analyzer import (
     analyze_capabilities,
     create_priority_matrix,
     get_capabilities_by_category,
     get_phase_summary
 )
+from modules.claude_client import make_client
+from modules.synthesis_cache import synthesis_cache, make_cache_key
+from modules.rate_limiter import claude_rate_limiter, estimate_tokens
+from modules.usage_tracker import ReportUsage, usage_tracker
+from modules.retry_policy import RetryBudget, retry_policy, new_report_budget
+from modules.circuit_breaker import CircuitOpenError, claude_breaker
+from modules.token_budget import token_planner
+from modules.single_flight import synthesis_flights
 
-# Simple rate limiter to prevent API overload
-_last_api_call = 0
-_api_call_interval = 0.5  # Minimum 0.5 seconds between calls (120 calls/min max)
-
-# Initialize Claude API client
-client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+# Initialize Claude API client (retries are handled by retry_policy)
+client = make_client()
 
 
 def sanitize_branding(text: str) -> str:
@@ -48,8 +51,9 @@ def sanitize_branding(text: str) -> str:
     for phrase, placeholder in preserved_phrases.items():
         text = text.replace(placeholder, phrase)
 
-    # Clean up any double spaces
-    text = re.sub(r'  +', ' ', text)
+    # Clean up any double spaces (outside fenced code, where indentation matters)
+    parts = re.split(r'(```.*?```)', text, flags=re.DOTALL)
+    text = "".join(part if part.startswith("```") else re.sub(r'  +', ' ', part) for part in parts)
 
     return text
 
@@ -136,43 +140,8 @@ Your job is to CONNECT and CONTEXTUALIZE the provided facts into readable strate
 Write as if briefing a C-level executive - clear, direct, actionable."""
 
 
-def synthesize_with_claude(
-    section_type: str,
-    context_content: str,
-    agents_list: List[str]
-) -> str:
-    """
-    Use Claude to synthesize KB content into strategic prose.
-    Claude can ONLY use information provided in context_content.
-
-    Args:
-        section_type: Type of section (executive_summary, urgent_gap, strength)
-        context_content: Pre-formatted content from KB to synthesize
-        agents_list: List of valid agent names Claude can reference
-
-    Returns:
-        Synthesized prose string
-    """
-
-    prompts = {
-        "executive_summary": """Synthesize this into an executive summary (2-3 paragraphs).
-
-Highlight:
-- Overall readiness posture and key metrics
-- Most critical gaps requiring immediate attention
-- Which O2C phases need the most work
-- The strategic opportunity with AI agents and MCP to close these gaps
-
-{context}
-
-Write for a C-level audience. Be direct and strategic. Focus on gap identification and readiness improvement.""",
-
-        "urgent_gap": """Synthesize this capability gap into a STRUCTURED format.
-
-INPUT:
-{context}
-
-OUTPUT FORMAT (follow exactly):
+# Structured output format for urgent gaps (shared by single and batched prompts)
+URGENT_GAP_OUTPUT_FORMAT = """OUTPUT FORMAT (follow exactly):
 
 **Why This Matters:**
 [2-3 sentences on the business problem - be specific, not generic]
@@ -213,9 +182,30 @@ CRITICAL FORMATTING RULES - READ CAREFULLY:
 7. Only include the MOST relevant items, not everything
 8. Be specific, not generic
 9. Do NOT include timelines in "What's Coming" - just list the capabilities
-""",
+"""
 
-        "strength": """Synthesize this strength into a STRUCTURED format.
+# Section-specific synthesis instructions; {context} is the KB content
+SECTION_PROMPTS = {
+    "executive_summary": """Synthesize this into an executive summary (2-3 paragraphs).
+
+Highlight:
+- Overall readiness posture and key metrics
+- Most critical gaps requiring immediate attention
+- Which O2C phases need the most work
+- The strategic opportunity with AI agents and MCP to close these gaps
+
+{context}
+
+Write for a C-level audience. Be direct and strategic. Focus on gap identification and readiness improvement.""",
+
+    "urgent_gap": """Synthesize this capability gap into a STRUCTURED format.
+
+INPUT:
+{context}
+
+""" + URGENT_GAP_OUTPUT_FORMAT,
+
+    "strength": """Synthesize this strength into a STRUCTURED format.
 
 INPUT:
 {context}
@@ -233,64 +223,299 @@ OUTPUT FORMAT:
 [One sentence on how to maintain this advantage]
 
 Keep it concise - strengths need less detail than gaps."""
-    }
+}
 
-    user_prompt = prompts.get(section_type, prompts["urgent_gap"]).format(
-        context=context_content
-    )
 
-    # Add agents constraint to user prompt
-    user_prompt += f"""
+# Stands in for {context} inside the static instructions. The context itself
+# is sent last, so everything before it is an identical, cacheable prefix.
+CONTEXT_REFERENCE = "(see the INPUT block at the end of this message)"
+
+
+def cacheable(block: dict) -> dict:
+    """Mark a content block as the end of a prompt-cache prefix."""
+    if not config.PROMPT_CACHING_ENABLED:
+        return block
+    return {**block, "cache_control": {"type": "ephemeral"}}
+
+
+def build_synthesis_system() -> List[dict]:
+    """System prompt as a cacheable block (shared by every section type)."""
+    return [cacheable({"type": "text", "text": SYNTHESIS_SYSTEM_PROMPT})]
+
+
+def format_agents_constraint(agents_list: List[str]) -> str:
+    """The valid-agents constraint appended to every synthesis prompt."""
+    return f"""
 
 VALID AGENT NAMES (only reference these):
 {', '.join(agents_list)}
 
 Do NOT reference any agent not in this list."""
 
-    try:
-        # Rate limiting: enforce minimum interval between API calls
-        global _last_api_call
-        current_time = time.time()
-        time_since_last_call = current_time - _last_api_call
-
-        if time_since_last_call < _api_call_interval:
-            sleep_time = _api_call_interval - time_since_last_call
-            time.sleep(sleep_time)
-
-        # Make API call
-        _last_api_call = time.time()
-        response = client.messages.create(
-            model=config.CLAUDE_MODEL,
-            max_tokens=config.CLAUDE_MAX_TOKENS,
-            system=SYNTHESIS_SYSTEM_PROMPT,
-            messages=[
-                {"role": "user", "content": user_prompt}
+
+def build_synthesis_instructions(section_type: str, agents_list: List[str]) -> str:
+    """Static part of a section prompt: template text plus the agents constraint."""
+    template = SECTION_PROMPTS.get(section_type, SECTION_PROMPTS["urgent_gap"])
+    return template.format(context=CONTEXT_REFERENCE) + format_agents_constraint(agents_list)
+
+
+def build_synthesis_messages(section_type: str, context_content: str, agents_list: List[str]) -> List[dict]:
+    """
+    User message for a section: the static instructions first, marked as a
+    cache breakpoint, then the per-report context as its own block.
+    """
+    return [
+        {
+            "role": "user",
+            "content": [
+                cacheable({"type": "text", "text": build_synthesis_instructions(section_type, agents_list)}),
+                {"type": "text", "text": f"INPUT:\n{context_content}"}
             ]
-        )
-        return response.content[0].text
+        }
+    ]
+
+
+def message_text(messages: List[dict]) -> str:
+    """Concatenated text of a messages list (for token estimates and logging)."""
+    return "\n\n".join(
+        block["text"]
+        for message in messages
+        for block in message["content"]
+    )
+
+
+def build_synthesis_prompt(section_type: str, context_content: str, agents_list: List[str]) -> str:
+    """Build the user prompt for a section, including the valid-agents constraint."""
+    return message_text(build_synthesis_messages(section_type, context_content, agents_list))
+
+
+def build_batch_gap_instructions(agents_list: List[str]) -> str:
+    """Static part of the batched gap prompt (identical for every batch)."""
+    return f"""Synthesize EACH capability gap in the INPUT block at the end of this message into a STRUCTURED format.
+
+Use this format for every gap:
+
+{URGENT_GAP_OUTPUT_FORMAT}
+RESPONSE FORMAT:
+Return ONLY a JSON object mapping each capability_id to its formatted section as a markdown string, for example:
+{{"capability_a": "**Why This Matters:**\\n...", "capability_b": "**Why This Matters:**\\n..."}}
+Include every capability_id listed in the INPUT exactly once. Escape newlines inside strings as \\n.""" + format_agents_constraint(agents_list)
 
-    except anthropic.RateLimitError as e:
-        # Handle rate limit errors with exponential backoff
-        print(f"Rate limit hit: {e}. Retrying after delay...")
-        time.sleep(2)  # Wait 2 seconds and retry once
+
+def build_batch_gap_messages(gap_contexts: Dict[str, str], agents_list: List[str]) -> List[dict]:
+    """
+    One user message that synthesizes several urgent gaps at once.
+    The format instructions and agent list are sent once instead of per gap
+    (and cached); Claude answers with a JSON object keyed by capability_id.
+    """
+    gaps_block = "\n\n".join(
+        f"=== capability_id: {cap_id} ===\n{context.strip()}"
+        for cap_id, context in gap_contexts.items()
+    )
+
+    return [
+        {
+            "role": "user",
+            "content": [
+                cacheable({"type": "text", "text": build_batch_gap_instructions(agents_list)}),
+                {"type": "text", "text": f"INPUT ({len(gap_contexts)} capability gaps):\n{gaps_block}"}
+            ]
+        }
+    ]
+
+
+def build_batch_gap_prompt(gap_contexts: Dict[str, str], agents_list: List[str]) -> str:
+    """Full text of the batched gap prompt."""
+    return message_text(build_batch_gap_messages(gap_contexts, agents_list))
+
+
+def parse_batch_response(response_text: str, expected_ids: List[str]) -> Dict[str, str]:
+    """
+    Parse a batched synthesis response into per-gap sections.
+    Returns only the capability_ids that came back as non-empty strings;
+    callers fall back per gap for anything missing.
+    """
+    text = response_text.strip()
+
+    # Sometimes Claude wraps JSON in markdown code blocks
+    if "```json" in text:
+        start = text.find("```json") + 7
+        end = text.find("```", start)
+        text = text[start:end].strip()
+    elif text.startswith("```"):
+        start = text.find("```") + 3
+        end = text.find("```", start)
+        text = text[start:end].strip()
+
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        # Tolerate prose around the object
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end <= start:
+            return {}
         try:
+            data = json.loads(text[start:end + 1])
+        except json.JSONDecodeError:
+            return {}
+
+    if not isinstance(data, dict):
+        return {}
+
+    return {
+        cap_id: data[cap_id].strip()
+        for cap_id in expected_ids
+        if isinstance(data.get(cap_id), str) and data[cap_id].strip()
+    }
+
+
+def synthesis_cache_key(section_type: str, context_content: str, agents_list: List[str]) -> str:
+    """
+    Cache key for a synthesis under the current model configuration.
+
+    Keyed on the fixed CLAUDE_MAX_TOKENS ceiling, not a call's planned
+    max_tokens: the plan moves with every observed length, and a key that
+    moved with it would orphan cache entries and split single-flight and
+    prefetch sharing. Truncated answers are never cached, so a cached
+    answer is complete under any budget.
+    """
+    return make_cache_key(
+        section_type, context_content, agents_list,
+        config.CLAUDE_MODEL, config.CLAUDE_MAX_TOKENS
+    )
+
+
+def synthesize_with_claude(
+    section_type: str,
+    context_content: str,
+    agents_list: List[str],
+    retry_budget: RetryBudget = None,
+    report_usage: ReportUsage = None,
+    max_tokens: int = None
+) -> str:
+    """
+    Use Claude to synthesize KB content into strategic prose.
+    Claude can ONLY use information provided in context_content.
+
+    Args:
+        section_type: Type of section (executive_summary, urgent_gap, strength)
+        context_content: Pre-formatted content from KB to synthesize
+        agents_list: List of valid agent names Claude can reference
+        retry_budget: Retries shared by the whole report (None: per-call limit only)
+        report_usage: Collects token usage and cost for the whole report
+        max_tokens: Output budget from the report's token plan
+            (default: the planner's estimate for this section type)
+
+    Returns:
+        Synthesized prose string
+    """
+
+    system = build_synthesis_system()
+    messages = build_synthesis_messages(section_type, context_content, agents_list)
+
+    if max_tokens is None:
+        max_tokens = token_planner.section_need(section_type)
+
+    # Identical prompts produce interchangeable answers - serve them from cache
+    cache_key = synthesis_cache_key(section_type, context_content, agents_list)
+    cached = synthesis_cache.get(cache_key)
+    if cached is not None:
+        if report_usage is not None:
+            report_usage.add_cache_hit()
+        return cached
+
+    input_estimate = estimate_tokens(SYNTHESIS_SYSTEM_PROMPT + message_text(messages))
+
+    def attempt():
+        # Fail fast while the API is known to be down
+        if not claude_breaker.allow_request():
+            raise CircuitOpenError("Claude circuit breaker is open")
+
+        # Rate limiting: wait for shared RPM/TPM capacity
+        reservation = claude_rate_limiter.acquire(input_estimate, max_tokens)
+        started = time.time()
+        try:
+            # Make API call - static prefix first so it is served from the prompt cache
             response = client.messages.create(
                 model=config.CLAUDE_MODEL,
-                max_tokens=config.CLAUDE_MAX_TOKENS,
-                system=SYNTHESIS_SYSTEM_PROMPT,
-                messages=[
-                    {"role": "user", "content": user_prompt}
-                ]
+                max_tokens=max_tokens,
+                system=system,
+                messages=messages
             )
-            return response.content[0].text
-        except Exception as retry_error:
-            print(f"Retry failed: {retry_error}. Falling back to template.")
-            return context_content
-
+        except Exception as e:
+            release_rate_limit(reservation)
+            claude_breaker.record_failure(e)
+            raise
+        latency = time.time() - started
+        claude_breaker.record_success(latency)
+        settle_rate_limit(reservation, response, section_type, latency, report_usage)
+        token_planner.record(section_type, usage_tokens(response, "output_tokens"))
+        return response
+
+    def call():
+        # Transient errors (429, 529, 5xx, connection) are retried with backoff
+        response = retry_policy.call(attempt, retry_budget, f"{section_type} synthesis")
+        return cache_synthesis_response(cache_key, section_type, response)
+
+    # Identical prompts already in flight (e.g. a workshop generating at once) share one call;
+    # a failure is shared too, and each caller falls back on its own
+    try:
+        text, shared = synthesis_flights.do(cache_key, call)
     except Exception as e:
         # Fallback to template-based if API fails
         print(f"Claude API error: {e}. Falling back to template.")
-        return context_content
+        return render_template_section(section_type, context_content)
+    if shared and report_usage is not None:
+        report_usage.add_coalesced()
+    return text
+
+
+def usage_tokens(response, field: str) -> int:
+    """Read a token count from response.usage, tolerating missing fields."""
+    value = getattr(getattr(response, "usage", None), field, 0)
+    return value if isinstance(value, int) else 0
+
+
+def settle_rate_limit(
+    reservation,
+    response,
+    section_type: str = "",
+    latency_seconds: float = 0.0,
+    report_usage: ReportUsage = None
+):
+    """
+    Refund (or charge) the rate limiter for the tokens actually used and
+    record the usage, including prompt-cache writes and reads.
+    Cache reads do not count against the input-token limit; cache writes do.
+    """
+    usage = usage_tracker.record(response, section_type, latency_seconds, report_usage)
+    input_tokens = usage["input_tokens"] + usage["cache_creation_input_tokens"]
+    output_tokens = usage["output_tokens"]
+    if input_tokens or output_tokens:
+        claude_rate_limiter.record_usage(reservation, input_tokens, output_tokens)
+
+
+def release_rate_limit(reservation):
+    """Return a failed request's token reservation (the request itself still counts)."""
+    claude_rate_limiter.record_usage(reservation, 0, 0)
+
+
+def cache_synthesis_response(cache_key: str, section_type: str, response) -> str:
+    """
+    Store a successful synthesis in the response cache and return its text.
+    Answers cut off by a tight output budget are returned but not cached.
+    """
+    text = response.content[0].text
+    if getattr(response, "stop_reason", None) == "max_tokens":
+        return text
+    synthesis_cache.put(
+        cache_key,
+        text,
+        section_type=section_type,
+        input_tokens=usage_tokens(response, "input_tokens"),
+        output_tokens=usage_tokens(response, "output_tokens")
+    )
+    return text
 
 
 def format_gap_context(gap: Dict, kb_data: dict) -> str:
@@ -357,6 +582,77 @@ Supporting: {', '.join(supporting) if supporting else 'None documented'}
 """
 
 
+# Labels written by format_gap_context / format_strength_context
+CONTEXT_LABELS = (
+    "CAPABILITY", "PHASE", "SCORES", "PRIORITY", "WHY IT MATTERS",
+    "WHAT'S AVAILABLE TODAY", "WHAT'S WORKING TODAY", "PLATFORM FEATURES",
+    "PRIMARY AI AGENTS", "SUPPORTING AI AGENTS", "MCP TOOLS AVAILABLE",
+    "WHAT'S COMING", "AI AGENTS SUPPORTING THIS",
+)
+
+# Placeholders the context formatters write for empty KB fields
+UNDOCUMENTED = {"None documented", "Not documented"}
+
+
+def parse_context_sections(context_content: str) -> Dict[str, str]:
+    """Split a formatted synthesis context back into its labelled sections."""
+    sections = {}
+    current = None
+    for line in context_content.splitlines():
+        label, sep, rest = line.partition(":")
+        if sep and label in CONTEXT_LABELS:
+            current = label
+            sections[current] = rest.strip()
+        elif current:
+            sections[current] = (sections[current] + "\n" + line).strip()
+    return sections
+
+
+def context_items(section_text: str) -> List[str]:
+    """The '- item' lines of a context section, without placeholders."""
+    items = [line[2:].strip() for line in section_text.splitlines() if line.startswith("- ")]
+    return [item for item in items if item not in UNDOCUMENTED]
+
+
+def render_template_section(section_type: str, context_content: str) -> str:
+    """
+    Render a section straight from its KB context, without Claude.
+    Used in degraded mode (API errors, circuit breaker open) so the report
+    keeps the structured layout. Contexts that are not in the gap/strength
+    format (e.g. the executive summary) are returned as-is.
+    """
+    sections = parse_context_sections(context_content)
+    why = sections.get("WHY IT MATTERS")
+    if not why or why in UNDOCUMENTED:
+        return context_content
+
+    if section_type == "strength":
+        agents = []
+        for line in sections.get("AI AGENTS SUPPORTING THIS", "").splitlines():
+            _, _, names = line.partition(":")
+            agents += [name.strip() for name in names.split(",") if name.strip() and name.strip() not in UNDOCUMENTED]
+
+        parts = ["**Why This Is A Strength:**", why, "", "**What's Working:**"]
+        parts += [f"- {agent}" for agent in agents] or [sections.get("WHAT'S WORKING TODAY", "Not documented")]
+        return "\n".join(parts)
+
+    parts = ["**Why This Matters:**", why, "", "**Available Today:**", ""]
+    for title, label in (
+        ("AI Agents", "PRIMARY AI AGENTS"),
+        ("Platform Features", "PLATFORM FEATURES"),
+        ("MCP Tools", "MCP TOOLS AVAILABLE"),
+    ):
+        items = context_items(sections.get(label, ""))
+        if items:
+            parts += [f"*{title}:*"] + [f"• {item}" for item in items] + [""]
+
+    coming = context_items(sections.get("WHAT'S COMING", ""))
+    if coming:
+        parts += ["**What's Coming:**"] + [f"• {item}" for item in coming]
+
+    return "\n".join(parts).strip()
+
+
 def format_executive_context(
     user_name: str,
     total_scored: int,
@@ -611,7 +907,8 @@ def filter_by_importance_threshold(analyzed_scores: List[Dict]) -> List[Dict]:
 def generate_strategic_report(
     scores: List[Dict],
     knowledge_base: dict,
-    customer_context: dict = None
+    customer_context: dict = None,
+    report_usage: ReportUsage = None
 ) -> str:
     """
     Generate comprehensive strategic report.
@@ -645,59 +942,100 @@ def generate_strategic_report(
                 report += f"**Email:** {email}\n\n"
             report += "---\n\n"
 
+    # Imported here: the DAG engine builds on this module
+    from modules.report_dag import ReportDAG
+    from modules.synthesis_engine import synthesis_engine
+    from modules.synthesis_library import synthesis_library
+
+    # Sections run as a DAG: the summary and every gap synthesize concurrently,
+    # and each is validated and post-processed as it finishes
+    dag = ReportDAG()
+    dag.static("title", report)
+
     # Section 1: Executive Summary (Claude synthesis)
     user_name = customer_context.get('user', 'User') if customer_context else 'User'
-    report += generate_executive_summary(analyzed_capabilities, priority_matrix, urgent_gaps, critical_gaps, user_name)
+    dag.llm(
+        "executive_summary", "executive_summary",
+        executive_summary_context(analyzed_capabilities, urgent_gaps, critical_gaps, user_name),
+        wrap=lambda synthesis: f"## 1. Executive Summary\n\n{synthesis or 'Unable to generate summary.'}\n\n---\n\n"
+    )
 
     # Section 2: Priority Matrix Analysis (Template-based)
-    report += generate_priority_matrix_section(priority_matrix, phase_summary)
+    dag.static("priority_matrix", generate_priority_matrix_section(priority_matrix, phase_summary))
 
-    # Section 3: Urgent Gaps - Detailed Analysis (Template-based from KB)
-    report += generate_urgent_gaps_section(urgent_gaps, knowledge_base)
+    # Section 3: Urgent Gaps - Detailed Analysis (library entry or Claude synthesis per gap)
+    if not urgent_gaps:
+        dag.static("urgent_gaps", "## 3. Urgent Gaps - Detailed Analysis\n\nNo urgent gaps identified.\n\n---\n\n")
+    else:
+        dag.static("urgent_gaps", "## 3. Urgent Gaps - Detailed Analysis\n\n"
+                   f"The following {len(urgent_gaps)} capabilities require immediate attention:\n\n")
+        for cap in urgent_gaps:
+            kb_cap = find_capability_in_kb(cap['capability_id'], knowledge_base)
+            if not kb_cap:
+                continue
+            dag.llm(
+                cap['capability_id'], "urgent_gap", format_gap_context(cap, kb_cap),
+                wrap=lambda synthesis, cap=cap: format_urgent_gap_entry(cap, synthesis) if synthesis else "",
+                precomputed=synthesis_library.lookup(
+                    "urgent_gap", cap['capability_id'], cap['importance'], cap['readiness']
+                )
+            )
 
     # Section 4: Getting Started with Zuora MCP (STATIC)
-    report += "## 4. Getting Started with Zuora MCP\n\n" + MCP_GUIDE_SECTION + "\n\n"
+    dag.static("mcp_guide", "## 4. Getting Started with Zuora MCP\n\n" + MCP_GUIDE_SECTION + "\n\n")
 
     # Section 5: Building Your First Zuora Agent (STATIC)
-    report += "## 5. Building Your First Zuora Agent\n\n" + AGENT_GUIDE_SECTION + "\n\n"
+    dag.static("agent_guide", "## 5. Building Your First Zuora Agent\n\n" + AGENT_GUIDE_SECTION + "\n\n")
+
+    # Validation warnings collected from every section
+    dag.add_validation()
 
-    # Validate report
-    warnings = validate_report(report)
-    if warnings:
-        report += "\n\n---\n\n## Report Validation Warnings\n\n"
-        for warning in warnings:
-            report += f"- {warning}\n"
+    deadline = time.time() + config.REPORT_DEADLINE_SECONDS if config.REPORT_DEADLINE_SECONDS > 0 else None
+    dag.run(
+        synthesis_engine, batch_size=config.SYNTHESIS_BATCH_SIZE,
+        retry_budget=new_report_budget(), deadline=deadline, report_usage=report_usage
+    )
+    return dag.assemble()
 
-    # Fix bullet formatting (ensure bullets on separate lines)
-    report = fix_all_bullet_sections(report)
 
-    # Sanitize branding (remove Zuora except MCP references)
-    report = sanitize_branding(report)
+def executive_summary_context(analyzed_capabilities: List[Dict], urgent_gaps: List[Dict],
+                              critical_gaps: List[Dict], user_name: str = "User") -> str:
+    """Executive summary context with the report's aggregate metrics."""
+    total_caps = len(analyzed_capabilities)
 
-    return report
+    avg_importance = sum(c['importance'] for c in analyzed_capabilities) / total_caps if total_caps > 0 else 0
+    avg_readiness = sum(c['readiness'] for c in analyzed_capabilities) / total_caps if total_caps > 0 else 0
+
+    return format_executive_context(
+        user_name, total_caps, urgent_gaps, critical_gaps,
+        avg_importance, avg_readiness
+    )
+
+
+def format_urgent_gap_entry(cap: Dict, synthesis: str) -> str:
+    """One urgent gap in the strategic report: header, scores and synthesis."""
+    entry = f"### {cap['capability_name']}\n"
+    entry += f"**Phase:** {cap['phase_name']} | "
+    entry += f"**Scores:** I={cap['importance']}, R={cap['readiness']}, Gap={cap['gap_score']}\n\n"
+    entry += synthesis + "\n\n"
+    entry += "---\n\n"
+    return entry
 
 
 def generate_executive_summary(analyzed_capabilities: List[Dict], priority_matrix: Dict,
                                urgent_gaps: List[Dict], critical_gaps: List[Dict],
-                               user_name: str = "User") -> str:
+                               user_name: str = "User", retry_budget: RetryBudget = None,
+                               report_usage: ReportUsage = None) -> str:
     """
     Generate executive summary using Claude synthesis.
     Focus on gap identification and overall readiness posture.
     """
-    # Calculate facts
-    total_caps = len(analyzed_capabilities)
-
-    avg_importance = sum(c['importance'] for c in analyzed_capabilities) / total_caps if total_caps > 0 else 0
-    avg_readiness = sum(c['readiness'] for c in analyzed_capabilities) / total_caps if total_caps > 0 else 0
-
     # Format context for Claude
-    exec_context = format_executive_context(
-        user_name, total_caps, urgent_gaps, critical_gaps,
-        avg_importance, avg_readiness
-    )
+    exec_context = executive_summary_context(analyzed_capabilities, urgent_gaps, critical_gaps, user_name)
 
     # Synthesize with Claude
-    synthesis = synthesize_with_claude("executive_summary", exec_context, VALID_AGENTS)
+    synthesis = synthesize_with_claude("executive_summary", exec_context, VALID_AGENTS,
+                                       retry_budget, report_usage)
 
     summary = "## 1. Executive Summary\n\n"
     summary += synthesis + "\n\n"
@@ -719,25 +1057,37 @@ def generate_priority_matrix_section(priority_matrix: Dict, phase_summary: Dict)
     section += f"| Maintain | {priority_matrix.get('MAINTAIN', 0)} | Medium importance (4-6), High readiness (≥7) |\n"
     section += f"| Deprioritize | {priority_matrix.get('DEPRIORITIZE', 0)} | Low importance (≤3) |\n\n"
 
-    section += "### Phase-Level Summary\n\n"
-    section += "| Phase | Avg Importance | Avg Readiness | Avg Gap Score | Urgent Gaps | Strengths |\n"
-    section += "|-------|----------------|---------------|---------------|-------------|----------|\n"
-
-    for phase_id, data in phase_summary.items():
-        section += f"| {data['phase_name']} | {data['avg_importance']:.1f} | {data['avg_readiness']:.1f} | "
-        section += f"{data['avg_gap_score']:.1f} | {data['urgent_count']} | {data['strength_count']} |\n"
+    section += format_phase_table(phase_summary)
 
     section += "\n---\n\n"
     return section
 
 
-def generate_urgent_gaps_section(urgent_gaps: List[Dict], knowledge_base: dict) -> str:
+def format_phase_table(phase_summary: Dict) -> str:
+    """Phase-level summary table (averages and counts per O2C phase)."""
+    table = "### Phase-Level Summary\n\n"
+    table += "| Phase | Avg Importance | Avg Readiness | Avg Gap Score | Urgent Gaps | Strengths |\n"
+    table += "|-------|----------------|---------------|---------------|-------------|----------|\n"
+
+    for phase_id, data in phase_summary.items():
+        table += f"| {data['phase_name']} | {data['avg_importance']:.1f} | {data['avg_readiness']:.1f} | "
+        table += f"{data['avg_gap_score']:.1f} | {data['urgent_count']} | {data['strength_count']} |\n"
+
+    return table
+
+
+def generate_urgent_gaps_section(urgent_gaps: List[Dict], knowledge_base: dict,
+                                 retry_budget: RetryBudget = None,
+                                 report_usage: ReportUsage = None) -> str:
     """
     Generate urgent gaps section using Claude synthesis.
     """
     if not urgent_gaps:
         return "## 3. Urgent Gaps - Detailed Analysis\n\nNo urgent gaps identified.\n\n---\n\n"
 
+    # Imported here: the library module builds on this one
+    from modules.synthesis_library import synthesis_library
+
     section = "## 3. Urgent Gaps - Detailed Analysis\n\n"
     section += f"The following {len(urgent_gaps)} capabilities require immediate attention:\n\n"
 
@@ -747,24 +1097,30 @@ def generate_urgent_gaps_section(urgent_gaps: List[Dict], knowledge_base: dict)
         if not kb_cap:
             continue
 
-        # Format context and synthesize with Claude
-        context = format_gap_context(cap, kb_cap)
-        synthesis = synthesize_with_claude("urgent_gap", context, VALID_AGENTS)
+        # Serve the precomputed synthesis if built, else synthesize with Claude
+        synthesis = synthesis_library.lookup(
+            "urgent_gap", cap['capability_id'], cap['importance'], cap['readiness']
+        )
+        if synthesis is None:
+            context = format_gap_context(cap, kb_cap)
+            synthesis = synthesize_with_claude("urgent_gap", context, VALID_AGENTS,
+                                               retry_budget, report_usage)
 
-        section += f"### {cap['capability_name']}\n"
-        section += f"**Phase:** {cap['phase_name']} | "
-        section += f"**Scores:** I={cap['importance']}, R={cap['readiness']}, Gap={cap['gap_score']}\n\n"
-        section += synthesis + "\n\n"
-        section += "---\n\n"
+        section += format_urgent_gap_entry(cap, synthesis)
 
     return section
 
 
-def generate_strengths_section(strengths: List[Dict], knowledge_base: dict) -> str:
+def generate_strengths_section(strengths: List[Dict], knowledge_base: dict,
+                               retry_budget: RetryBudget = None,
+                               report_usage: ReportUsage = None) -> str:
     """Generate strengths section using Claude synthesis."""
     if not strengths:
         return "## 4. Strengths to Protect\n\nNo major strengths identified (High I + High R).\n\n---\n\n"
 
+    # Imported here: the library module builds on this one
+    from modules.synthesis_library import synthesis_library
+
     section = "## 4. Strengths to Protect\n\n"
     section += f"The following {len(strengths)} capabilities are organizational strengths to maintain and enhance:\n\n"
 
@@ -773,9 +1129,14 @@ def generate_strengths_section(strengths: List[Dict], knowledge_base: dict) -> s
         if not kb_cap:
             continue
 
-        # Format context and synthesize with Claude
-        context = format_strength_context(cap, kb_cap)
-        synthesis = synthesize_with_claude("strength", context, VALID_AGENTS)
+        # Serve the precomputed synthesis if built, else synthesize with Claude
+        synthesis = synthesis_library.lookup(
+            "strength", cap['capability_id'], cap['importance'], cap['readiness']
+        )
+        if synthesis is None:
+            context = format_strength_context(cap, kb_cap)
+            synthesis = synthesize_with_claude("strength", context, VALID_AGENTS,
+                                               retry_budget, report_usage)
 
         section += f"### {cap['capability_name']}\n"
         section += f"**Phase:** {cap['phase_name']} | "
@@ -788,11 +1149,7 @@ def generate_strengths_section(strengths: List[Dict], knowledge_base: dict) -> s
 
 def find_capability_in_kb(cap_id: str, knowledge_base: dict) -> dict:
     """Find capability in knowledge base by ID."""
-    for phase in knowledge_base.get('phases', []):
-        for cap in phase.get('capabilities', []):
-            if cap.get('id') == cap_id:
-                return cap
-    return None
+    return KnowledgeBaseIndex.of(knowledge_base).capability(cap_id)
 
 
 def validate_report(report_text: str) -> List[str]:
@@ -819,6 +1176,7 @@ def validate_report(report_text: str) -> List[str]:
             # Skip known false positives (section titles, generic terms)
             skip_phrases = [
                 "First Zuora Agent",  # Section title
+                "Building Your First Zuora Agent",
                 "Your First Zuora Agent",
                 "Building Your First Agent",
                 "AI Agent",  # Generic term
@@ -0,0 +1,283 @@
+# modules/report_jobs.py
+import hashlib
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import config
+from modules.concurrent_generator import generate_report_concurrent
+from modules.file_lock import locked_file, read_json, write_json_atomic
+from modules.score_analyzer import analyze_capabilities, create_priority_matrix
+from modules.section_artifacts import SectionArtifacts
+from modules.storage import save_assessment
+from modules.usage_tracker import ReportUsage
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def user_job_prefix(email: str) -> str:
+    """Job ids start with the same hashed email used for user storage."""
+    return hashlib.md5(email.encode()).hexdigest()[:16]
+
+
+class ReportJobQueue:
+    """
+    Runs report generation on a worker pool instead of the Streamlit script run.
+
+    submit() persists a queued job on the volume and returns its id; a worker
+    then runs the whole pipeline (synthesis, priority matrix, save) and records
+    streamed sections, the final status and the assessment id in the job file.
+    The UI only polls status(), so a refresh or disconnect loses nothing and a
+    new session can pick up its job with latest(). The pool size caps how many
+    reports generate at once; later jobs wait as queued.
+
+    Every job records the process that owns it, and that process refreshes
+    heartbeat_at on its queued and running jobs every heartbeat_seconds.
+    Staleness is judged from the heartbeat alone, so any worker can tell
+    that a job left queued or running by a process that died is gone: it is
+    reported as failed once its heartbeat is older than stale_seconds.
+    Every job file write happens under the queue's file lock. Finished jobs
+    (and abandoned ones) are deleted retention_seconds after their last
+    update by a periodic cleanup pass.
+    """
+
+    def __init__(
+        self,
+        jobs_dir: str,
+        max_workers: int,
+        progress_interval: float = 0.5,
+        stale_seconds: float = 600,
+        heartbeat_seconds: float = None,
+        retention_seconds: float = None
+    ):
+        self.jobs_dir = Path(jobs_dir)
+        self.max_workers = max_workers
+        self.progress_interval = progress_interval
+        self.stale_seconds = stale_seconds
+        self.heartbeat_seconds = config.REPORT_JOB_HEARTBEAT_SECONDS if heartbeat_seconds is None else heartbeat_seconds
+        self.retention_seconds = config.REPORT_JOB_RETENTION_SECONDS if retention_seconds is None else retention_seconds
+        # Unique per process, so a restarted worker never adopts old jobs
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stopped = threading.Event()
+        self._futures: Dict[str, Future] = {}
+        self._last_cleanup = 0.0
+
+    def job_path(self, job_id: str) -> Path:
+        return self.jobs_dir / f"{job_id}.json"
+
+    @property
+    def lock_path(self) -> Path:
+        return self.jobs_dir / ".jobs.lock"
+
+    def _save(self, job: Dict):
+        """Write the worker's copy of a job; the worker is alive, so this is a heartbeat too."""
+        now = time.time()
+        job["updated_at"] = job["heartbeat_at"] = now
+        with locked_file(self.lock_path):
+            write_json_atomic(self.job_path(job["job_id"]), job)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="report-job")
+                self._stopped = threading.Event()
+                threading.Thread(
+                    target=self._heartbeat_loop, args=(self._stopped,), name="report-job-heartbeat", daemon=True
+                ).start()
+            return self._executor
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker pool (waiting for queued and running jobs) and its heartbeat."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            stopped = self._stopped
+        if executor is not None:
+            stopped.set()
+            executor.shutdown(wait=wait)
+
+    def _heartbeat_loop(self, stopped: threading.Event):
+        while not stopped.wait(self.heartbeat_seconds):
+            try:
+                self.heartbeat()
+                if time.time() - self._last_cleanup >= self.heartbeat_seconds * 10:
+                    self.cleanup()
+            except Exception as e:
+                print(f"⚠️ Report job heartbeat failed: {e}")
+
+    def heartbeat(self):
+        """Refresh heartbeat_at on every active job this process owns."""
+        with self._lock:
+            job_ids = list(self._futures)
+        with locked_file(self.lock_path):
+            for job_id in job_ids:
+                job = read_json(self.job_path(job_id))
+                if job is None or job.get("owner") != self.owner or job["status"] not in ACTIVE_STATUSES:
+                    continue
+                job["heartbeat_at"] = time.time()
+                write_json_atomic(self.job_path(job_id), job)
+
+    def cleanup(self) -> int:
+        """Delete jobs last updated more than retention_seconds ago; returns how many."""
+        self._last_cleanup = time.time()
+        removed = 0
+        if not self.jobs_dir.exists():
+            return removed
+        cutoff = time.time() - self.retention_seconds
+        with locked_file(self.lock_path):
+            for path in self.jobs_dir.glob("*.json"):
+                job = read_json(path)
+                last_seen = max(job.get("updated_at", 0), job.get("heartbeat_at", 0)) if isinstance(job, dict) else 0
+                if last_seen < cutoff:
+                    path.unlink(missing_ok=True)
+                    removed += 1
+        return removed
+
+    def submit(
+        self,
+        user: dict,
+        scores: List[Dict],
+        all_scores: dict,
+        knowledge_base: dict,
+        section_artifacts: Optional[Dict] = None,
+        prefetcher=None,
+        on_done: Optional[Callable[[Dict], None]] = None
+    ) -> str:
+        """
+        Queue a report for user. scores are in analysis format; all_scores
+        (the raw form scores, zeros included) are what gets saved.
+        on_done is called on the worker with the finished job.
+        """
+        job_id = f"{user_job_prefix(user['email'])}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{uuid.uuid4().hex[:8]}"
+        job = {
+            "job_id": job_id,
+            "user_email": user["email"],
+            "owner": self.owner,
+            "status": "queued",
+            "created_at": time.time(),
+            "scores": scores,
+            "sections": {},
+            "assessment_id": None,
+            "priority_matrix": None,
+            "section_artifacts": None,
+            "error": None,
+        }
+        self._save(job)
+
+        future = self._pool().submit(
+            self._run, job, user, all_scores, knowledge_base, section_artifacts, prefetcher, on_done
+        )
+        with self._lock:
+            self._futures[job_id] = future
+        future.add_done_callback(lambda _: self._forget(job_id))
+        return job_id
+
+    def _forget(self, job_id: str):
+        with self._lock:
+            self._futures.pop(job_id, None)
+
+    def _run(self, job, user, all_scores, knowledge_base, section_artifacts, prefetcher, on_done):
+        job["status"] = "running"
+        job["started_at"] = time.time()
+        self._save(job)
+
+        last_saved = 0.0
+
+        def on_section_update(section_key: str, markdown: str):
+            nonlocal last_saved
+            job["sections"][section_key] = markdown
+            # Throttled: streamed tokens arrive far faster than anyone polls
+            if time.time() - last_saved >= self.progress_interval:
+                self._save(job)
+                last_saved = time.time()
+
+        try:
+            report_usage = ReportUsage()
+            artifacts = SectionArtifacts(section_artifacts)
+            report_md = generate_report_concurrent(
+                scores=job["scores"],
+                knowledge_base=knowledge_base,
+                user_name=user["name"],
+                on_section_update=on_section_update,
+                report_usage=report_usage,
+                prefetcher=prefetcher,
+                artifacts=artifacts
+            )
+
+            priority_matrix = create_priority_matrix(analyze_capabilities(job["scores"], knowledge_base))
+
+            # Save to storage (save all scores, not just valid ones)
+            assessment_id = save_assessment(user, all_scores, report_md,
+                                            usage=report_usage.summary(),
+                                            sections=artifacts.to_dict())
+
+            job.update({
+                "status": "done",
+                "assessment_id": assessment_id,
+                "priority_matrix": priority_matrix,
+                "section_artifacts": artifacts.to_dict(),
+            })
+        except Exception as e:
+            print(f"⚠️ Report job {job['job_id']} failed: {e}")
+            traceback.print_exc()
+            job.update({"status": "failed", "error": str(e)})
+
+        job["finished_at"] = time.time()
+
+        # Before the final save, so pollers that see the result see the hook's effects
+        if on_done is not None:
+            try:
+                on_done(job)
+            except Exception as e:
+                print(f"⚠️ Report job {job['job_id']} completion hook failed: {e}")
+
+        self._save(job)
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        """Current job state, or None if unknown."""
+        job = read_json(self.job_path(job_id))
+        if job is None or not self._is_stale(job):
+            return job
+
+        # Re-check under the lock: the owner may have just written
+        with locked_file(self.lock_path):
+            job = read_json(self.job_path(job_id))
+            if job is not None and self._is_stale(job):
+                job.update({"status": "failed", "error": "Interrupted - the server restarted while generating"})
+                job["finished_at"] = job["updated_at"] = time.time()
+                write_json_atomic(self.job_path(job_id), job)
+        return job
+
+    def _is_stale(self, job: Dict) -> bool:
+        """Active but not heartbeating (older job files only have updated_at)."""
+        heartbeat_at = job.get("heartbeat_at", job.get("updated_at", 0))
+        return job["status"] in ACTIVE_STATUSES and time.time() - heartbeat_at > self.stale_seconds
+
+    def latest(self, email: str) -> Optional[Dict]:
+        """The user's most recently submitted job."""
+        paths = sorted(self.jobs_dir.glob(f"{user_job_prefix(email)}_*.json"))
+        return self.status(paths[-1].stem) if paths else None
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            active = len(self._futures)
+        return {"active": active, "workers": self.max_workers}
+
+
+# Process-wide queue shared by every session
+report_jobs = ReportJobQueue(
+    jobs_dir=config.REPORT_JOBS_DIR,
+    max_workers=config.REPORT_JOB_WORKERS,
+    progress_interval=config.REPORT_JOB_PROGRESS_INTERVAL,
+    stale_seconds=config.REPORT_JOB_STALE_SECONDS,
+    heartbeat_seconds=config.REPORT_JOB_HEARTBEAT_SECONDS,
+    retention_seconds=config.REPORT_JOB_RETENTION_SECONDS
+)
@@ -0,0 +1,173 @@
+# modules/retry_policy.py
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Optional
+
+import anthropic
+
+import config
+
+# Timeouts, conflicts, rate limits, server errors and overloaded
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+def is_retryable(error: Exception) -> bool:
+    """True for transient API failures that are worth another attempt."""
+    if isinstance(error, anthropic.APIConnectionError):
+        return True  # Includes timeouts
+
+    if isinstance(error, anthropic.APIStatusError):
+        # The API tells us explicitly when it knows better
+        should_retry = error.response.headers.get("x-should-retry")
+        if should_retry in ("true", "false"):
+            return should_retry == "true"
+        return error.status_code in RETRYABLE_STATUS_CODES
+
+    return False
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Seconds the server asked us to wait (retry-after-ms / retry-after), if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(float(retry_after_ms) / 1000, 0.0)
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(float(retry_after), 0.0)
+    except ValueError:
+        pass
+    try:
+        # HTTP-date form
+        return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryBudget:
+    """
+    Retries shared by every call made for one report.
+
+    Caps the extra load a single report can add while the API is struggling,
+    so a burst of failures degrades to raw-context fallbacks instead of a
+    retry storm.
+    """
+
+    def __init__(self, max_retries: int):
+        self.max_retries = max_retries
+        self.spent = 0
+        self._lock = threading.Lock()
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget; False once it is exhausted."""
+        with self._lock:
+            if self.spent >= self.max_retries:
+                return False
+            self.spent += 1
+            return True
+
+    @property
+    def remaining(self) -> int:
+        return max(self.max_retries - self.spent, 0)
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with decorrelated jitter for Claude calls.
+
+    Each delay is drawn from [base_delay, 3 x previous delay] and capped at
+    max_delay, which spreads concurrent retriers apart instead of having
+    them wake together. A server-provided retry-after is honored as the
+    minimum wait; if it exceeds max_delay the call gives up instead.
+    """
+
+    def __init__(self, max_attempts: int, base_delay: float, max_delay: float):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def next_delay(self, previous_delay: float) -> float:
+        upper = max(previous_delay, self.base_delay) * 3
+        return min(self.max_delay, random.uniform(self.base_delay, upper))
+
+    def retry_delay(
+        self,
+        error: Exception,
+        attempt: int,
+        previous_delay: float,
+        budget: Optional[RetryBudget] = None
+    ) -> Optional[float]:
+        """Seconds to wait before the next attempt, or None to give up."""
+        if attempt >= self.max_attempts or not is_retryable(error):
+            return None
+
+        delay = self.next_delay(previous_delay)
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            if retry_after > self.max_delay:
+                return None
+            delay = max(delay, retry_after)
+
+        # Spend budget last, only for retries we will actually make
+        if budget is not None and not budget.try_spend():
+            print("Report retry budget exhausted; not retrying.")
+            return None
+        return delay
+
+    def call(self, fn: Callable, budget: Optional[RetryBudget] = None, description: str = "Claude call"):
+        """Run fn, retrying transient failures; re-raises the final error."""
+        attempt, delay = 1, self.base_delay
+        while True:
+            try:
+                return fn()
+            except Exception as e:
+                delay = self.retry_delay(e, attempt, delay, budget)
+                if delay is None:
+                    raise
+                print(f"{description} failed ({e}). Retry {attempt}/{self.max_attempts - 1} in {delay:.1f}s...")
+                time.sleep(delay)
+                attempt += 1
+
+    async def call_async(
+        self,
+        fn: Callable[[], Awaitable],
+        budget: Optional[RetryBudget] = None,
+        description: str = "Claude call"
+    ):
+        """Async call: backoff sleeps yield to the event loop instead of a thread."""
+        attempt, delay = 1, self.base_delay
+        while True:
+            try:
+                return await fn()
+            except Exception as e:
+                delay = self.retry_delay(e, attempt, delay, budget)
+                if delay is None:
+                    raise
+                print(f"{description} failed ({e}). Retry {attempt}/{self.max_attempts - 1} in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+                attempt += 1
+
+
+def new_report_budget() -> RetryBudget:
+    """Fresh retry budget for one report."""
+    return RetryBudget(config.REPORT_RETRY_BUDGET)
+
+
+# Process-wide policy for Claude synthesis calls
+retry_policy = RetryPolicy(
+    max_attempts=config.CLAUDE_RETRY_MAX_ATTEMPTS,
+    base_delay=config.CLAUDE_RETRY_BASE_DELAY,
+    max_delay=config.CLAUDE_RETRY_MAX_DELAY
+)
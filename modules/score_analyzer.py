@@ -1,6 +1,7 @@
 from typing import Dict, List
 import json
 import config
+from modules.kb_index import KnowledgeBaseIndex
 
 TIMELINE_MAPPING = {
     "URGENT_GAP": {
@@ -78,17 +79,8 @@ def analyze_capabilities(scores: List[Dict], knowledge_base: dict) -> List[Dict]
     """
     analyzed = []
 
-    # Create a lookup for capabilities in knowledge base
-    kb_capabilities = {}
-    for phase in knowledge_base.get("phases", []):
-        for cap in phase.get("capabilities", []):
-            kb_capabilities[cap["id"]] = {
-                **cap,
-                "phase_name": phase["name"],
-                "phase_id": phase["id"],
-                "phase_color": phase["color"],
-                "agentic_goal": phase["agentic_goal"]
-            }
+    # Capability records (with phase fields) come from the load-time index
+    index = KnowledgeBaseIndex.of(knowledge_base)
 
     for score_data in scores:
         capability_id = score_data.get("capability_id")
@@ -96,7 +88,7 @@ def analyze_capabilities(scores: List[Dict], knowledge_base: dict) -> List[Dict]
         readiness = score_data.get("readiness", 5)
 
         # Get KB data for this capability
-        kb_data = kb_capabilities.get(capability_id, {})
+        kb_data = index.capability_record(capability_id) or {}
 
         # Calculate priority
         priority_category = categorize_priority(importance, readiness)
@@ -0,0 +1,45 @@
+# modules/section_artifacts.py
+from typing import Dict, Optional
+
+from modules.report_generator import render_template_section, synthesis_cache_key, VALID_AGENTS
+
+
+class SectionArtifacts:
+    """
+    Synthesized sections of one report, each with the hash of its inputs.
+
+    Built from the artifacts saved with a previous assessment, it hands back
+    any section whose inputs are unchanged - a gap whose scores did not move,
+    or the executive summary while its aggregate metrics stay the same - so a
+    regeneration only synthesizes what changed. Every section of the new
+    report is collected for save_assessment(sections=...).
+
+    The input hash is the synthesis cache key, so a model or prompt change
+    also invalidates saved sections.
+    """
+
+    def __init__(self, previous: Optional[Dict[str, Dict]] = None):
+        self.previous = previous or {}
+        self.sections: Dict[str, Dict] = {}
+        self.reused = 0
+
+    def reuse(self, key: str, section_type: str, context_content: str) -> Optional[str]:
+        """Saved text for this section if its inputs are unchanged."""
+        entry = self.previous.get(key)
+        if not entry or entry.get("input_hash") != synthesis_cache_key(section_type, context_content, VALID_AGENTS):
+            return None
+        self.reused += 1
+        return entry["text"]
+
+    def record(self, key: str, section_type: str, context_content: str, text: str):
+        """Keep a finished section; template fallbacks are left to be retried."""
+        if text in (context_content, render_template_section(section_type, context_content)):
+            return
+        self.sections[key] = {
+            "section_type": section_type,
+            "input_hash": synthesis_cache_key(section_type, context_content, VALID_AGENTS),
+            "text": text,
+        }
+
+    def to_dict(self) -> Dict[str, Dict]:
+        return {key: dict(entry) for key, entry in self.sections.items()}
@@ -0,0 +1,95 @@
+# modules/session_analysis.py
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+from modules.score_analyzer import categorize_priority
+
+
+class CapabilityState:
+    """Derived values for one capability's current scores."""
+
+    __slots__ = ("importance", "readiness", "phase_id", "scored", "category")
+
+    def __init__(self, importance: int, readiness: int, phase_id: str):
+        self.importance = importance
+        self.readiness = readiness
+        self.phase_id = phase_id
+        # Only capabilities with both I and R > 0 are assessed
+        self.scored = importance > 0 and readiness > 0
+        self.category = categorize_priority(importance, readiness) if self.scored else None
+
+    @property
+    def key(self) -> Tuple[int, int, str]:
+        return self.importance, self.readiness, self.phase_id
+
+
+class SessionAnalysis:
+    """
+    Running analysis of one session's interactive scores.
+
+    Wraps the session's scores dict ({cap_id: {"importance", "readiness",
+    "phase_id"}}). Cards write through set(), which recomputes only that
+    capability - and only if its scores changed - and adjusts the completion,
+    category and per-phase counts by its old and new contribution.
+    A rerun therefore costs O(changed capabilities), not a rescan per phase.
+
+    Any other change to the scores must replace the dict (loading an
+    assessment, test mode); get_session_analysis rebuilds on a new dict.
+    """
+
+    def __init__(self, scores: Dict[str, Dict]):
+        self.scores = scores
+        self.states: Dict[str, CapabilityState] = {}
+        self.scored = 0
+        self.categories = Counter()
+        self.phase_total = Counter()
+        self.phase_scored = Counter()
+        self.phase_urgent = Counter()
+        for cap_id, data in scores.items():
+            self._apply(cap_id, data.get("importance", 0), data.get("readiness", 0), data.get("phase_id", ""))
+
+    def _count(self, state: CapabilityState, sign: int):
+        if not state.scored:
+            return
+        self.scored += sign
+        self.categories[state.category] += sign
+        self.phase_scored[state.phase_id] += sign
+        if state.category == "URGENT_GAP":
+            self.phase_urgent[state.phase_id] += sign
+
+    def _apply(self, cap_id: str, importance: int, readiness: int, phase_id: str) -> bool:
+        old = self.states.get(cap_id)
+        if old is not None and old.key == (importance, readiness, phase_id):
+            return False
+        if old is not None:
+            self.phase_total[old.phase_id] -= 1
+            self._count(old, -1)
+        state = CapabilityState(importance, readiness, phase_id)
+        self.states[cap_id] = state
+        self.phase_total[phase_id] += 1
+        self._count(state, 1)
+        return True
+
+    def set(self, cap_id: str, importance: int, readiness: int, phase_id: str) -> bool:
+        """Record a card's scores; returns whether anything changed."""
+        changed = self._apply(cap_id, importance, readiness, phase_id)
+        if changed or cap_id not in self.scores:
+            self.scores[cap_id] = {"importance": importance, "readiness": readiness, "phase_id": phase_id}
+        return changed
+
+    @property
+    def total(self) -> int:
+        return len(self.states)
+
+    @property
+    def unscored(self) -> int:
+        """Capabilities with 0 in either I or R (left out of the report)."""
+        return self.total - self.scored
+
+    @property
+    def urgent(self) -> int:
+        return self.categories["URGENT_GAP"]
+
+    def category(self, cap_id: str) -> Optional[str]:
+        state = self.states.get(cap_id)
+        return state.category if state else None
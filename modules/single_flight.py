@@ -0,0 +1,122 @@
+# modules/single_flight.py
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+
+class FlightAbandoned(Exception):
+    """The leading call was cancelled (or ran out its own time) before producing a result."""
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key onto one execution.
+
+    The first caller for a key (the leader) runs the work; callers arriving
+    while it is in flight wait on the same future and get the same result
+    or exception. Nothing is kept once the call completes - finished results
+    belong in the synthesis cache. Sync callers (report threads) and async
+    callers (the engine loop) share one table, so a thread and a coroutine
+    asking for the same prompt also coalesce.
+
+    If the leader is cancelled or misses its own deadline, waiters join a
+    fresh flight (one of them leads it) instead of inheriting the leader's
+    timeout. Callers decide their own fallbacks: the work should raise on
+    failure rather than return a degraded result that every waiter shares.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[str, Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        """(future for key, True if the caller leads the flight)."""
+        with self._lock:
+            future = self._flights.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._flights[key] = future
+            self.leaders += 1
+            return future, True
+
+    def _land(self, key: str, future: Future):
+        with self._lock:
+            if self._flights.get(key) is future:
+                del self._flights[key]
+
+    def do(self, key: str, fn: Callable[[], object]) -> Tuple[object, bool]:
+        """Run fn once per key among concurrent callers; returns (result, shared)."""
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            try:
+                return future.result(), True
+            except FlightAbandoned:
+                continue
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._land(key, future)
+        future.set_result(result)
+        return result, False
+
+    async def do_async(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable],
+        timeout: Optional[float] = None
+    ) -> Tuple[object, bool]:
+        """
+        Async counterpart of do. Waiters give up after timeout seconds
+        (asyncio.TimeoutError) without disturbing the leader.
+        """
+        end = None if timeout is None else time.monotonic() + timeout
+        while True:
+            future, leader = self._join(key)
+            if leader:
+                break
+            remaining = None if end is None else max(end - time.monotonic(), 0)
+            try:
+                # Shielded so a waiter's timeout never cancels the shared future
+                result = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), remaining)
+                return result, True
+            except FlightAbandoned:
+                # Rejoin: the first waiter back leads a new flight
+                continue
+
+        try:
+            result = await fn()
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            # The leader's cancellation or deadline is not the waiters' outcome
+            future.set_exception(FlightAbandoned())
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._land(key, future)
+        future.set_result(result)
+        return result, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {"in_flight": len(self._flights), "leaders": self.leaders, "coalesced": self.coalesced}
+
+
+# Process-wide table of in-flight syntheses, keyed on the synthesis cache key
+synthesis_flights = SingleFlight()
@@ -8,6 +8,9 @@ from typing import Optional
 import hashlib
 
 from config import USER_DATA_DIR
+from modules.assessment_scores import AssessmentScores, SCORES_ENCODING
+from modules.benchmarks import score_benchmarks
+from modules.usage_tracker import usage_tracker
 
 # Storage directory - uses Railway Volume at /data
 STORAGE_DIR = Path(USER_DATA_DIR)
@@ -21,10 +24,27 @@ def get_user_storage_path(email: str) -> Path:
     return user_dir
 
 
-def save_assessment(user: dict, scores: dict, report: str) -> str:
+def save_assessment(
+    user: dict,
+    scores: dict,
+    report: str,
+    usage: Optional[dict] = None,
+    sections: Optional[dict] = None
+) -> str:
     """
     Save user's assessment and report with atomic writes.
     Uses UUID to prevent race conditions and temp files for atomicity.
+
+    If usage (a ReportUsage summary) is given it is saved alongside as
+    usage_{id}.json and added to the user's daily usage rollup.
+
+    If sections (SectionArtifacts.to_dict()) is given it is saved as
+    sections_{id}.json, so regenerating from this assessment only
+    resynthesizes sections whose inputs changed.
+
+    The scores are also added to the cross-user benchmark statistics.
+    Scores for the assessment grid are stored as an encoded
+    AssessmentScores; load_assessment returns them as a dict again.
     """
     user_dir = get_user_storage_path(user["email"])
 
@@ -33,13 +53,18 @@ def save_assessment(user: dict, scores: dict, report: str) -> str:
     unique_id = uuid.uuid4().hex[:8]
     assessment_id = f"{timestamp}_{unique_id}"
 
-    # Prepare data
+    # Prepare data - grid scores are stored compactly (see AssessmentScores)
     scores_data = {
         "assessment_id": assessment_id,
         "user": user,
         "timestamp": datetime.now().isoformat(),
         "scores": scores
     }
+    try:
+        scores_data.update(scores_encoding=SCORES_ENCODING, scores=AssessmentScores.from_dict(scores).encode())
+    except ValueError:
+        # Not in the grid's shape - store the dict as-is
+        pass
 
     # Save scores with atomic write (temp file + rename)
     scores_file = user_dir / f"scores_{assessment_id}.json"
@@ -47,7 +72,7 @@ def save_assessment(user: dict, scores: dict, report: str) -> str:
 
     try:
         with open(temp_scores_file, "w") as f:
-            json.dump(scores_data, f, indent=2)
+            json.dump(scores_data, f)
         # Atomic rename - prevents partial writes
         temp_scores_file.rename(scores_file)
     except Exception as e:
@@ -56,6 +81,8 @@ def save_assessment(user: dict, scores: dict, report: str) -> str:
             temp_scores_file.unlink()
         raise e
 
+    score_benchmarks.record(scores)
+
     # Save report with atomic write
     report_file = user_dir / f"report_{assessment_id}.md"
     temp_report_file = user_dir / f".report_{assessment_id}.md.tmp"
@@ -71,6 +98,38 @@ def save_assessment(user: dict, scores: dict, report: str) -> str:
             temp_report_file.unlink()
         raise e
 
+    if usage is not None:
+        usage_file = user_dir / f"usage_{assessment_id}.json"
+        temp_usage_file = user_dir / f".usage_{assessment_id}.json.tmp"
+
+        try:
+            with open(temp_usage_file, "w") as f:
+                json.dump({"assessment_id": assessment_id, **usage}, f, indent=2)
+            # Atomic rename
+            temp_usage_file.rename(usage_file)
+        except Exception as e:
+            # Cleanup temp file on error
+            if temp_usage_file.exists():
+                temp_usage_file.unlink()
+            raise e
+
+        usage_tracker.record_user_report(user["email"], usage)
+
+    if sections is not None:
+        sections_file = user_dir / f"sections_{assessment_id}.json"
+        temp_sections_file = user_dir / f".sections_{assessment_id}.json.tmp"
+
+        try:
+            with open(temp_sections_file, "w") as f:
+                json.dump(sections, f, indent=2)
+            # Atomic rename
+            temp_sections_file.rename(sections_file)
+        except Exception as e:
+            # Cleanup temp file on error
+            if temp_sections_file.exists():
+                temp_sections_file.unlink()
+            raise e
+
     return assessment_id
 
 
@@ -94,6 +153,17 @@ def get_user_assessments(email: str) -> list:
     return assessments
 
 
+def read_scores_file(scores_file: Path) -> dict:
+    """A scores_{id}.json file, with encoded scores returned as the form-scores dict."""
+    with open(scores_file) as f:
+        data = json.load(f)
+
+    # Callers always get the form-scores dict
+    if data.pop("scores_encoding", None) == SCORES_ENCODING:
+        data["scores"] = AssessmentScores.decode(data["scores"]).to_dict()
+    return data
+
+
 def load_assessment(email: str, assessment_id: str) -> Optional[dict]:
     """Load a specific assessment."""
     user_dir = get_user_storage_path(email)
@@ -104,11 +174,20 @@ def load_assessment(email: str, assessment_id: str) -> Optional[dict]:
     if not scores_file.exists():
         return None
 
-    with open(scores_file) as f:
-        data = json.load(f)
+    data = read_scores_file(scores_file)
 
     if report_file.exists():
         with open(report_file) as f:
             data["report"] = f.read()
 
+    usage_file = user_dir / f"usage_{assessment_id}.json"
+    if usage_file.exists():
+        with open(usage_file) as f:
+            data["usage"] = json.load(f)
+
+    sections_file = user_dir / f"sections_{assessment_id}.json"
+    if sections_file.exists():
+        with open(sections_file) as f:
+            data["sections"] = json.load(f)
+
     return data
@@ -0,0 +1,309 @@
+# modules/synthesis_cache.py
+import atexit
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import config
+from modules.file_lock import locked_file, read_json, write_json_atomic
+
+
+def make_cache_key(
+    section_type: str,
+    context_content: str,
+    agents_list: List[str],
+    model: str,
+    max_tokens: int
+) -> str:
+    """Hash everything that determines a synthesis into a stable cache key."""
+    payload = json.dumps(
+        [section_type, context_content, list(agents_list), model, max_tokens],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SynthesisCache:
+    """
+    Persistent, content-addressed cache of Claude synthesis responses.
+
+    Each response lives in its own JSON file (written atomically) so reads
+    never need a lock. Access metadata lives in a shared index guarded by a
+    file lock, which keeps the cache consistent across Streamlit workers.
+
+    Lookups never touch the index: hit/miss counts and access times
+    accumulate in memory and are merged into it in batches (every
+    flush_every lookups or flush_seconds, on a background thread) and
+    whenever put() or an expiry rewrites the index anyway, so eviction
+    always sees them.
+
+    Eviction uses GreedyDual-Size-Frequency: an entry's priority is
+    L + hits * token_cost / size, so cheap, rarely used, large entries go
+    first while expensive, popular ones survive. L is raised to the priority
+    of each evicted entry, which ages out entries that stop being used (LRU).
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int,
+        ttl_seconds: int,
+        enabled: bool = True,
+        flush_every: int = None,
+        flush_seconds: float = None
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.flush_every = config.SYNTHESIS_CACHE_FLUSH_EVERY if flush_every is None else flush_every
+        self.flush_seconds = config.SYNTHESIS_CACHE_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+
+        # Per-process counters (persisted totals live in the index)
+        self._stats_lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "expirations": 0}
+
+        # Lookups not yet merged into the index: key -> [hits, last_access]
+        self._pending = {"hits": 0, "misses": 0, "access": {}}
+        self._pending_since = time.time()
+        self._flushing = False
+
+    @property
+    def index_file(self) -> Path:
+        return self.cache_dir / "index.json"
+
+    @property
+    def lock_file(self) -> Path:
+        return self.cache_dir / ".index.lock"
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _count(self, counter: str, amount: int = 1):
+        with self._stats_lock:
+            self._stats[counter] += amount
+
+    def _load_index(self) -> dict:
+        index = read_json(self.index_file, default=None)
+        if not isinstance(index, dict) or "entries" not in index:
+            index = {"inflation": 0.0, "total_bytes": 0, "entries": {}, "totals": {}}
+        return index
+
+    def _priority(self, index: dict, meta: dict) -> float:
+        return index["inflation"] + meta["hits"] * meta["cost"] / max(meta["size"], 1)
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached text for key, or None on miss/expiry."""
+        if not self.enabled:
+            return None
+
+        entry = read_json(self._entry_path(key))
+        if entry is None:
+            self._record_miss()
+            return None
+
+        if time.time() - entry.get("created_at", 0) > self.ttl_seconds:
+            self._remove(key, counter="expirations")
+            self._record_miss()
+            return None
+
+        self._count("hits")
+        self._record_lookup(key)
+        return entry.get("text")
+
+    def _record_miss(self):
+        self._count("misses")
+        self._record_lookup(None)
+
+    def _record_lookup(self, key: Optional[str]):
+        """Note a hit (key) or miss (None) in memory; flush in the background when due."""
+        with self._stats_lock:
+            if key is None:
+                self._pending["misses"] += 1
+            else:
+                self._pending["hits"] += 1
+                access = self._pending["access"].setdefault(key, [0, 0.0])
+                access[0] += 1
+                access[1] = time.time()
+            lookups = self._pending["hits"] + self._pending["misses"]
+            due = (lookups >= self.flush_every or time.time() - self._pending_since >= self.flush_seconds)
+            if not due or self._flushing:
+                return
+            self._flushing = True
+
+        threading.Thread(target=self._background_flush, name="synthesis-cache-flush", daemon=True).start()
+
+    def _background_flush(self):
+        try:
+            self.flush()
+        finally:
+            with self._stats_lock:
+                self._flushing = False
+
+    def _take_pending(self) -> dict:
+        with self._stats_lock:
+            pending = self._pending
+            self._pending = {"hits": 0, "misses": 0, "access": {}}
+            self._pending_since = time.time()
+        return pending
+
+    def _merge_pending(self, index: dict, pending: dict):
+        """Apply batched lookups to an index loaded under the lock."""
+        for key, (hits, last_access) in pending["access"].items():
+            meta = index["entries"].get(key)
+            if meta:
+                meta["hits"] += hits
+                meta["last_access"] = max(meta["last_access"], last_access)
+                meta["priority"] = self._priority(index, meta)
+        for counter in ("hits", "misses"):
+            if pending[counter]:
+                index["totals"][counter] = index["totals"].get(counter, 0) + pending[counter]
+
+    def flush(self):
+        """Write batched hit/miss counts and access times to the shared index."""
+        pending = self._take_pending()
+        if not (pending["hits"] or pending["misses"]):
+            return
+        try:
+            with locked_file(self.lock_file):
+                index = self._load_index()
+                self._merge_pending(index, pending)
+                write_json_atomic(self.index_file, index)
+        except OSError as e:
+            # Metadata is best-effort - a cached answer is still a good answer
+            print(f"Synthesis cache index update failed: {e}")
+
+    def put(self, key: str, text: str, section_type: str = "", input_tokens: int = 0, output_tokens: int = 0):
+        """Store a synthesis result and evict low-value entries if over budget."""
+        if not self.enabled or not text:
+            return
+
+        entry = {
+            "key": key,
+            "section_type": section_type,
+            "text": text,
+            "created_at": time.time(),
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+        }
+
+        try:
+            entry_path = self._entry_path(key)
+            write_json_atomic(entry_path, entry)
+            size = entry_path.stat().st_size
+
+            pending = self._take_pending()
+            with locked_file(self.lock_file):
+                index = self._load_index()
+                # Eviction must see every lookup made so far
+                self._merge_pending(index, pending)
+                previous = index["entries"].get(key)
+                if previous:
+                    index["total_bytes"] -= previous["size"]
+
+                meta = {
+                    "size": size,
+                    # Regenerating costs the full prompt plus the completion
+                    "cost": max(input_tokens + output_tokens, 1),
+                    "hits": 1,
+                    "created_at": entry["created_at"],
+                    "last_access": entry["created_at"],
+                }
+                meta["priority"] = self._priority(index, meta)
+                index["entries"][key] = meta
+                index["total_bytes"] += size
+                index["totals"]["writes"] = index["totals"].get("writes", 0) + 1
+
+                self._evict(index, keep=key)
+                write_json_atomic(self.index_file, index)
+
+            self._count("writes")
+        except OSError as e:
+            print(f"Synthesis cache write failed: {e}")
+
+    def _evict(self, index: dict, keep: str = None):
+        """Drop expired entries, then lowest-priority entries until under max_bytes."""
+        now = time.time()
+        entries = index["entries"]
+
+        for key in [k for k, m in entries.items() if now - m["created_at"] > self.ttl_seconds]:
+            self._drop(index, key)
+            self._count("expirations")
+
+        if index["total_bytes"] <= self.max_bytes:
+            return
+
+        for key in sorted(entries, key=lambda k: entries[k]["priority"]):
+            if index["total_bytes"] <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            index["inflation"] = entries[key]["priority"]
+            self._drop(index, key)
+            self._count("evictions")
+            index["totals"]["evictions"] = index["totals"].get("evictions", 0) + 1
+
+    def _drop(self, index: dict, key: str):
+        meta = index["entries"].pop(key, None)
+        if meta:
+            index["total_bytes"] -= meta["size"]
+        self._entry_path(key).unlink(missing_ok=True)
+
+    def _remove(self, key: str, counter: str):
+        try:
+            pending = self._take_pending()
+            with locked_file(self.lock_file):
+                index = self._load_index()
+                self._merge_pending(index, pending)
+                self._drop(index, key)
+                write_json_atomic(self.index_file, index)
+            self._count(counter)
+        except OSError:
+            pass
+
+    def clear(self):
+        """Remove every cached entry."""
+        with locked_file(self.lock_file):
+            index = self._load_index()
+            for key in list(index["entries"]):
+                self._drop(index, key)
+            index["inflation"] = 0.0
+            index["total_bytes"] = 0
+            write_json_atomic(self.index_file, index)
+
+    def stats(self) -> Dict:
+        """Return process and persisted hit/miss counters plus current size."""
+        index = self._load_index()
+        with self._stats_lock:
+            process_stats = dict(self._stats)
+            pending = {counter: self._pending[counter] for counter in ("hits", "misses")}
+
+        # Include lookups not flushed yet
+        totals = dict(index.get("totals", {}))
+        for counter, count in pending.items():
+            if count:
+                totals[counter] = totals.get(counter, 0) + count
+
+        lookups = process_stats["hits"] + process_stats["misses"]
+        return {
+            "process": process_stats,
+            "process_hit_rate": process_stats["hits"] / lookups if lookups else 0.0,
+            "totals": totals,
+            "entries": len(index["entries"]),
+            "total_bytes": index["total_bytes"],
+            "max_bytes": self.max_bytes,
+        }
+
+
+# Process-wide cache shared by every report generator
+synthesis_cache = SynthesisCache(
+    cache_dir=config.SYNTHESIS_CACHE_DIR,
+    max_bytes=config.SYNTHESIS_CACHE_MAX_BYTES,
+    ttl_seconds=config.SYNTHESIS_CACHE_TTL_SECONDS,
+    enabled=config.SYNTHESIS_CACHE_ENABLED
+)
+# Write batched lookups back on a clean shutdown
+atexit.register(synthesis_cache.flush)
@@ -0,0 +1,597 @@
+# modules/synthesis_engine.py
+import asyncio
+import queue
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import config
+from modules.report_generator import (
+    SYNTHESIS_SYSTEM_PROMPT,
+    build_synthesis_system,
+    build_synthesis_messages,
+    build_batch_gap_messages,
+    message_text,
+    parse_batch_response,
+    synthesis_cache_key,
+    cache_synthesis_response,
+    settle_rate_limit,
+    release_rate_limit,
+    render_template_section,
+    usage_tokens
+)
+from modules.claude_client import make_async_client
+from modules.synthesis_cache import synthesis_cache
+from modules.rate_limiter import claude_rate_limiter, estimate_tokens
+from modules.retry_policy import RetryBudget, retry_policy
+from modules.circuit_breaker import CircuitOpenError, claude_breaker
+from modules.latency_tracker import synthesis_latency
+from modules.concurrency_controller import AdaptiveConcurrencyLimit
+from modules.usage_tracker import ReportUsage
+from modules.token_budget import token_planner
+from modules.single_flight import synthesis_flights
+
+# Minimum seconds between partial-text UI updates for one section
+STREAM_UPDATE_INTERVAL = 0.15
+
+# Marks the end of a streaming run on the update queue
+_STREAM_DONE = object()
+
+
+class SynthesisEngine:
+    """
+    Process-wide asyncio engine for Claude synthesis.
+
+    All requests run on one long-lived event loop in a daemon thread, so an
+    in-flight section costs a coroutine rather than a blocked OS thread.
+    An adaptive (AIMD) limit caps concurrent API requests across every
+    report in the process, tracking what the API currently allows.
+    Streamlit code talks to it through the sync facade (run /
+    synthesize_many), which blocks only the calling script thread.
+    """
+
+    def __init__(self, max_in_flight: int, min_in_flight: int = None, initial_in_flight: int = None):
+        self.max_in_flight = max_in_flight
+        self.concurrency = AdaptiveConcurrencyLimit(
+            initial_limit=min(initial_in_flight or config.SYNTHESIS_INITIAL_IN_FLIGHT, max_in_flight),
+            min_limit=min(min_in_flight or config.SYNTHESIS_MIN_IN_FLIGHT, max_in_flight),
+            max_limit=max_in_flight,
+            decrease_factor=config.CONCURRENCY_DECREASE_FACTOR,
+            latency_tolerance=config.CONCURRENCY_LATENCY_TOLERANCE,
+            decrease_cooldown=config.CONCURRENCY_DECREASE_COOLDOWN
+        )
+        self.client = None
+        self._loop = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_started(self):
+        """Start the event loop thread on first use."""
+        if self._loop is not None:
+            return
+
+        with self._start_lock:
+            if self._loop is not None:
+                return
+
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(loop)
+                ready.set()
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=run_loop, name="synthesis-engine", daemon=True)
+            self._thread.start()
+            ready.wait()
+
+            # The async client must be created on the loop itself
+            asyncio.run_coroutine_threadsafe(self._setup(), loop).result()
+            self._loop = loop
+
+    async def _setup(self):
+        if self.client is None:
+            # Retries are handled by retry_policy so backoff never holds a slot
+            self.client = make_async_client()
+
+    def submit(self, coro):
+        """Schedule a coroutine on the engine loop; returns a concurrent Future."""
+        self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def run(self, coro, timeout: float = None):
+        """Sync facade: run a coroutine on the engine loop and wait for it."""
+        return self.submit(coro).result(timeout=timeout)
+
+    def _offload(self, fn, *args) -> asyncio.Future:
+        """
+        Run blocking bookkeeping (file-locked JSON state: rate limits, usage,
+        cache files) on a worker thread so it never stalls the loop.
+        Await the result, or leave it running where awaiting is not possible
+        (a cancelled attempt releasing its reservation).
+        """
+        return asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    @asynccontextmanager
+    async def _admitted(self, input_tokens: int, output_tokens: int):
+        """
+        Wait for shared RPM/TPM capacity, then hold a concurrency slot.
+        Rate-limited calls wait without occupying a slot. Yields the
+        rate-limit reservation.
+
+        A call cancelled while waiting gives back any half-open probe it
+        claimed, as it will never report an outcome to the breaker.
+        """
+        try:
+            reservation = await claude_rate_limiter.acquire_async(input_tokens, output_tokens)
+        except asyncio.CancelledError:
+            claude_breaker.release_probe()
+            raise
+        try:
+            await self.concurrency.acquire()
+        except asyncio.CancelledError:
+            claude_breaker.release_probe()
+            self._offload(release_rate_limit, reservation)
+            raise
+        try:
+            yield reservation
+        finally:
+            self.concurrency.release()
+
+    async def synthesize(
+        self,
+        section_type: str,
+        context_content: str,
+        agents_list: List[str],
+        on_text: Optional[Callable[[str], None]] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        deadline: Optional[float] = None,
+        report_usage: Optional[ReportUsage] = None,
+        max_tokens: Optional[int] = None
+    ) -> str:
+        """
+        Async counterpart of synthesize_with_claude.
+        Serves cached answers, otherwise calls Claude within the adaptive
+        in-flight limit, retrying transient errors with backoff (the slot is
+        released while backing off), and falls back to the KB template.
+
+        A call still running past the observed latency percentile is hedged
+        with a duplicate request; the first response wins. If deadline (an
+        absolute time.time()) passes first, the template is returned instead.
+
+        Concurrent calls for the same prompt (from any report in the process)
+        share one API request via synthesis_flights.
+
+        If on_text is given the response is streamed and on_text receives the
+        accumulated text after every delta (called on the engine loop).
+        A call that joins another's request only reports the final text.
+
+        max_tokens comes from the report's token plan (default: the
+        planner's estimate for this section type).
+        """
+        if max_tokens is None:
+            max_tokens = token_planner.section_need(section_type)
+        cache_key = synthesis_cache_key(section_type, context_content, agents_list)
+        # Cache files live on the storage volume - read them off the loop
+        cached = await self._offload(synthesis_cache.get, cache_key)
+        if cached is not None:
+            if report_usage is not None:
+                report_usage.add_cache_hit()
+            return cached
+
+        messages = build_synthesis_messages(section_type, context_content, agents_list)
+        input_estimate = estimate_tokens(SYNTHESIS_SYSTEM_PROMPT + message_text(messages))
+        request = dict(
+            model=config.CLAUDE_MODEL,
+            max_tokens=max_tokens,
+            system=build_synthesis_system(),
+            messages=messages
+        )
+
+        # Only the first hedge to produce text may drive the streamed view
+        stream_owner = []
+
+        async def attempt(hedge: int):
+            # Fail fast while the API is known to be down
+            if not claude_breaker.allow_request():
+                raise CircuitOpenError("Claude circuit breaker is open")
+
+            async with self._admitted(input_estimate, max_tokens) as reservation:
+                call = dict(request)
+                if deadline is not None:
+                    call["timeout"] = max(deadline - time.time(), 1.0)
+                started = time.time()
+                try:
+                    if on_text is None:
+                        response = await self.client.messages.create(**call)
+                    else:
+                        def on_hedge_text(text):
+                            if not stream_owner:
+                                stream_owner.append(hedge)
+                            if stream_owner[0] == hedge:
+                                on_text(text)
+
+                        response = await self._stream(call, on_hedge_text)
+                except asyncio.CancelledError:
+                    # Lost the hedge race or hit the deadline - not an API failure
+                    claude_breaker.release_probe()
+                    self._offload(release_rate_limit, reservation)
+                    raise
+                except Exception as e:
+                    await self._offload(release_rate_limit, reservation)
+                    claude_breaker.record_failure(e)
+                    self.concurrency.on_error(e)
+                    raise
+                elapsed = time.time() - started
+                claude_breaker.record_success(elapsed)
+                # Judge against the median before this sample joins it
+                self.concurrency.on_success(section_type, elapsed)
+                synthesis_latency.record(section_type, elapsed)
+                await self._offload(settle_rate_limit, reservation, response, section_type, elapsed, report_usage)
+                token_planner.record(section_type, usage_tokens(response, "output_tokens"))
+                return response
+
+        async def call_with_retries():
+            return await retry_policy.call_async(
+                lambda: self._hedged(attempt, section_type, retry_budget),
+                retry_budget,
+                f"{section_type} synthesis"
+            )
+
+        async def call():
+            # Raises on failure: the template fallback is each caller's own, not shared
+            response = await self._within_deadline(call_with_retries(), deadline)
+            return await self._offload(cache_synthesis_response, cache_key, section_type, response)
+
+        # Identical prompts already in flight share one call; waiting still honours our deadline
+        try:
+            text, shared = await synthesis_flights.do_async(
+                cache_key, call, None if deadline is None else max(deadline - time.time(), 0)
+            )
+        except asyncio.TimeoutError:
+            print(f"{section_type} synthesis missed the report deadline. Falling back to template.")
+            return render_template_section(section_type, context_content)
+        except Exception as e:
+            # Fallback to template-based if API fails
+            print(f"Claude API error: {e}. Falling back to template.")
+            return render_template_section(section_type, context_content)
+
+        if shared and report_usage is not None:
+            report_usage.add_coalesced()
+        return text
+
+    async def _hedged(
+        self,
+        attempt: Callable[[int], Awaitable],
+        section_type: str,
+        retry_budget: Optional[RetryBudget] = None
+    ):
+        """
+        Run attempt(0); if it is still running past the observed latency
+        percentile, also run attempt(1) and return whichever succeeds first.
+        The loser is cancelled. Hedges spend from the report's retry budget.
+        """
+        first = asyncio.ensure_future(attempt(0))
+
+        hedge_after = None
+        if config.HEDGING_ENABLED:
+            hedge_after = synthesis_latency.percentile(section_type, config.HEDGE_PERCENTILE)
+        if hedge_after is None:
+            return await first
+
+        done, _ = await asyncio.wait({first}, timeout=hedge_after)
+        if done or (retry_budget is not None and not retry_budget.try_spend()):
+            return await first
+
+        print(f"{section_type} synthesis past p{config.HEDGE_PERCENTILE * 100:.0f} ({hedge_after:.1f}s); hedging.")
+        pending = {first, asyncio.ensure_future(attempt(1))}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _within_deadline(self, coro, deadline: Optional[float]):
+        """Await coro, raising asyncio.TimeoutError if deadline passes first."""
+        if deadline is None:
+            return await coro
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            coro.close()
+            raise asyncio.TimeoutError()
+        return await asyncio.wait_for(coro, remaining)
+
+    async def _stream(self, request: dict, on_text: Callable[[str], None]):
+        """Stream a message, reporting accumulated text; returns the final message."""
+        text = ""
+        async with self.client.messages.stream(**request) as stream:
+            async for delta in stream.text_stream:
+                text += delta
+                on_text(text)
+            return await stream.get_final_message()
+
+    async def synthesize_gap_batch(
+        self,
+        gap_contexts: Dict[str, str],
+        agents_list: List[str],
+        retry_budget: Optional[RetryBudget] = None,
+        deadline: Optional[float] = None,
+        report_usage: Optional[ReportUsage] = None,
+        token_budgets: Optional[Dict[str, int]] = None
+    ) -> Dict[str, str]:
+        """
+        Synthesize several urgent gaps in one structured request.
+
+        Cached gaps are served directly. The rest are packed into a single
+        prompt answered as JSON keyed by capability_id; any gap missing from
+        (or unparseable in) the response falls back to its own request.
+        Results are cached per gap, so later single-gap lookups hit too.
+        token_budgets (capability_id -> max_tokens) size the batch's output.
+        """
+        # Each gap's own budget, as a single-gap call would use it
+        token_budgets = {
+            cap_id: (token_budgets or {}).get(cap_id) or token_planner.section_need("urgent_gap")
+            for cap_id in gap_contexts
+        }
+        results = {}
+        pending = {}
+        for cap_id, context in gap_contexts.items():
+            cache_key = synthesis_cache_key("urgent_gap", context, agents_list)
+            cached = await self._offload(synthesis_cache.get, cache_key)
+            if cached is not None:
+                if report_usage is not None:
+                    report_usage.add_cache_hit()
+                results[cap_id] = cached
+            else:
+                pending[cap_id] = context
+
+        if len(pending) == 1:
+            cap_id, context = next(iter(pending.items()))
+            results[cap_id] = await self.synthesize(
+                "urgent_gap", context, agents_list, retry_budget=retry_budget,
+                deadline=deadline, report_usage=report_usage, max_tokens=token_budgets[cap_id]
+            )
+            return results
+        if not pending:
+            return results
+
+        messages = build_batch_gap_messages(pending, agents_list)
+        max_tokens = min(
+            sum(token_budgets[cap_id] for cap_id in pending),
+            config.SYNTHESIS_BATCH_MAX_TOKENS
+        )
+        input_estimate = estimate_tokens(SYNTHESIS_SYSTEM_PROMPT + message_text(messages))
+
+        async def attempt():
+            if not claude_breaker.allow_request():
+                raise CircuitOpenError("Claude circuit breaker is open")
+
+            async with self._admitted(input_estimate, max_tokens) as reservation:
+                call = dict(
+                    model=config.CLAUDE_MODEL,
+                    max_tokens=max_tokens,
+                    system=build_synthesis_system(),
+                    messages=messages
+                )
+                if deadline is not None:
+                    call["timeout"] = max(deadline - time.time(), 1.0)
+                started = time.time()
+                try:
+                    response = await self.client.messages.create(**call)
+                except asyncio.CancelledError:
+                    claude_breaker.release_probe()
+                    self._offload(release_rate_limit, reservation)
+                    raise
+                except Exception as e:
+                    await self._offload(release_rate_limit, reservation)
+                    claude_breaker.record_failure(e)
+                    self.concurrency.on_error(e)
+                    raise
+                # A batch legitimately takes longer; judge latency per gap
+                elapsed = time.time() - started
+                per_gap = elapsed / len(pending)
+                claude_breaker.record_success(per_gap)
+                self.concurrency.on_success("urgent_gap", per_gap)
+                await self._offload(settle_rate_limit, reservation, response, "urgent_gap", elapsed, report_usage)
+                token_planner.record("urgent_gap", usage_tokens(response, "output_tokens") // len(pending))
+                return response
+
+        parsed = {}
+        try:
+            response = await self._within_deadline(
+                retry_policy.call_async(attempt, retry_budget, "Batched gap synthesis"), deadline
+            )
+            parsed = parse_batch_response(response.content[0].text, list(pending))
+
+            # Spread the batch's cost across its gaps for cache weighting
+            share = max(len(parsed), 1)
+
+            def cache_parsed():
+                for cap_id, text in parsed.items():
+                    synthesis_cache.put(
+                        synthesis_cache_key("urgent_gap", pending[cap_id], agents_list),
+                        text,
+                        section_type="urgent_gap",
+                        input_tokens=usage_tokens(response, "input_tokens") // share,
+                        output_tokens=usage_tokens(response, "output_tokens") // share
+                    )
+
+            await self._offload(cache_parsed)
+        except Exception as e:
+            print(f"Batched synthesis error: {e}. Falling back to per-gap requests.")
+
+        results.update(parsed)
+
+        missing = [cap_id for cap_id in pending if cap_id not in parsed]
+        if missing:
+            print(f"Batched synthesis missing {len(missing)} gap(s); synthesizing individually.")
+            fallbacks = await asyncio.gather(
+                *(self.synthesize("urgent_gap", pending[cap_id], agents_list,
+                                  retry_budget=retry_budget, deadline=deadline,
+                                  report_usage=report_usage, max_tokens=token_budgets[cap_id])
+                  for cap_id in missing)
+            )
+            results.update(zip(missing, fallbacks))
+
+        return results
+
+    async def _synthesize_many(
+        self,
+        tasks: Dict[str, Tuple[str, str]],
+        agents_list: List[str],
+        on_update: Optional[Callable[[str, str, bool], None]] = None,
+        batch_size: int = 0,
+        retry_budget: Optional[RetryBudget] = None,
+        deadline: Optional[float] = None,
+        report_usage: Optional[ReportUsage] = None,
+        token_budgets: Optional[Dict[str, int]] = None
+    ) -> Dict[str, str]:
+        token_budgets = token_budgets or {}
+
+        async def run_task(key):
+            section_type, context_content = tasks[key]
+            on_text = None
+            if on_update is not None:
+                on_text = lambda text: on_update(key, text, False)
+            result = await self.synthesize(
+                section_type, context_content, agents_list, on_text,
+                retry_budget, deadline, report_usage, token_budgets.get(key)
+            )
+            if on_update is not None:
+                on_update(key, result, True)
+            return result
+
+        async def run_batch(batch_keys):
+            batch = await self.synthesize_gap_batch(
+                {key: tasks[key][1] for key in batch_keys}, agents_list,
+                retry_budget, deadline, report_usage, token_budgets
+            )
+            if on_update is not None:
+                for key in batch_keys:
+                    on_update(key, batch[key], True)
+            return batch
+
+        # Urgent gaps can share one request per batch; everything else runs alone
+        single_keys = list(tasks)
+        batches = []
+        if batch_size > 1:
+            gap_keys = [key for key in tasks if tasks[key][0] == "urgent_gap"]
+            if len(gap_keys) > 1:
+                single_keys = [key for key in tasks if tasks[key][0] != "urgent_gap"]
+                batches = [gap_keys[i:i + batch_size] for i in range(0, len(gap_keys), batch_size)]
+
+        results = await asyncio.gather(
+            *(run_task(key) for key in single_keys),
+            *(run_batch(batch_keys) for batch_keys in batches),
+            return_exceptions=True
+        )
+
+        synthesized = {}
+        for key, result in zip(single_keys, results):
+            if isinstance(result, Exception):
+                print(f"Synthesis error: {result}")
+                continue
+            synthesized[key] = result
+        for result in results[len(single_keys):]:
+            if isinstance(result, Exception):
+                print(f"Batched synthesis error: {result}")
+                continue
+            synthesized.update(result)
+        return synthesized
+
+    def synthesize_many(
+        self,
+        tasks: Dict[str, Tuple[str, str]],
+        agents_list: List[str],
+        on_update: Optional[Callable[[str, str, bool], None]] = None,
+        batch_size: int = 0,
+        retry_budget: Optional[RetryBudget] = None,
+        deadline: Optional[float] = None,
+        report_usage: Optional[ReportUsage] = None,
+        token_budgets: Optional[Dict[str, int]] = None
+    ) -> Dict[str, str]:
+        """
+        Sync facade: synthesize every task concurrently.
+
+        Args:
+            tasks: Mapping of result key -> (section_type, context_content)
+            agents_list: List of valid agent names Claude can reference
+            on_update: Optional callback(key, text, done). When given, sections
+                are streamed and the callback runs in the CALLING thread (safe
+                for Streamlit elements) with partial text, throttled to
+                STREAM_UPDATE_INTERVAL, and once more with the final text.
+            batch_size: If > 1, urgent_gap tasks are packed into structured
+                requests of up to this many gaps (see synthesize_gap_batch).
+                Batched gaps report only their final text.
+            retry_budget: Retries shared by every task (one budget per report).
+            deadline: Absolute time.time() by which every task must finish;
+                later sections are rendered from the KB template.
+            report_usage: Collects per-call token usage and cost for the report.
+            token_budgets: max_tokens per result key from the report's token
+                plan (missing keys use the planner's per-section estimate).
+
+        Returns:
+            Mapping of result key -> synthesized text (failed keys omitted)
+        """
+        if on_update is None:
+            return self.run(self._synthesize_many(
+                tasks, agents_list, batch_size=batch_size,
+                retry_budget=retry_budget, deadline=deadline, report_usage=report_usage,
+                token_budgets=token_budgets
+            ))
+
+        updates = queue.Queue()
+        future = self.submit(self._synthesize_many(
+            tasks, agents_list,
+            on_update=lambda key, text, done: updates.put((key, text, done)),
+            batch_size=batch_size,
+            retry_budget=retry_budget,
+            deadline=deadline,
+            report_usage=report_usage,
+            token_budgets=token_budgets
+        ))
+        future.add_done_callback(lambda _: updates.put(_STREAM_DONE))
+
+        last_sent = {}
+        while True:
+            event = updates.get()
+            if event is _STREAM_DONE:
+                break
+
+            # Coalesce queued deltas so the UI only sees the latest text per section
+            pending = {event[0]: event}
+            finished = False
+            while True:
+                try:
+                    event = updates.get_nowait()
+                except queue.Empty:
+                    break
+                if event is _STREAM_DONE:
+                    finished = True
+                    break
+                if not pending.get(event[0], (None, None, False))[2]:
+                    pending[event[0]] = event
+
+            now = time.time()
+            for key, text, done in pending.values():
+                if done or now - last_sent.get(key, 0) >= STREAM_UPDATE_INTERVAL:
+                    on_update(key, text, done)
+                    last_sent[key] = now
+
+            if finished:
+                break
+
+        return future.result()
+
+
+# Process-wide engine shared by every report
+synthesis_engine = SynthesisEngine(max_in_flight=config.SYNTHESIS_MAX_IN_FLIGHT)
@@ -0,0 +1,268 @@
+# modules/synthesis_library.py
+"""
+Precomputed synthesis library.
+
+Gap and strength syntheses depend only on a capability's KB entry and which
+score band it falls into, so they can be generated offline once per KB
+release and served at report time with zero LLM round trips.
+
+Build with:
+    python -m modules.synthesis_library
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import config
+from modules.file_lock import read_json, write_json_atomic
+from modules.score_analyzer import categorize_priority
+from modules.report_generator import (
+    SYNTHESIS_SYSTEM_PROMPT,
+    SECTION_PROMPTS,
+    VALID_AGENTS,
+    format_gap_context,
+    format_strength_context,
+    render_template_section
+)
+
+# Bump when the artifact layout or the request layout changes
+LIBRARY_FORMAT_VERSION = 2
+
+# Section type -> priority category whose score band it is built for
+LIBRARY_SECTIONS = {
+    "urgent_gap": "URGENT_GAP",
+    "strength": "STRENGTH",
+}
+
+
+def band_ranges(category: str) -> Tuple[range, range]:
+    """Importance and readiness values (1-10) that fall into a category."""
+    cells = [
+        (i, r)
+        for i in range(1, 11)
+        for r in range(1, 11)
+        if categorize_priority(i, r) == category
+    ]
+    importances = sorted({i for i, _ in cells})
+    readinesses = sorted({r for _, r in cells})
+    return (
+        range(importances[0], importances[-1] + 1),
+        range(readinesses[0], readinesses[-1] + 1)
+    )
+
+
+def _span(values: range) -> str:
+    return f"{values.start}-{values.stop - 1}" if len(values) > 1 else str(values.start)
+
+
+def format_band_context(section_type: str, capability: dict, phase: dict) -> str:
+    """
+    Build the synthesis context for a capability in its band.
+    Scores are given as the band's ranges so one synthesis serves every
+    user whose scores fall in that band.
+    """
+    importances, readinesses = band_ranges(LIBRARY_SECTIONS[section_type])
+    gap_scores = sorted({
+        round(i * (10 - r) / 10) for i in importances for r in readinesses
+    })
+    band = {
+        "capability_name": capability.get("name", "Unknown"),
+        "phase_name": phase.get("name", "Unknown"),
+        "importance": _span(importances),
+        "readiness": _span(readinesses),
+        "gap_score": f"{gap_scores[0]}-{gap_scores[-1]}",
+    }
+
+    if section_type == "strength":
+        return format_strength_context(band, capability)
+    return format_gap_context(band, capability)
+
+
+def entry_key(section_type: str, capability_id: str) -> str:
+    return f"{section_type}:{capability_id}:{LIBRARY_SECTIONS[section_type]}"
+
+
+def library_fingerprint(knowledge_base: dict) -> str:
+    """
+    Hash of everything that shapes a library entry. A library built under a
+    different KB, prompt set, agent list, model or threshold set is stale.
+    """
+    payload = json.dumps({
+        "format": LIBRARY_FORMAT_VERSION,
+        # An indexed KB hashes as its raw JSON
+        "knowledge_base": getattr(knowledge_base, "raw", knowledge_base),
+        "system_prompt": SYNTHESIS_SYSTEM_PROMPT,
+        "section_prompts": {s: SECTION_PROMPTS[s] for s in LIBRARY_SECTIONS},
+        "agents": VALID_AGENTS,
+        "model": config.CLAUDE_MODEL,
+        "max_tokens": config.CLAUDE_MAX_TOKENS,
+        "thresholds": [
+            config.IMPORTANCE_HIGH_THRESHOLD, config.IMPORTANCE_LOW_THRESHOLD,
+            config.READINESS_HIGH_THRESHOLD, config.READINESS_LOW_THRESHOLD
+        ],
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def load_knowledge_base_file() -> dict:
+    with open(config.KNOWLEDGE_BASE_PATH) as f:
+        return json.load(f)
+
+
+def iter_library_capabilities(knowledge_base: dict):
+    """Yield (capability, phase) once per capability id."""
+    seen = set()
+    for phase in knowledge_base.get("phases", []):
+        for cap in phase.get("capabilities", []):
+            if cap["id"] not in seen:
+                seen.add(cap["id"])
+                yield cap, phase
+
+
+class SynthesisLibrary:
+    """
+    Read side of the precomputed library.
+
+    The artifact is loaded lazily and reloaded when its file changes. It is
+    ignored entirely if its fingerprint does not match the current KB,
+    prompts and model, so a stale build can never serve wrong content.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = {}
+        self._loaded_mtime = None
+
+    def _refresh(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            self._entries = {}
+            self._loaded_mtime = None
+            return
+
+        if mtime == self._loaded_mtime:
+            return
+
+        with self._lock:
+            if mtime == self._loaded_mtime:
+                return
+            artifact = read_json(self.path, default={}) or {}
+            expected = library_fingerprint(load_knowledge_base_file())
+            if artifact.get("fingerprint") != expected:
+                print(f"Synthesis library at {self.path} is stale "
+                      f"({artifact.get('fingerprint')} != {expected}); ignoring it.")
+                self._entries = {}
+            else:
+                self._entries = artifact.get("entries", {})
+            self._loaded_mtime = mtime
+
+    def lookup(self, section_type: str, capability_id: str, importance: int, readiness: int) -> Optional[str]:
+        """Return the precomputed synthesis if the scores fall in a built band."""
+        category = LIBRARY_SECTIONS.get(section_type)
+        if category is None or categorize_priority(importance, readiness) != category:
+            return None
+
+        self._refresh()
+        entry = self._entries.get(entry_key(section_type, capability_id))
+        return entry["text"] if entry else None
+
+    def __len__(self):
+        self._refresh()
+        return len(self._entries)
+
+
+def build_library(
+    output_path: str,
+    section_types: List[str],
+    knowledge_base: dict = None
+) -> dict:
+    """
+    Synthesize every capability x band and write the versioned artifact.
+    Existing entries with a matching fingerprint are kept, so an
+    interrupted build can be resumed.
+    """
+    # Imported here so reading the library never starts the engine
+    from modules.synthesis_engine import synthesis_engine
+
+    knowledge_base = knowledge_base or load_knowledge_base_file()
+    fingerprint = library_fingerprint(knowledge_base)
+
+    existing = read_json(Path(output_path), default={}) or {}
+    entries = existing.get("entries", {}) if existing.get("fingerprint") == fingerprint else {}
+
+    tasks = {}
+    contexts = {}
+    for cap, phase in iter_library_capabilities(knowledge_base):
+        for section_type in section_types:
+            key = entry_key(section_type, cap["id"])
+            if key in entries:
+                continue
+            context = format_band_context(section_type, cap, phase)
+            tasks[key] = (section_type, context)
+            contexts[key] = context
+
+    print(f"Building {len(tasks)} library entries ({len(entries)} already built)...")
+    # Built once and reused - entries get the full per-section output ceiling
+    results = synthesis_engine.synthesize_many(
+        tasks, VALID_AGENTS, token_budgets={key: config.CLAUDE_MAX_TOKENS for key in tasks}
+    )
+
+    failed = []
+    for key, context in contexts.items():
+        text = results.get(key)
+        # The engine returns a template rendering of the context when the API call fails
+        if not text or text in (context, render_template_section(tasks[key][0], context)):
+            failed.append(key)
+            continue
+        entries[key] = {
+            "text": text,
+            "context_hash": hashlib.sha256(context.encode("utf-8")).hexdigest()[:16],
+        }
+
+    artifact = {
+        "format_version": LIBRARY_FORMAT_VERSION,
+        "fingerprint": fingerprint,
+        "built_at": datetime.now().isoformat(),
+        "model": config.CLAUDE_MODEL,
+        "kb_version": knowledge_base.get("metadata", {}).get("version", ""),
+        "bands": {
+            section_type: {
+                "importance": _span(band_ranges(category)[0]),
+                "readiness": _span(band_ranges(category)[1]),
+            }
+            for section_type, category in LIBRARY_SECTIONS.items()
+        },
+        "entries": entries,
+    }
+    write_json_atomic(Path(output_path), artifact)
+
+    print(f"Wrote {len(entries)} entries to {output_path} (fingerprint {fingerprint})")
+    if failed:
+        print(f"{len(failed)} entries failed and can be retried by re-running: {', '.join(failed)}")
+    return artifact
+
+
+# Process-wide library used by the report generators
+synthesis_library = SynthesisLibrary(config.SYNTHESIS_LIBRARY_PATH)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute gap/strength syntheses for every capability.")
+    parser.add_argument("--output", default=str(config.SYNTHESIS_LIBRARY_PATH),
+                        help="Artifact path (default: SYNTHESIS_LIBRARY_PATH)")
+    parser.add_argument("--sections", nargs="+", default=list(LIBRARY_SECTIONS),
+                        choices=list(LIBRARY_SECTIONS), help="Section types to build")
+    args = parser.parse_args()
+
+    build_library(args.output, args.sections)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# modules/token_budget.py
+from typing import Dict, List, Tuple
+
+import config
+from modules.latency_tracker import RollingPercentiles
+
+# Output tokens a section gets before enough lengths have been observed
+DEFAULT_SECTION_TOKENS = {
+    "executive_summary": 700,
+    "urgent_gap": 600,
+    "strength": 350,
+}
+
+
+class TokenUsageTracker(RollingPercentiles):
+    """Rolling window of recent output-token counts per section type."""
+
+
+class TokenBudgetPlanner:
+    """
+    Splits a report's output-token budget (MAX_REPORT_LENGTH) across its
+    synthesized sections.
+
+    Each section type needs roughly the observed percentile of its recent
+    output lengths plus headroom (DEFAULT_SECTION_TOKENS until enough
+    samples exist), capped at CLAUDE_MAX_TOKENS. When a report's sections
+    need more than the budget, every section is scaled down towards the
+    per-section floor; if even the floors do not fit, the lowest-priority
+    sections are dropped. Tighter max_tokens also mean smaller rate-limit
+    reservations and faster generation.
+    """
+
+    def __init__(
+        self,
+        report_budget: int,
+        min_section_tokens: int,
+        max_section_tokens: int,
+        percentile: float,
+        headroom: float,
+        min_samples: int
+    ):
+        self.report_budget = report_budget
+        self.min_section_tokens = min_section_tokens
+        self.max_section_tokens = max_section_tokens
+        self.percentile = percentile
+        self.headroom = headroom
+        self.observed = TokenUsageTracker(window=config.LATENCY_WINDOW, min_samples=min_samples)
+
+    def record(self, section_type: str, output_tokens: int):
+        """Learn from one synthesized section's actual output length."""
+        if output_tokens > 0:
+            self.observed.record(section_type, output_tokens)
+
+    def section_need(self, section_type: str) -> int:
+        """max_tokens for one section of this type, ignoring the report budget."""
+        observed = self.observed.percentile(section_type, self.percentile)
+        if observed is None:
+            need = DEFAULT_SECTION_TOKENS.get(section_type, self.max_section_tokens)
+        else:
+            need = int(observed * self.headroom)
+        return min(max(need, self.min_section_tokens), self.max_section_tokens)
+
+    def plan(self, sections: List[Tuple[str, str]], reserved: int = 0) -> Dict[str, int]:
+        """
+        Allocate max_tokens to sections given as (key, section_type) in
+        priority order, most important first. reserved tokens (e.g. sections
+        served from the library) come out of the budget first.
+
+        Returns key -> max_tokens for the sections that fit; dropped keys are
+        missing and are always the lowest-priority ones (the first section is
+        never dropped).
+        """
+        if not sections:
+            return {}
+
+        available = max(self.report_budget - reserved, 0)
+        kept = list(sections)
+        while len(kept) > 1 and len(kept) * self.min_section_tokens > available:
+            kept.pop()
+
+        needs = {key: self.section_need(section_type) for key, section_type in kept}
+        if sum(needs.values()) <= available:
+            return needs
+
+        # Scale every section's share above the floor by the same factor
+        floor = self.min_section_tokens
+        extra = sum(need - floor for need in needs.values())
+        scale = max(available - floor * len(needs), 0) / extra if extra else 0.0
+        return {key: floor + int((need - floor) * scale) for key, need in needs.items()}
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Current max_tokens and sample count per section type."""
+        samples = {section_type: stats["samples"] for section_type, stats in self.observed.snapshot().items()}
+        return {
+            section_type: {"max_tokens": self.section_need(section_type), "samples": samples.get(section_type, 0)}
+            for section_type in sorted(set(DEFAULT_SECTION_TOKENS) | set(samples))
+        }
+
+
+# Process-wide planner; output lengths are learned from this worker's calls
+token_planner = TokenBudgetPlanner(
+    report_budget=config.MAX_REPORT_LENGTH,
+    min_section_tokens=config.TOKEN_BUDGET_MIN_SECTION,
+    max_section_tokens=config.CLAUDE_MAX_TOKENS,
+    percentile=config.TOKEN_BUDGET_PERCENTILE,
+    headroom=config.TOKEN_BUDGET_HEADROOM,
+    min_samples=config.TOKEN_BUDGET_MIN_SAMPLES
+)
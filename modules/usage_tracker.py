@@ -0,0 +1,276 @@
+# modules/usage_tracker.py
+import atexit
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import config
+from modules.file_lock import locked_file, read_json, write_json_atomic
+
+# Token counters reported in response.usage
+USAGE_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
+
+
+def response_usage(response) -> Dict[str, int]:
+    """Token counts from response.usage; missing or non-int fields count as 0."""
+    usage = getattr(response, "usage", None)
+    counts = {}
+    for field in USAGE_FIELDS:
+        value = getattr(usage, field, 0)
+        counts[field] = value if isinstance(value, int) else 0
+    return counts
+
+
+def estimate_cost(counts: Dict[str, int]) -> float:
+    """USD cost of a set of token counts at the configured per-MTok prices."""
+    prices = {
+        "input_tokens": config.CLAUDE_PRICE_INPUT_PER_MTOK,
+        "output_tokens": config.CLAUDE_PRICE_OUTPUT_PER_MTOK,
+        "cache_creation_input_tokens": config.CLAUDE_PRICE_CACHE_WRITE_PER_MTOK,
+        "cache_read_input_tokens": config.CLAUDE_PRICE_CACHE_READ_PER_MTOK,
+    }
+    return sum(counts.get(field, 0) * price for field, price in prices.items()) / 1_000_000
+
+
+def _add_call(bucket: Dict, counts: Dict[str, int], latency_seconds: float, cost: float):
+    """Accumulate one call into a totals bucket."""
+    bucket["requests"] = bucket.get("requests", 0) + 1
+    for field, value in counts.items():
+        bucket[field] = bucket.get(field, 0) + value
+    bucket["latency_seconds"] = round(bucket.get("latency_seconds", 0.0) + latency_seconds, 3)
+    bucket["cost_usd"] = round(bucket.get("cost_usd", 0.0) + cost, 6)
+
+
+def _merge_bucket(bucket: Dict, other: Dict):
+    """Add one totals bucket into another."""
+    for field, value in other.items():
+        bucket[field] = round(bucket.get(field, 0) + value, 6)
+
+
+def _merge_state(state: Dict, pending: Dict):
+    """Add unflushed totals and per-section buckets into a persisted state."""
+    _merge_bucket(state.setdefault("totals", {}), pending["totals"])
+    for section_type, bucket in pending["by_section"].items():
+        _merge_bucket(state.setdefault("by_section", {}).setdefault(section_type, {}), bucket)
+
+
+class ReportUsage:
+    """
+    Per-call usage for one report.
+
+    Passed down through a report's synthesis calls like the retry budget;
+    summary() is what save_assessment stores next to the report.
+    """
+
+    def __init__(self):
+        self.calls: List[Dict] = []
+        self.cache_hits = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+
+    def add(self, section_type: str, counts: Dict[str, int], latency_seconds: float, cost: float):
+        with self._lock:
+            self.calls.append({
+                "section_type": section_type,
+                **counts,
+                "latency_seconds": round(latency_seconds, 3),
+                "cost_usd": round(cost, 6),
+                "at": time.time(),
+            })
+
+    def add_cache_hit(self):
+        with self._lock:
+            self.cache_hits += 1
+
+    def add_coalesced(self):
+        """A section answered by another report's identical in-flight call."""
+        with self._lock:
+            self.coalesced += 1
+
+    def summary(self) -> Dict:
+        """Totals, per-section rollup and the per-call log."""
+        with self._lock:
+            calls = list(self.calls)
+            cache_hits = self.cache_hits
+            coalesced = self.coalesced
+
+        totals, by_section = {}, {}
+        for call in calls:
+            counts = {field: call[field] for field in USAGE_FIELDS}
+            _add_call(totals, counts, call["latency_seconds"], call["cost_usd"])
+            _add_call(by_section.setdefault(call["section_type"], {}), counts,
+                      call["latency_seconds"], call["cost_usd"])
+
+        return {
+            "model": config.CLAUDE_MODEL,
+            "requests": len(calls),
+            "cache_hits": cache_hits,
+            "coalesced": coalesced,
+            "totals": totals,
+            "by_section": by_section,
+            "calls": calls,
+        }
+
+
+class UsageTracker:
+    """
+    Running Claude token, latency and cost totals, including prompt-cache
+    writes and reads.
+
+    Keeps per-process counters plus totals persisted in a JSON file on the
+    storage volume (file-locked, shared by every worker). Saved reports are
+    also rolled up per user per day under daily/. The admin page reads both.
+
+    record() only adds to in-memory buckets; they are merged into the file
+    every flush_every calls or flush_seconds (on a background thread), with
+    each saved report, and at exit.
+    """
+
+    def __init__(self, state_path: str, flush_every: int = None, flush_seconds: float = None):
+        self.state_path = Path(state_path)
+        self.flush_every = config.USAGE_FLUSH_EVERY if flush_every is None else flush_every
+        self.flush_seconds = config.USAGE_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        self._stats_lock = threading.Lock()
+        self._process = {"requests": 0, **{field: 0 for field in USAGE_FIELDS}}
+        self._pending = {"totals": {}, "by_section": {}}
+        self._pending_since = time.time()
+        self._flushing = False
+
+    @property
+    def lock_path(self) -> Path:
+        return self.state_path.parent / f".{self.state_path.name}.lock"
+
+    @property
+    def daily_dir(self) -> Path:
+        return self.state_path.parent / "daily"
+
+    def record(
+        self,
+        response,
+        section_type: str = "",
+        latency_seconds: float = 0.0,
+        report_usage: Optional[ReportUsage] = None
+    ) -> Dict[str, int]:
+        """Add one response's usage to the report, process and persisted totals."""
+        counts = response_usage(response)
+        if not any(counts.values()):
+            return counts
+
+        cost = estimate_cost(counts)
+        if report_usage is not None:
+            report_usage.add(section_type or "other", counts, latency_seconds, cost)
+
+        with self._stats_lock:
+            self._process["requests"] += 1
+            for field, value in counts.items():
+                self._process[field] += value
+            pending = self._pending
+            for bucket in (pending["totals"], pending["by_section"].setdefault(section_type or "other", {})):
+                _add_call(bucket, counts, latency_seconds, cost)
+            due = (pending["totals"]["requests"] >= self.flush_every
+                   or time.time() - self._pending_since >= self.flush_seconds)
+            start_flush = due and not self._flushing
+            if start_flush:
+                self._flushing = True
+
+        if start_flush:
+            threading.Thread(target=self._background_flush, name="usage-flush", daemon=True).start()
+        return counts
+
+    def _background_flush(self):
+        try:
+            self.flush()
+        finally:
+            with self._stats_lock:
+                self._flushing = False
+
+    def flush(self):
+        """Merge calls recorded since the last flush into the persisted totals."""
+        with self._stats_lock:
+            pending = self._pending
+            self._pending = {"totals": {}, "by_section": {}}
+            self._pending_since = time.time()
+        if not pending["totals"]:
+            return
+
+        try:
+            with locked_file(self.lock_path):
+                state = read_json(self.state_path, default=None)
+                if not isinstance(state, dict):
+                    state = {"totals": {}, "by_section": {}}
+                _merge_state(state, pending)
+                state["updated_at"] = time.time()
+                write_json_atomic(self.state_path, state)
+        except OSError as e:
+            # Accounting is best-effort - never fail a synthesis over it
+            print(f"Usage tracking failed: {e}")
+
+    def record_user_report(self, email: str, summary: Dict, day: date = None):
+        """Roll a saved report's usage into that user's totals for the day."""
+        self.flush()
+        day = day or date.today()
+        path = self.daily_dir / f"{day.isoformat()}.json"
+        totals = summary.get("totals", {})
+
+        try:
+            with locked_file(self.daily_dir / ".daily.lock"):
+                users = read_json(path, default=None)
+                if not isinstance(users, dict):
+                    users = {}
+                bucket = users.setdefault(email, {})
+                bucket["reports"] = bucket.get("reports", 0) + 1
+                bucket["requests"] = bucket.get("requests", 0) + summary.get("requests", 0)
+                for field in (*USAGE_FIELDS, "latency_seconds", "cost_usd"):
+                    bucket[field] = round(bucket.get(field, 0) + totals.get(field, 0), 6)
+                write_json_atomic(path, users)
+        except OSError as e:
+            print(f"Daily usage rollup failed: {e}")
+
+    def daily(self, days: int = 7) -> List[Dict]:
+        """Per-user-per-day rows for the last N days, newest first."""
+        rows = []
+        today = date.today()
+        for offset in range(days):
+            day = today - timedelta(days=offset)
+            users = read_json(self.daily_dir / f"{day.isoformat()}.json", default=None) or {}
+            for email, bucket in sorted(users.items(), key=lambda item: -item[1].get("cost_usd", 0)):
+                rows.append({"date": day.isoformat(), "email": email, **bucket})
+        return rows
+
+    def stats(self) -> Dict:
+        """Process and persisted totals (including unflushed calls) with the prompt-cache read ratio."""
+        state = read_json(self.state_path, default=None) or {}
+        with self._stats_lock:
+            process = dict(self._process)
+            _merge_state(state, self._pending)
+
+        totals = state.get("totals", {})
+        return {
+            "process": process,
+            "process_cache_read_ratio": cache_read_ratio(process),
+            "totals": totals,
+            "cache_read_ratio": cache_read_ratio(totals),
+            "by_section": state.get("by_section", {}),
+        }
+
+
+def cache_read_ratio(counts: Dict[str, int]) -> float:
+    """Share of prompt input tokens that were read from the prompt cache."""
+    prompt_tokens = sum(
+        counts.get(field, 0)
+        for field in ("input_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+    )
+    return counts.get("cache_read_input_tokens", 0) / prompt_tokens if prompt_tokens else 0.0
+
+
+# Process-wide tracker; totals are shared with other workers via the volume
+usage_tracker = UsageTracker(config.USAGE_STATE_PATH)
+# Write unflushed totals on a clean shutdown
+atexit.register(usage_tracker.flush)
@@ -1,5 +1,6 @@
 import streamlit as st
 import os
+import time
 from modules.admin import (
     import_users_from_csv,
     load_allowed_users,
@@ -8,6 +9,15 @@ from modules.admin import (
     get_admin_secret,
     delete_user
 )
+from modules.circuit_breaker import claude_breaker, CLOSED, OPEN
+from modules.latency_tracker import synthesis_latency
+from modules.synthesis_engine import synthesis_engine
+from modules.usage_tracker import usage_tracker
+from modules.benchmarks import score_benchmarks
+from modules.assessment_export import assessment_exporter, capability_means
+from modules.token_budget import token_planner
+from modules.single_flight import synthesis_flights
+from modules.report_jobs import report_jobs
 
 st.set_page_config(page_title="Admin - User Management", page_icon="🔐")
 
@@ -154,3 +164,134 @@ if users:
         file_name="allowed_users.csv",
         mime="text/csv"
     )
+
+st.markdown("---")
+
+# Claude API health (circuit breaker for this server process)
+st.subheader("🩺 Claude API Health")
+
+breaker = claude_breaker.snapshot()
+state_labels = {
+    CLOSED: "🟢 Closed (normal)",
+    OPEN: "🔴 Open (serving template sections)",
+}
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("Circuit", state_labels.get(breaker["state"], "🟡 Half-open (probing)"))
+with col2:
+    st.metric("Consecutive Failures", f"{breaker['consecutive_failures']}/{breaker['failure_threshold']}")
+with col3:
+    st.metric("Short-circuited Calls", breaker["short_circuited"])
+
+if breaker["probe_in"] is not None:
+    st.info(f"Next probe in {breaker['probe_in']:.0f}s (opened {breaker['times_opened']} times)")
+if breaker["last_failure"]:
+    ago = time.time() - breaker["last_failure"]["at"]
+    st.caption(f"Last failure {ago:.0f}s ago: {breaker['last_failure']['reason']}")
+
+concurrency = synthesis_engine.concurrency.snapshot()
+st.caption(f"Adaptive concurrency: limit {concurrency['limit']:.1f} "
+           f"({concurrency['min_limit']}-{concurrency['max_limit']}), "
+           f"{concurrency['in_flight']} in flight, {concurrency['waiting']} waiting, "
+           f"{concurrency['decreases']} back-offs")
+
+flights = synthesis_flights.snapshot()
+st.caption(f"Single-flight: {flights['coalesced']} identical requests joined an in-flight call "
+           f"({flights['leaders']} calls led, {flights['in_flight']} in flight)")
+
+jobs = report_jobs.snapshot()
+st.caption(f"Report jobs: {jobs['active']} queued or running on {jobs['workers']} workers")
+
+benchmarks = score_benchmarks.snapshot()
+st.caption(f"Benchmarks: {benchmarks['assessments']} saved assessments "
+           f"across {benchmarks['capabilities']} capabilities")
+
+latency = synthesis_latency.snapshot()
+if latency:
+    st.markdown("**Recent call latency** (p95 drives request hedging)")
+    for section_type, stats in latency.items():
+        if stats["p95"] is None:
+            st.caption(f"{section_type}: {stats['samples']} samples (collecting)")
+        else:
+            st.caption(f"{section_type}: p50 {stats['p50']:.1f}s, p95 {stats['p95']:.1f}s "
+                       f"over {stats['samples']} calls")
+
+if breaker["state"] != CLOSED and st.button("Reset Circuit Breaker"):
+    claude_breaker.reset()
+    st.rerun()
+
+st.markdown("---")
+
+# Claude token usage and estimated cost (shared by every worker)
+st.subheader("💰 Claude Usage & Cost")
+
+usage = usage_tracker.stats()
+totals = usage["totals"]
+
+if totals:
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("API Calls", totals.get("requests", 0))
+    with col2:
+        st.metric("Estimated Cost", f"${totals.get('cost_usd', 0):.2f}")
+    with col3:
+        st.metric("Output Tokens", f"{totals.get('output_tokens', 0):,}")
+    with col4:
+        st.metric("Prompt Cache Reads", f"{usage['cache_read_ratio']:.0%}")
+
+    st.markdown("**By section**")
+    st.dataframe([
+        {
+            "section": section_type,
+            "calls": bucket.get("requests", 0),
+            "input": bucket.get("input_tokens", 0),
+            "output": bucket.get("output_tokens", 0),
+            "cache write": bucket.get("cache_creation_input_tokens", 0),
+            "cache read": bucket.get("cache_read_input_tokens", 0),
+            "avg latency (s)": round(bucket.get("latency_seconds", 0) / max(bucket.get("requests", 0), 1), 1),
+            "cost ($)": round(bucket.get("cost_usd", 0), 4),
+        }
+        for section_type, bucket in usage["by_section"].items()
+    ])
+else:
+    st.info("No Claude calls recorded yet.")
+
+budgets = token_planner.snapshot()
+st.caption(f"Report output budget {token_planner.report_budget:,} tokens; per-section max_tokens: "
+           + ", ".join(f"{section_type} {plan['max_tokens']} ({plan['samples']} samples)"
+                       for section_type, plan in budgets.items()))
+
+daily = usage_tracker.daily(days=7)
+if daily:
+    st.markdown("**Per user per day** (last 7 days)")
+    st.dataframe([
+        {
+            "date": row["date"],
+            "email": row["email"],
+            "reports": row.get("reports", 0),
+            "calls": row.get("requests", 0),
+            "input": row.get("input_tokens", 0),
+            "output": row.get("output_tokens", 0),
+            "cost ($)": round(row.get("cost_usd", 0), 4),
+        }
+        for row in daily
+    ])
+
+st.markdown("---")
+
+# Columnar export of every stored assessment (also: make export)
+st.subheader("📈 Assessment Analytics")
+
+if st.button("Update Analytics Export"):
+    result = assessment_exporter.run()
+    st.toast(f"Exported {result['added']} new assessments in {result['seconds']}s")
+
+export = assessment_exporter.snapshot()
+st.caption(f"Analytics export: {export['rows']} assessments in {export['parts']} Parquet parts "
+           f"at {assessment_exporter.export_dir}")
+
+if export["rows"]:
+    frame = assessment_exporter.load()
+    st.markdown("**Mean scores by capability** (scored assessments only)")
+    st.dataframe(capability_means(frame))
@@ -0,0 +1,51 @@
+"""
+Shared pytest fixtures.
+
+Keeps tests away from the real storage volume so cached or recorded state
+from one run never leaks into the next.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modules.synthesis_cache import synthesis_cache
+from modules.rate_limiter import claude_rate_limiter
+from modules.synthesis_library import synthesis_library
+from modules.usage_tracker import usage_tracker
+from modules.circuit_breaker import claude_breaker
+from modules.latency_tracker import synthesis_latency
+from modules.token_budget import token_planner
+from modules.benchmarks import score_benchmarks
+from modules.assessment_export import assessment_exporter
+from modules import storage
+from modules.report_jobs import report_jobs
+
+
+@pytest.fixture(autouse=True)
+def isolated_storage(tmp_path, monkeypatch):
+    """Point process-wide persistent state at a per-test temp directory."""
+    monkeypatch.setattr(synthesis_cache, "cache_dir", tmp_path / "synthesis_cache")
+    monkeypatch.setattr(claude_rate_limiter, "state_path", tmp_path / "rate_limits" / "claude.json")
+    monkeypatch.setattr(synthesis_library, "path", tmp_path / "synthesis_library.json")
+    monkeypatch.setattr(usage_tracker, "state_path", tmp_path / "usage" / "claude.json")
+    monkeypatch.setattr(storage, "STORAGE_DIR", tmp_path / "users")
+    monkeypatch.setattr(score_benchmarks, "state_path", tmp_path / "benchmarks" / "scores.json")
+    monkeypatch.setattr(assessment_exporter, "export_dir", tmp_path / "analytics")
+    monkeypatch.setattr(report_jobs, "jobs_dir", tmp_path / "report_jobs")
+    claude_breaker.reset()
+    synthesis_latency.reset()
+    token_planner.observed.reset()
+    yield tmp_path
+    # Let background report jobs finish before the storage patches are undone
+    report_jobs.shutdown()
+    # Write batched state into this test's directory, not the real volume
+    synthesis_cache.flush()
+    usage_tracker.flush()
+    claude_breaker.reset()
+    synthesis_latency.reset()
+    token_planner.observed.reset()
@@ -0,0 +1,146 @@
+"""
+Test suite for the incremental Parquet analytics export.
+
+Tests:
+- Every stored assessment becomes one row with per-capability I/R columns
+- Later runs parse and append only assessments saved since the last run
+- The manifest keeps a per-user high-water mark, not every exported id
+- Non-integer scores become nulls instead of failing the export
+- Part files are merged past max_parts; stray parts are removed
+- A schema change re-exports everything; means skip unscored cells
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from grid_layout import get_all_capabilities
+from modules import assessment_export, storage
+from modules.assessment_export import AssessmentExporter, capability_means
+from modules.storage import save_assessment
+
+CELLS = get_all_capabilities()
+
+
+def save(email, importance, readiness, count=3, usage=None):
+    scores = {
+        cell["id"]: {"importance": importance, "readiness": readiness, "phase_id": cell["phase_id"]}
+        for cell in CELLS[:count]
+    }
+    return save_assessment({"email": email, "name": email.split("@")[0]}, scores, "# Report", usage=usage)
+
+
+@pytest.fixture
+def exporter(tmp_path):
+    return AssessmentExporter(tmp_path / "export", max_parts=3)
+
+
+class TestExport:
+    """Test rows and incremental runs."""
+
+    def test_rows_and_columns(self, exporter):
+        assessment_id = save("a@example.com", 9, 2, usage={"totals": {"cost_usd": 0.25}})
+        save("b@example.com", 5, 0)
+
+        result = exporter.run()
+        frame = exporter.load()
+
+        assert result["added"] == 2 and result["rows"] == 2
+        assert len(frame) == 2
+        row = frame[frame["assessment_id"] == assessment_id].iloc[0]
+        cap_id, unscored_cap = CELLS[0]["id"], CELLS[5]["id"]
+        assert row["user_email"] == "a@example.com"
+        assert row[f"{cap_id}_importance"] == 9 and row[f"{cap_id}_readiness"] == 2
+        assert row["capabilities_scored"] == 3
+        assert row["report_cost_usd"] == 0.25
+        assert frame[f"{unscored_cap}_importance"].isna().all()
+        assert str(frame["timestamp"].dtype).startswith("datetime64")
+
+    def test_only_new_assessments_parsed(self, exporter, monkeypatch):
+        save("a@example.com", 9, 2)
+        exporter.run()
+
+        parsed = []
+        read_scores_file = storage.read_scores_file
+        monkeypatch.setattr(storage, "read_scores_file", lambda path: parsed.append(path) or read_scores_file(path))
+
+        assert exporter.run()["added"] == 0
+        assert parsed == []
+
+        save("a@example.com", 7, 7)
+        save("c@example.com", 8, 3)
+        result = exporter.run()
+
+        assert result["added"] == 2 and len(parsed) == 2
+        assert result["rows"] == 3 and result["parts"] == 2
+        assert exporter.load()["assessment_id"].is_unique
+
+    def test_parts_merged_and_strays_removed(self, exporter):
+        for i in range(5):
+            save(f"user{i}@example.com", 9, 2)
+            exporter.run()
+        (exporter.export_dir / "part-99999.parquet").write_bytes(b"partial")
+
+        result = exporter.run()
+
+        assert result["parts"] <= 3
+        assert len(exporter.load()) == 5
+        assert not (exporter.export_dir / "part-99999.parquet").exists()
+
+    def test_manifest_keeps_high_water_mark(self, exporter, monkeypatch):
+        first = save("a@example.com", 9, 2)
+        exporter.run()
+
+        manifest = exporter._manifest()
+        (user_key, mark), = manifest["exported"].items()
+        assert mark["recent"] == [first]
+
+        # Once the save has settled the mark covers it and the list empties
+        monkeypatch.setattr(assessment_export, "SETTLE_SECONDS", -60)
+        second = save("a@example.com", 7, 7)
+        exporter.run()
+        mark = exporter._manifest()["exported"][user_key]
+
+        assert mark["recent"] == [] and mark["through"] >= second
+        assert exporter.run()["added"] == 0
+        assert len(exporter.load()) == 2
+
+    def test_non_integer_scores_become_null(self, exporter):
+        assessment_id = save("a@example.com", 9, 2)
+        path = next(storage.STORAGE_DIR.glob(f"*/scores_{assessment_id}.json"))
+        cap_id, other = CELLS[0]["id"], CELLS[1]["id"]
+        data = {
+            "assessment_id": assessment_id, "user": {"email": "a@example.com"}, "timestamp": "not a date",
+            "scores": {cap_id: {"importance": "9", "readiness": 2.5}, other: {"importance": 8, "readiness": 3}},
+        }
+        path.write_text(json.dumps(data))
+        save("b@example.com", 5, 5)
+
+        assert exporter.run()["added"] == 2
+        row = exporter.load().set_index("assessment_id").loc[assessment_id]
+        assert row.isna()[[f"{cap_id}_importance", f"{cap_id}_readiness", "timestamp"]].all()
+        assert row[f"{other}_importance"] == 8
+        assert row["capabilities_scored"] == 1
+
+    def test_schema_change_reexports(self, exporter, monkeypatch):
+        save("a@example.com", 9, 2)
+        exporter.run()
+
+        monkeypatch.setattr(assessment_export, "EXPORT_FORMAT_VERSION", assessment_export.EXPORT_FORMAT_VERSION + 1)
+        result = exporter.run()
+
+        assert result["added"] == 1 and result["rows"] == 1 and result["parts"] == 1
+
+
+def test_capability_means(exporter):
+    save("a@example.com", 9, 2)
+    save("b@example.com", 7, 4)
+    save("c@example.com", 5, 0)
+    exporter.run()
+
+    means = {row["capability"]: row for row in capability_means(exporter.load())}
+
+    assert means[CELLS[0]["id"]] == {"capability": CELLS[0]["id"], "assessments": 2, "importance": 8.0, "readiness": 3.0}
+    assert means[CELLS[10]["id"]]["assessments"] == 0 and means[CELLS[10]["id"]]["importance"] is None
@@ -0,0 +1,104 @@
+"""
+Test suite for the compact assessment score representation.
+
+Tests:
+- Form-score dicts round-trip through the array, bytes and base64 unchanged
+- Anything the array cannot represent exactly is rejected
+- save_assessment stores grid scores encoded and load_assessment returns the dict
+- Packed scores stack into the same matrices as assessment_matrix
+"""
+
+import json
+import random
+
+import pytest
+
+from grid_layout import get_all_capabilities
+from modules.assessment_scores import ENCODED_BYTES, AssessmentScores
+from modules.storage import get_user_storage_path, load_assessment, save_assessment
+
+USER = {"email": "user@example.com", "name": "User"}
+
+
+def form_scores(seed=0, skip=0):
+    rng = random.Random(seed)
+    cells = get_all_capabilities()[skip:]
+    return {
+        cell["id"]: {"importance": rng.randint(0, 10), "readiness": rng.randint(0, 10), "phase_id": cell["phase_id"]}
+        for cell in cells
+    }
+
+
+class TestConversion:
+    """Test loss-free conversion."""
+
+    def test_round_trip(self):
+        scores = form_scores(skip=5)
+
+        compact = AssessmentScores.from_dict(scores)
+
+        assert compact.to_dict() == scores
+        assert len(compact) == len(scores)
+        assert len(compact.to_bytes()) == ENCODED_BYTES == 84
+        assert AssessmentScores.decode(compact.encode()) == compact
+        assert AssessmentScores.decode(compact.encode()).to_dict() == scores
+
+    def test_absent_differs_from_unscored(self):
+        cap_id = get_all_capabilities()[0]["id"]
+        compact = AssessmentScores.from_dict({})
+
+        compact.set(cap_id, 0, 0)
+        assert compact.get(cap_id) == (0, 0) and cap_id in compact
+
+        compact.discard(cap_id)
+        assert compact.get(cap_id) is None and len(compact) == 0
+
+    def test_unrepresentable_rejected(self):
+        cell = get_all_capabilities()[0]
+        with pytest.raises(ValueError):
+            AssessmentScores.from_dict({"unknown": {"importance": 1, "readiness": 1, "phase_id": "x"}})
+        with pytest.raises(ValueError):
+            AssessmentScores.from_dict({cell["id"]: {"importance": 11, "readiness": 1, "phase_id": cell["phase_id"]}})
+        with pytest.raises(ValueError):
+            AssessmentScores.from_dict({cell["id"]: {"importance": 1, "readiness": 1, "phase_id": "other"}})
+        with pytest.raises(ValueError):
+            AssessmentScores.from_dict({cell["id"]: {"importance": 1, "readiness": 1}})
+        with pytest.raises(ValueError):
+            AssessmentScores.from_bytes(b"\x01" * 10)
+        with pytest.raises(ValueError):
+            AssessmentScores.from_bytes(b"\x0b" * ENCODED_BYTES)
+
+
+class TestStorage:
+    """Test the stored format."""
+
+    def test_grid_scores_stored_encoded(self):
+        scores = form_scores(seed=1)
+
+        assessment_id = save_assessment(USER, scores, "# Report")
+
+        stored = json.loads((get_user_storage_path(USER["email"]) / f"scores_{assessment_id}.json").read_text())
+        assert stored["scores_encoding"] == "assessment-scores-v1"
+        assert isinstance(stored["scores"], str)
+        loaded = load_assessment(USER["email"], assessment_id)
+        assert loaded["scores"] == scores
+        assert "scores_encoding" not in loaded
+
+    def test_other_scores_stored_as_dict(self):
+        assessment_id = save_assessment(USER, {"cap": 1}, "# Report")
+
+        assert load_assessment(USER["email"], assessment_id)["scores"] == {"cap": 1}
+
+
+def test_stack_matches_assessment_matrix():
+    np = pytest.importorskip("numpy")
+    from modules.batch_scoring import assessment_matrix, stack_scores
+
+    score_sets = [form_scores(seed=seed, skip=seed) for seed in range(4)]
+    compact = [AssessmentScores.from_dict(scores) for scores in score_sets]
+
+    importance, readiness, capability_ids = stack_scores(compact)
+    expected_importance, expected_readiness, _ = assessment_matrix(score_sets, capability_ids)
+
+    np.testing.assert_array_equal(importance, expected_importance)
+    np.testing.assert_array_equal(readiness, expected_readiness)
@@ -0,0 +1,101 @@
+"""
+Test suite for vectorized batch scoring.
+
+Tests:
+- Lookup tables match categorize_priority / calculate_gap_score for every score pair
+- Batches of assessments score identically to the scalar functions
+- Out-of-range and mismatched inputs are rejected
+- Stored scores stack into matrices; per-assessment category counts
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import config
+from modules.batch_scoring import (
+    CATEGORIES,
+    TIMELINES,
+    assessment_matrix,
+    category_counts,
+    score_batch
+)
+from modules.score_analyzer import TIMELINE_MAPPING, calculate_gap_score, categorize_priority
+
+
+class TestScoreBatch:
+    """Test agreement with the scalar scoring functions."""
+
+    def test_every_score_pair_matches_scalar(self):
+        importance, readiness = np.meshgrid(np.arange(11), np.arange(11), indexing="ij")
+
+        result = score_batch(importance, readiness)
+
+        for i in range(11):
+            for r in range(11):
+                category = categorize_priority(i, r)
+                assert CATEGORIES[result["category"][i, r]] == category
+                assert result["gap_score"][i, r] == calculate_gap_score(i, r)
+                assert TIMELINES[result["timeline"][i, r]] == TIMELINE_MAPPING[category]
+
+    def test_random_batch_matches_scalar(self):
+        rng = np.random.default_rng(7)
+        importance = rng.integers(0, 11, size=(500, 42))
+        readiness = rng.integers(0, 11, size=(500, 42))
+
+        result = score_batch(importance, readiness)
+
+        expected = np.vectorize(lambda i, r: CATEGORIES.index(categorize_priority(i, r)))(importance, readiness)
+        np.testing.assert_array_equal(result["category"], expected)
+        np.testing.assert_array_equal(
+            result["gap_score"], np.vectorize(calculate_gap_score)(importance, readiness)
+        )
+
+    def test_thresholds_from_config(self, monkeypatch):
+        monkeypatch.setattr(config, "IMPORTANCE_HIGH_THRESHOLD", 9)
+
+        result = score_batch(np.array([8]), np.array([2]))
+
+        assert CATEGORIES[result["category"][0]] == categorize_priority(8, 2) == "OPPORTUNITY"
+
+    def test_invalid_input_rejected(self):
+        with pytest.raises(ValueError):
+            score_batch(np.array([11]), np.array([2]))
+        with pytest.raises(ValueError):
+            score_batch(np.array([-1]), np.array([2]))
+        with pytest.raises(ValueError):
+            score_batch(np.array([5.5]), np.array([2.0]))
+        with pytest.raises(ValueError):
+            score_batch(np.zeros((2, 3), dtype=int), np.zeros((3, 2), dtype=int))
+
+
+class TestAssessmentMatrix:
+    """Test stacking stored assessments."""
+
+    def test_stacks_and_counts(self):
+        assessments = [
+            {"a": {"importance": 9, "readiness": 2}, "b": {"importance": 8, "readiness": 8}},
+            {"b": {"importance": 9, "readiness": 1}, "c": {"importance": 0, "readiness": 5}},
+        ]
+
+        importance, readiness, capability_ids = assessment_matrix(assessments)
+
+        assert capability_ids == ["a", "b", "c"]
+        np.testing.assert_array_equal(importance, [[9, 8, 0], [0, 9, 0]])
+        np.testing.assert_array_equal(readiness, [[2, 8, 0], [0, 1, 5]])
+
+        result = score_batch(importance, readiness)
+        counts = category_counts(result["category"], scored=(importance > 0) & (readiness > 0))
+
+        urgent, strength = CATEGORIES.index("URGENT_GAP"), CATEGORIES.index("STRENGTH")
+        assert counts.shape == (2, len(CATEGORIES))
+        assert counts[0, urgent] == 1 and counts[0, strength] == 1
+        assert counts[1, urgent] == 1 and counts[1].sum() == 1
+
+    def test_explicit_columns(self):
+        importance, _, capability_ids = assessment_matrix(
+            [{"a": {"importance": 9, "readiness": 2}, "z": {"importance": 5, "readiness": 5}}], ["b", "a"]
+        )
+
+        assert capability_ids == ["b", "a"]
+        np.testing.assert_array_equal(importance, [[0, 9]])
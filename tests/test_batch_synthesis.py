@@ -0,0 +1,128 @@
+"""
+Test suite for batched urgent-gap synthesis.
+
+Tests:
+- Batch prompt lists every gap once with shared instructions
+- Batch responses parse with fences, prose and missing ids
+- Engine sends one request per batch and caches per gap
+- Gaps missing from a batched response fall back to single requests
+"""
+
+import json
+from unittest.mock import Mock
+
+from modules.report_generator import (
+    build_batch_gap_prompt,
+    message_text,
+    parse_batch_response,
+    VALID_AGENTS
+)
+from modules.synthesis_engine import SynthesisEngine
+
+
+class BatchMessages:
+    """Async client.messages stand-in that answers batch prompts as JSON."""
+
+    def __init__(self, drop_ids=()):
+        self.drop_ids = set(drop_ids)
+        self.prompts = []
+
+    async def create(self, **kwargs):
+        prompt = message_text(kwargs["messages"])
+        self.prompts.append(prompt)
+
+        response = Mock()
+        if "RESPONSE FORMAT" in prompt:
+            ids = [
+                line.split("capability_id: ")[1].rstrip(" =")
+                for line in prompt.splitlines()
+                if line.startswith("=== capability_id: ")
+            ]
+            body = {cap_id: f"Batched {cap_id}" for cap_id in ids if cap_id not in self.drop_ids}
+            response.content = [Mock(text=json.dumps(body))]
+        else:
+            response.content = [Mock(text="Single synthesis")]
+        return response
+
+
+def make_engine(messages):
+    engine = SynthesisEngine(max_in_flight=4)
+    engine.client = Mock(messages=messages)
+    return engine
+
+
+class TestBatchPrompt:
+    """Test batch prompt construction and response parsing."""
+
+    def test_prompt_contains_each_gap_once(self):
+        prompt = build_batch_gap_prompt({"cap_a": "Context A", "cap_b": "Context B"}, VALID_AGENTS)
+
+        assert prompt.count("=== capability_id: cap_a ===") == 1
+        assert prompt.count("=== capability_id: cap_b ===") == 1
+        assert prompt.count("VALID AGENT NAMES") == 1
+        assert "Context A" in prompt and "Context B" in prompt
+
+    def test_parse_plain_json(self):
+        text = json.dumps({"cap_a": "Section A", "cap_b": "Section B"})
+        assert parse_batch_response(text, ["cap_a", "cap_b"]) == {"cap_a": "Section A", "cap_b": "Section B"}
+
+    def test_parse_code_fence_and_prose(self):
+        fenced = '```json\n{"cap_a": "Section A"}\n```'
+        prose = 'Here you go:\n{"cap_a": "Section A"}\nThanks.'
+        assert parse_batch_response(fenced, ["cap_a"]) == {"cap_a": "Section A"}
+        assert parse_batch_response(prose, ["cap_a"]) == {"cap_a": "Section A"}
+
+    def test_parse_drops_unexpected_and_empty(self):
+        text = json.dumps({"cap_a": "Section A", "cap_b": "", "other": "Extra", "cap_c": 3})
+        assert parse_batch_response(text, ["cap_a", "cap_b", "cap_c"]) == {"cap_a": "Section A"}
+
+    def test_parse_garbage_returns_empty(self):
+        assert parse_batch_response("not json at all", ["cap_a"]) == {}
+
+
+class TestEngineBatching:
+    """Test batched synthesis on the async engine."""
+
+    def test_gaps_share_one_request(self):
+        messages = BatchMessages()
+        engine = make_engine(messages)
+
+        tasks = {f"cap_{i}": ("urgent_gap", f"Context {i}") for i in range(4)}
+        tasks["executive_summary"] = ("executive_summary", "Exec context")
+        results = engine.synthesize_many(tasks, VALID_AGENTS, batch_size=4)
+
+        assert len(messages.prompts) == 2  # One batch + executive summary
+        assert results["cap_2"] == "Batched cap_2"
+        assert results["executive_summary"] == "Single synthesis"
+
+    def test_batch_size_splits_gaps(self):
+        messages = BatchMessages()
+        engine = make_engine(messages)
+
+        tasks = {f"cap_{i}": ("urgent_gap", f"Context {i}") for i in range(5)}
+        results = engine.synthesize_many(tasks, VALID_AGENTS, batch_size=2)
+
+        assert len(messages.prompts) == 3
+        assert set(results) == set(tasks)
+
+    def test_missing_gap_falls_back_to_single_request(self):
+        messages = BatchMessages(drop_ids={"cap_1"})
+        engine = make_engine(messages)
+
+        tasks = {f"cap_{i}": ("urgent_gap", f"Context {i}") for i in range(3)}
+        results = engine.synthesize_many(tasks, VALID_AGENTS, batch_size=3)
+
+        assert results["cap_0"] == "Batched cap_0"
+        assert results["cap_1"] == "Single synthesis"
+        assert len(messages.prompts) == 2
+
+    def test_batched_gaps_are_cached_per_gap(self):
+        messages = BatchMessages()
+        engine = make_engine(messages)
+
+        tasks = {f"cap_{i}": ("urgent_gap", f"Context {i}") for i in range(3)}
+        engine.synthesize_many(tasks, VALID_AGENTS, batch_size=3)
+        results = engine.synthesize_many({"cap_1": tasks["cap_1"]}, VALID_AGENTS)
+
+        assert results["cap_1"] == "Batched cap_1"
+        assert len(messages.prompts) == 1
@@ -0,0 +1,89 @@
+"""
+Test suite for cross-user score benchmarks.
+
+Tests:
+- Running mean and variance match a full recomputation
+- Percentile ranks come from the histogram; ties count half
+- Unscored capabilities are skipped; percentiles wait for min_samples
+- save_assessment updates the statistics without rescanning storage
+- Lookups pick up writes from other workers
+"""
+
+import random
+import statistics
+
+import pytest
+
+from modules import storage
+from modules.benchmarks import BenchmarkStore, score_benchmarks
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BenchmarkStore(tmp_path / "benchmarks.json", min_samples=3)
+
+
+def form_scores(importance, readiness):
+    return {"cap_a": {"importance": importance, "readiness": readiness}}
+
+
+class TestStatistics:
+    """Test the running statistics."""
+
+    def test_mean_and_variance_match_recomputation(self, store):
+        rng = random.Random(3)
+        readiness = [rng.randint(1, 10) for _ in range(200)]
+        for score in readiness:
+            store.record(form_scores(5, score))
+
+        stats = store.stats("cap_a", "readiness")
+
+        assert stats["count"] == 200
+        assert stats["mean"] == pytest.approx(statistics.mean(readiness))
+        assert stats["variance"] == pytest.approx(statistics.variance(readiness))
+        assert sum(stats["histogram"]) == 200
+
+    def test_percentile_rank(self, store):
+        for score in (2, 4, 4, 8):
+            store.record(form_scores(5, score))
+
+        assert store.percentile("cap_a", "readiness", 1) == 0.0
+        assert store.percentile("cap_a", "readiness", 4) == pytest.approx(50.0)
+        assert store.percentile("cap_a", "readiness", 9) == 100.0
+
+    def test_unscored_skipped_until_min_samples(self, store):
+        store.record(form_scores(0, 0))
+        store.record(form_scores(7, 3))
+        store.record(form_scores(7, 3))
+
+        assert store.stats("cap_a", "readiness")["count"] == 2
+        assert store.percentile("cap_a", "readiness", 3) is None
+        assert store.percentile("cap_missing", "readiness", 3) is None
+        assert store.snapshot() == {"assessments": 3, "capabilities": 1}
+
+        store.record(form_scores(7, 5))
+        assert store.percentile("cap_a", "readiness", 5) == pytest.approx(100 * 2.5 / 3)
+
+
+class TestSaveAssessment:
+    """Test the storage hook."""
+
+    def test_save_updates_benchmarks(self, monkeypatch):
+        monkeypatch.setattr(score_benchmarks, "min_samples", 1)
+        user = {"email": "user@example.com", "name": "User"}
+
+        storage.save_assessment(user, form_scores(9, 2), "# Report")
+        storage.save_assessment(user, form_scores(9, 6), "# Report")
+
+        assert score_benchmarks.snapshot()["assessments"] == 2
+        assert score_benchmarks.stats("cap_a", "importance")["mean"] == 9
+        assert score_benchmarks.percentile("cap_a", "readiness", 6) == pytest.approx(75.0)
+
+    def test_lookup_sees_other_workers(self, store):
+        store.record(form_scores(5, 5))
+        assert store.stats("cap_a", "readiness")["count"] == 1
+
+        other = BenchmarkStore(store.state_path)
+        other.record(form_scores(5, 6))
+
+        assert store.stats("cap_a", "readiness")["count"] == 2
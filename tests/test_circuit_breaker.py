@@ -0,0 +1,144 @@
+"""
+Test suite for the Claude circuit breaker and degraded-mode templates.
+
+Tests:
+- Breaker opens after consecutive outage failures or slow calls
+- Rate limits and client errors do not trip it
+- Half-open allows a single probe that closes or re-opens it
+- An abandoned probe frees the slot without counting an outcome
+- Open breaker short-circuits synthesis to a template rendering
+- Template rendering keeps the structured section layout
+"""
+
+from unittest.mock import Mock, patch
+
+import anthropic
+import pytest
+
+from modules.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN, claude_breaker
+from modules.report_generator import (
+    format_gap_context,
+    format_strength_context,
+    render_template_section,
+    synthesize_with_claude,
+    VALID_AGENTS
+)
+from tests.test_claude_synthesis import SAMPLE_GAP, SAMPLE_KB_DATA, SAMPLE_STRENGTH
+
+
+def api_error(status_code):
+    response = Mock(status_code=status_code, headers={})
+    return anthropic.APIStatusError(f"Error {status_code}", response=response, body=None)
+
+
+@pytest.fixture
+def breaker():
+    return CircuitBreaker(failure_threshold=3, slow_call_seconds=1.0, reset_timeout=10.0)
+
+
+class TestBreakerStates:
+    """Test state transitions."""
+
+    def test_opens_after_consecutive_failures(self, breaker):
+        for _ in range(3):
+            assert breaker.allow_request()
+            breaker.record_failure(api_error(529))
+
+        assert breaker.state == OPEN
+        assert not breaker.allow_request()
+        assert breaker.snapshot()["short_circuited"] == 1
+
+    def test_success_resets_failure_count(self, breaker):
+        breaker.record_failure(api_error(503))
+        breaker.record_failure(api_error(503))
+        breaker.record_success(0.1)
+        breaker.record_failure(api_error(503))
+
+        assert breaker.state == CLOSED
+        assert breaker.consecutive_failures == 1
+
+    def test_slow_calls_count_as_failures(self, breaker):
+        for _ in range(3):
+            breaker.record_success(5.0)
+        assert breaker.state == OPEN
+
+    def test_rate_limits_and_client_errors_do_not_trip(self, breaker):
+        for _ in range(5):
+            breaker.record_failure(api_error(429))
+            breaker.record_failure(api_error(400))
+            breaker.record_failure(ValueError("bad prompt"))
+        assert breaker.state == CLOSED
+
+    def test_half_open_single_probe_closes(self, breaker):
+        for _ in range(3):
+            breaker.record_failure(api_error(529))
+
+        with patch("modules.circuit_breaker.time.time", return_value=breaker.opened_at + 11):
+            assert breaker.allow_request()
+            assert breaker.state == HALF_OPEN
+            assert not breaker.allow_request()  # Only one probe at a time
+
+        breaker.record_success(0.2)
+        assert breaker.state == CLOSED
+        assert breaker.allow_request()
+
+    def test_failed_probe_reopens(self, breaker):
+        for _ in range(3):
+            breaker.record_failure(api_error(529))
+        first_open = breaker.opened_at
+
+        with patch("modules.circuit_breaker.time.time", return_value=first_open + 11):
+            assert breaker.allow_request()
+            breaker.record_failure(api_error(529))
+
+        assert breaker.state == OPEN
+        assert breaker.snapshot()["times_opened"] == 2
+
+    def test_released_probe_lets_next_call_probe(self, breaker):
+        for _ in range(3):
+            breaker.record_failure(api_error(529))
+
+        with patch("modules.circuit_breaker.time.time", return_value=breaker.opened_at + 11):
+            assert breaker.allow_request()
+            breaker.release_probe()
+            assert breaker.state == HALF_OPEN
+            assert breaker.allow_request()
+            assert not breaker.allow_request()
+
+        assert breaker.consecutive_failures == 3
+
+
+class TestDegradedMode:
+    """Test template fallback while the breaker is open."""
+
+    @patch('modules.report_generator.client')
+    def test_open_breaker_skips_api(self, mock_client):
+        for _ in range(claude_breaker.failure_threshold):
+            claude_breaker.record_failure(api_error(529))
+
+        context = format_gap_context(SAMPLE_GAP, SAMPLE_KB_DATA)
+        result = synthesize_with_claude("urgent_gap", context, VALID_AGENTS)
+
+        mock_client.messages.create.assert_not_called()
+        assert result == render_template_section("urgent_gap", context)
+
+    def test_gap_template_layout(self):
+        context = format_gap_context(SAMPLE_GAP, SAMPLE_KB_DATA)
+        section = render_template_section("urgent_gap", context)
+
+        assert section.startswith("**Why This Matters:**\nThis capability is critical")
+        assert "*AI Agents:*\n• Billing Operations Agent" in section
+        assert "*Platform Features:*\n• Feature A\n• Feature B" in section
+        assert "*MCP Tools:*\n• zuora_codegen" in section
+        assert "**What's Coming:**\n• Enhanced AI routing" in section
+
+    def test_strength_template_layout(self):
+        context = format_strength_context(SAMPLE_STRENGTH, SAMPLE_KB_DATA)
+        section = render_template_section("strength", context)
+
+        assert section.startswith("**Why This Is A Strength:**")
+        assert "- Billing Operations Agent" in section
+        assert "- Revenue Narrator" in section
+
+    def test_unstructured_context_returned_as_is(self):
+        assert render_template_section("executive_summary", "Raw summary") == "Raw summary"
@@ -23,6 +23,7 @@ from modules.report_generator import (
     format_gap_context,
     format_strength_context,
     format_executive_context,
+    message_text,
     VALID_AGENTS,
     SYNTHESIS_SYSTEM_PROMPT
 )
@@ -149,7 +150,7 @@ class TestClaudeSynthesis:
         # Verify correct model and parameters
         assert call_args[1]['model'] == 'claude-sonnet-4-20250514'
         assert call_args[1]['max_tokens'] == 1500
-        assert call_args[1]['system'] == SYNTHESIS_SYSTEM_PROMPT
+        assert call_args[1]['system'][0]['text'] == SYNTHESIS_SYSTEM_PROMPT
 
         # Verify result
         assert result == "This is synthesized strategic content."
@@ -169,7 +170,7 @@ class TestClaudeSynthesis:
 
         # Get the user prompt that was sent
         call_args = mock_client.messages.create.call_args
-        user_message = call_args[1]['messages'][0]['content']
+        user_message = message_text(call_args[1]['messages'])
 
         # Verify agent list is in prompt
         assert 'VALID AGENT NAMES' in user_message
@@ -201,12 +202,12 @@ class TestClaudeSynthesis:
 
         # Test executive summary
         synthesize_with_claude("executive_summary", "Context", VALID_AGENTS)
-        exec_call = mock_client.messages.create.call_args[1]['messages'][0]['content']
+        exec_call = message_text(mock_client.messages.create.call_args[1]['messages'])
         assert 'C-level audience' in exec_call
 
         # Test urgent gap - check for new structured format
         synthesize_with_claude("urgent_gap", "Context", VALID_AGENTS)
-        gap_call = mock_client.messages.create.call_args[1]['messages'][0]['content']
+        gap_call = message_text(mock_client.messages.create.call_args[1]['messages'])
         assert 'STRUCTURED format' in gap_call
         assert 'Why This Matters' in gap_call
         assert 'Available Today' in gap_call
@@ -215,7 +216,7 @@ class TestClaudeSynthesis:
 
         # Test strength - check for new structured format
         synthesize_with_claude("strength", "Context", VALID_AGENTS)
-        strength_call = mock_client.messages.create.call_args[1]['messages'][0]['content']
+        strength_call = message_text(mock_client.messages.create.call_args[1]['messages'])
         assert 'Why This Is A Strength' in strength_call
         assert "What's Working" in strength_call
         assert 'Protect By' in strength_call
@@ -237,7 +238,7 @@ class TestAgentValidation:
             VALID_AGENTS
         )
 
-        user_message = mock_client.messages.create.call_args[1]['messages'][0]['content']
+        user_message = message_text(mock_client.messages.create.call_args[1]['messages'])
 
         # Verify known valid agents are in the list
         assert 'Billing Operations Agent' in user_message
@@ -0,0 +1,129 @@
+"""
+Test suite for the adaptive (AIMD) concurrency limit.
+
+Tests:
+- Additive increase on healthy responses, capped at max
+- Multiplicative decrease on 429/529, floored at min, with cooldown
+- Rising latency triggers a decrease
+- Waiters block at the limit and wake on release
+- Urgent gaps beyond the report cap are listed, not dropped
+"""
+
+import asyncio
+from unittest.mock import Mock
+
+import anthropic
+import pytest
+
+from modules.concurrency_controller import AdaptiveConcurrencyLimit, is_overload
+from modules.concurrent_generator import format_remaining_gaps
+from modules.latency_tracker import synthesis_latency
+
+
+def api_error(status_code):
+    response = Mock(status_code=status_code, headers={})
+    return anthropic.APIStatusError(f"Error {status_code}", response=response, body=None)
+
+
+@pytest.fixture
+def limit():
+    return AdaptiveConcurrencyLimit(
+        initial_limit=4, min_limit=2, max_limit=8,
+        decrease_factor=0.5, latency_tolerance=3.0, decrease_cooldown=0.0
+    )
+
+
+class TestAIMD:
+    """Test limit adjustments."""
+
+    def test_additive_increase(self, limit):
+        for _ in range(4):
+            limit.on_success("urgent_gap", 1.0)
+        assert 4.9 < limit.limit < 5.1
+
+    def test_increase_capped_at_max(self, limit):
+        for _ in range(500):
+            limit.on_success("urgent_gap", 1.0)
+        assert limit.limit == 8
+
+    def test_overload_halves_limit(self, limit):
+        limit.on_error(api_error(529))
+        assert limit.limit == 2.0
+        limit.on_error(api_error(429))
+        assert limit.limit == 2.0  # Floor
+
+    def test_other_errors_leave_limit(self, limit):
+        limit.on_error(api_error(500))
+        limit.on_error(ValueError("bad"))
+        assert limit.limit == 4.0
+
+    def test_cooldown_spaces_decreases(self):
+        limit = AdaptiveConcurrencyLimit(
+            initial_limit=16, min_limit=1, max_limit=16,
+            decrease_factor=0.5, latency_tolerance=3.0, decrease_cooldown=60.0
+        )
+        for _ in range(5):
+            limit.on_error(api_error(429))
+        assert limit.limit == 8.0
+
+    def test_rising_latency_decreases(self, limit):
+        for _ in range(20):
+            synthesis_latency.record("urgent_gap", 1.0)
+
+        limit.on_success("urgent_gap", 10.0)
+
+        assert limit.limit == 2.0
+
+    def test_overload_classification(self):
+        assert is_overload(api_error(429))
+        assert is_overload(api_error(529))
+        assert not is_overload(api_error(503))
+
+
+class TestSlots:
+    """Test waiting for in-flight slots."""
+
+    def test_waiters_block_until_release(self, limit):
+        async def scenario():
+            for _ in range(4):
+                await limit.acquire()
+
+            waiter = asyncio.ensure_future(limit.acquire())
+            await asyncio.sleep(0.01)
+            assert not waiter.done()
+
+            limit.release()
+            await asyncio.wait_for(waiter, 1.0)
+            return limit.in_flight
+
+        assert asyncio.run(scenario()) == 4
+
+    def test_cancelled_waiter_leaves_queue(self, limit):
+        async def scenario():
+            for _ in range(4):
+                await limit.acquire()
+            waiter = asyncio.ensure_future(limit.acquire())
+            await asyncio.sleep(0.01)
+            waiter.cancel()
+            await asyncio.sleep(0.01)
+            return limit.snapshot()
+
+        snapshot = asyncio.run(scenario())
+        assert snapshot["waiting"] == 0
+        assert snapshot["in_flight"] == 4
+
+
+class TestGapCap:
+    """Test urgent gaps beyond the report cap."""
+
+    def test_remaining_gaps_listed(self):
+        gaps = [
+            {"capability_name": f"Gap {i}", "phase_name": "Invoice",
+             "importance": 9, "readiness": 2, "gap_score": 7}
+            for i in range(3)
+        ]
+        section = format_remaining_gaps(gaps, shown=10)
+
+        assert "10 highest-priority gaps" in section
+        assert "3 more" in section
+        assert all(f"**Gap {i}**" in section for i in range(3))
@@ -0,0 +1,160 @@
+"""
+Test suite for report deadlines and hedged requests.
+
+Tests:
+- Latency percentiles need a minimum sample count
+- A call past the observed p95 is hedged and the first response wins
+- Hedges draw from the report retry budget
+- Sections that miss the deadline render from the KB template
+- A half-open probe cancelled by the deadline frees the breaker's probe
+- The remaining deadline is passed to the API call as its timeout
+"""
+
+import asyncio
+import time
+from unittest.mock import Mock
+
+from modules.circuit_breaker import HALF_OPEN, OPEN, claude_breaker
+from modules.latency_tracker import LatencyTracker, synthesis_latency
+from modules.report_generator import (
+    format_gap_context,
+    render_template_section,
+    VALID_AGENTS
+)
+from modules.retry_policy import RetryBudget
+from modules.synthesis_engine import SynthesisEngine
+from tests.test_claude_synthesis import SAMPLE_GAP, SAMPLE_KB_DATA
+
+
+class SequencedMessages:
+    """Async client.messages whose Nth call takes delays[N] seconds."""
+
+    def __init__(self, delays):
+        self.delays = list(delays)
+        self.calls = []
+
+    async def create(self, **kwargs):
+        index = len(self.calls)
+        self.calls.append(kwargs)
+        await asyncio.sleep(self.delays[min(index, len(self.delays) - 1)])
+        response = Mock()
+        response.content = [Mock(text=f"Response {index}")]
+        return response
+
+
+def make_engine(messages):
+    engine = SynthesisEngine(max_in_flight=4)
+    engine.client = Mock(messages=messages)
+    return engine
+
+
+def prime_latency(seconds, samples=20):
+    for _ in range(samples):
+        synthesis_latency.record("urgent_gap", seconds)
+
+
+class TestLatencyTracker:
+    """Test rolling latency percentiles."""
+
+    def test_percentile_needs_min_samples(self):
+        tracker = LatencyTracker(window=100, min_samples=5)
+        for value in (1.0, 2.0, 3.0, 4.0):
+            tracker.record("urgent_gap", value)
+        assert tracker.percentile("urgent_gap", 0.95) is None
+
+        tracker.record("urgent_gap", 5.0)
+        assert tracker.percentile("urgent_gap", 0.95) == 5.0
+        assert tracker.percentile("urgent_gap", 0.5) == 3.0
+
+    def test_window_drops_old_samples(self):
+        tracker = LatencyTracker(window=3, min_samples=1)
+        for value in (100.0, 1.0, 1.0, 1.0):
+            tracker.record("strength", value)
+        assert tracker.percentile("strength", 1.0) == 1.0
+
+
+class TestHedging:
+    """Test hedged duplicate requests."""
+
+    def test_slow_call_is_hedged(self):
+        prime_latency(0.05)
+        messages = SequencedMessages([1.0, 0.05])
+        engine = make_engine(messages)
+
+        started = time.time()
+        results = engine.synthesize_many({"gap": ("urgent_gap", "Context")}, VALID_AGENTS)
+
+        assert results["gap"] == "Response 1"
+        assert len(messages.calls) == 2
+        assert time.time() - started < 0.8
+
+    def test_no_hedge_without_latency_history(self):
+        messages = SequencedMessages([0.2, 0.05])
+        engine = make_engine(messages)
+
+        results = engine.synthesize_many({"gap": ("urgent_gap", "Context")}, VALID_AGENTS)
+
+        assert results["gap"] == "Response 0"
+        assert len(messages.calls) == 1
+
+    def test_hedges_spend_retry_budget(self):
+        prime_latency(0.05)
+        messages = SequencedMessages([0.3, 0.05])
+        engine = make_engine(messages)
+
+        results = engine.synthesize_many(
+            {"gap": ("urgent_gap", "Context")}, VALID_AGENTS, retry_budget=RetryBudget(0)
+        )
+
+        assert results["gap"] == "Response 0"
+        assert len(messages.calls) == 1
+
+
+class TestDeadline:
+    """Test the per-report deadline."""
+
+    def test_missed_deadline_renders_template(self):
+        messages = SequencedMessages([2.0])
+        engine = make_engine(messages)
+        context = format_gap_context(SAMPLE_GAP, SAMPLE_KB_DATA)
+
+        started = time.time()
+        results = engine.synthesize_many(
+            {"gap": ("urgent_gap", context)}, VALID_AGENTS, deadline=time.time() + 0.2
+        )
+
+        assert results["gap"] == render_template_section("urgent_gap", context)
+        assert time.time() - started < 1.0
+
+    def test_cancelled_probe_frees_breaker(self):
+        engine = make_engine(SequencedMessages([2.0, 0.01]))
+        claude_breaker.state = OPEN
+        claude_breaker.opened_at = time.time() - claude_breaker.reset_timeout - 1
+
+        engine.synthesize_many({"gap": ("urgent_gap", "Context")}, VALID_AGENTS, deadline=time.time() + 0.2)
+
+        assert claude_breaker.state == HALF_OPEN
+        assert not claude_breaker.probe_in_flight
+        results = engine.synthesize_many({"gap": ("urgent_gap", "Other context")}, VALID_AGENTS)
+        assert results["gap"] == "Response 1"
+
+    def test_deadline_passed_as_call_timeout(self):
+        messages = SequencedMessages([0.01])
+        engine = make_engine(messages)
+
+        engine.synthesize_many(
+            {"gap": ("urgent_gap", "Context")}, VALID_AGENTS, deadline=time.time() + 30
+        )
+
+        assert 25 < messages.calls[0]["timeout"] <= 30
+
+    def test_expired_deadline_skips_api(self):
+        messages = SequencedMessages([0.01])
+        engine = make_engine(messages)
+
+        results = engine.synthesize_many(
+            {"gap": ("urgent_gap", "Raw context")}, VALID_AGENTS, deadline=time.time() - 1
+        )
+
+        assert results["gap"] == "Raw context"
+        assert messages.calls == []
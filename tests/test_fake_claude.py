@@ -0,0 +1,252 @@
+"""
+Test suite for the offline fake Claude client and server.
+
+Tests:
+- Responses carry usage and follow the configured latency
+- 429/529 injection raises the SDK's retryable errors
+- Prompt-cache prefixes are billed as writes, then reads
+- Batched gap prompts get a parseable JSON answer
+- Streaming (sync and async) and call timeouts
+- The client factory and the HTTP server
+- Benchmarks keep rate-limit, usage and cache state out of storage
+"""
+
+import asyncio
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import anthropic
+import pytest
+
+from modules.claude_client import make_async_client, make_client
+from modules.fake_claude import (
+    FakeAnthropic,
+    FakeAsyncAnthropic,
+    FakeClaude,
+    FakeProfile,
+    make_server,
+    run_benchmark
+)
+from modules.report_generator import (
+    build_batch_gap_messages,
+    build_synthesis_messages,
+    build_synthesis_system,
+    parse_batch_response,
+    VALID_AGENTS
+)
+from modules.rate_limiter import claude_rate_limiter
+from modules.retry_policy import is_retryable, retry_after_seconds
+from modules.synthesis_cache import synthesis_cache
+from modules.synthesis_engine import SynthesisEngine
+from modules.usage_tracker import usage_tracker
+
+
+def fast_profile(**overrides):
+    settings = dict(ttft_median=0.01, ttft_sigma=0.1, tokens_per_second=100000,
+                    output_tokens=100, rate_limit_rate=0.0, overload_rate=0.0, seed=1)
+    settings.update(overrides)
+    return FakeProfile(**settings)
+
+
+def fake_client(**overrides):
+    return FakeAnthropic(FakeClaude(fast_profile(**overrides)))
+
+
+def synthesis_request(context="Context"):
+    return dict(
+        model="claude-test",
+        max_tokens=2000,
+        system=build_synthesis_system(),
+        messages=build_synthesis_messages("urgent_gap", context, VALID_AGENTS)
+    )
+
+
+class TestFakeResponses:
+    """Test non-streamed responses."""
+
+    def test_response_shape_and_usage(self):
+        response = fake_client().messages.create(**synthesis_request())
+
+        assert response.content[0].text.startswith("**Why This Matters:**")
+        assert response.usage.output_tokens > 0
+        assert response.usage.input_tokens > 0
+        assert response.stop_reason == "end_turn"
+
+    def test_latency_follows_profile(self):
+        client = fake_client(ttft_median=0.2, ttft_sigma=0.01)
+
+        started = time.time()
+        client.messages.create(**synthesis_request())
+
+        assert 0.15 < time.time() - started < 1.0
+
+    def test_rate_limit_injection(self):
+        with pytest.raises(anthropic.RateLimitError) as excinfo:
+            fake_client(rate_limit_rate=1.0).messages.create(**synthesis_request())
+
+        assert is_retryable(excinfo.value)
+        assert retry_after_seconds(excinfo.value) == 1.0
+
+    def test_overload_injection(self):
+        with pytest.raises(anthropic.APIStatusError) as excinfo:
+            fake_client(overload_rate=1.0).messages.create(**synthesis_request())
+
+        assert excinfo.value.status_code == 529
+        assert is_retryable(excinfo.value)
+
+    def test_timeout(self):
+        client = fake_client(ttft_median=2.0, ttft_sigma=0.01)
+
+        with pytest.raises(anthropic.APITimeoutError):
+            client.messages.create(timeout=0.05, **synthesis_request())
+
+    def test_prompt_cache_write_then_read(self, monkeypatch):
+        monkeypatch.setattr("modules.fake_claude.MIN_CACHEABLE_TOKENS", 100)
+        client = fake_client()
+
+        first = client.messages.create(**synthesis_request("Context A"))
+        second = client.messages.create(**synthesis_request("Context B"))
+
+        assert first.usage.cache_creation_input_tokens > 0
+        assert first.usage.cache_read_input_tokens == 0
+        assert second.usage.cache_read_input_tokens == first.usage.cache_creation_input_tokens
+
+    def test_short_prefix_not_cached(self, monkeypatch):
+        monkeypatch.setattr("modules.fake_claude.MIN_CACHEABLE_TOKENS", 100000)
+        client = fake_client()
+
+        client.messages.create(**synthesis_request())
+        second = client.messages.create(**synthesis_request())
+
+        assert second.usage.cache_read_input_tokens == 0
+
+    def test_batched_gaps_answered_as_json(self):
+        messages = build_batch_gap_messages({"gap_a": "Context A", "gap_b": "Context B"}, VALID_AGENTS)
+
+        response = fake_client().messages.create(
+            model="claude-test", max_tokens=16000, system=build_synthesis_system(), messages=messages
+        )
+
+        assert set(parse_batch_response(response.content[0].text, ["gap_a", "gap_b"])) == {"gap_a", "gap_b"}
+
+
+class TestFakeStreaming:
+    """Test streamed responses."""
+
+    def test_sync_stream(self):
+        with fake_client().messages.stream(**synthesis_request()) as stream:
+            text = "".join(stream.text_stream)
+            final = stream.get_final_message()
+
+        assert text == final.content[0].text
+
+    def test_async_stream(self):
+        client = FakeAsyncAnthropic(FakeClaude(fast_profile()))
+
+        async def scenario():
+            async with client.messages.stream(**synthesis_request()) as stream:
+                deltas = [delta async for delta in stream.text_stream]
+                final = await stream.get_final_message()
+            return deltas, final
+
+        deltas, final = asyncio.run(scenario())
+        assert len(deltas) > 1
+        assert "".join(deltas) == final.content[0].text
+
+    def test_engine_streams_from_fake(self):
+        engine = SynthesisEngine(max_in_flight=4)
+        engine.client = FakeAsyncAnthropic(FakeClaude(fast_profile()))
+        updates = []
+
+        results = engine.synthesize_many(
+            {"gap": ("urgent_gap", "Context")}, VALID_AGENTS,
+            on_update=lambda key, text, done: updates.append(done)
+        )
+
+        assert results["gap"].startswith("**Why This Matters:**")
+        assert updates[-1] is True
+
+
+class TestClientFactory:
+    """Test backend selection through config."""
+
+    def test_fake_backend(self, monkeypatch):
+        monkeypatch.setattr("config.CLAUDE_BACKEND", "fake")
+
+        assert isinstance(make_client(), FakeAnthropic)
+        assert isinstance(make_async_client(), FakeAsyncAnthropic)
+
+    def test_real_backend(self, monkeypatch):
+        monkeypatch.setattr("config.CLAUDE_BACKEND", "anthropic")
+
+        assert isinstance(make_client(), anthropic.Anthropic)
+
+
+class TestBenchmark:
+    """Test that benchmark runs leave the shared state alone."""
+
+    def test_state_isolated(self, monkeypatch):
+        monkeypatch.setattr("config.CLAUDE_BACKEND", "fake")
+        monkeypatch.setattr("modules.fake_claude.fake_claude.profile", fast_profile())
+        paths = (claude_rate_limiter.state_path, usage_tracker.state_path, synthesis_cache.cache_dir)
+
+        result = run_benchmark(reports=1, parallel=1, use_cache=True)
+
+        assert result["reports"] == 1
+        assert (claude_rate_limiter.state_path, usage_tracker.state_path, synthesis_cache.cache_dir) == paths
+        assert synthesis_cache.enabled
+        assert not claude_rate_limiter.state_path.exists()
+        assert not usage_tracker.state_path.exists()
+        assert not synthesis_cache.index_file.exists()
+
+
+class TestFakeServer:
+    """Test the HTTP server speaking the Messages API shape."""
+
+    @pytest.fixture
+    def server(self):
+        def start(**overrides):
+            server = make_server(0, FakeClaude(fast_profile(**overrides)))
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            servers.append(server)
+            return f"http://127.0.0.1:{server.server_address[1]}/v1/messages"
+
+        servers = []
+        yield start
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+    def post(self, url, payload):
+        request = urllib.request.Request(
+            url, data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"}, method="POST"
+        )
+        return urllib.request.urlopen(request, timeout=5)
+
+    def test_message(self, server):
+        with self.post(server(), synthesis_request()) as response:
+            message = json.load(response)
+
+        assert message["type"] == "message"
+        assert message["usage"]["output_tokens"] > 0
+
+    def test_injected_rate_limit(self, server):
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            self.post(server(rate_limit_rate=1.0), synthesis_request())
+
+        assert excinfo.value.code == 429
+        assert excinfo.value.headers["retry-after"] == "1"
+        assert json.load(excinfo.value)["error"]["type"] == "rate_limit_error"
+
+    def test_stream_events(self, server):
+        with self.post(server(), {**synthesis_request(), "stream": True}) as response:
+            body = response.read().decode("utf-8")
+
+        events = [line.split(": ", 1)[1] for line in body.splitlines() if line.startswith("event: ")]
+        assert events[0] == "message_start"
+        assert "content_block_delta" in events
+        assert events[-1] == "message_stop"
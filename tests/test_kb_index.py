@@ -0,0 +1,108 @@
+"""
+Test suite for the load-time knowledge base index.
+
+Tests:
+- Lookups by capability id, phase, agent and grid position match a scan of the raw KB
+- The index is read-only and still reads like the raw KB's top-level dict
+- of() reuses the index for the same dict and builds a new one for another
+- analyze_capabilities and find_capability_in_kb give the same results for raw and indexed KBs
+"""
+
+import json
+
+import pytest
+
+from grid_layout import PHASES, get_capabilities_by_phase
+from modules.kb_index import KnowledgeBaseIndex
+from modules.report_generator import find_capability_in_kb
+from modules.score_analyzer import analyze_capabilities
+from modules.synthesis_library import library_fingerprint, load_knowledge_base_file
+
+
+@pytest.fixture
+def knowledge_base():
+    return load_knowledge_base_file()
+
+
+@pytest.fixture
+def index(knowledge_base):
+    return KnowledgeBaseIndex(knowledge_base)
+
+
+class TestLookups:
+    """Test the precomputed tables."""
+
+    def test_capabilities_and_records(self, knowledge_base, index):
+        for phase in knowledge_base["phases"]:
+            for cap in phase["capabilities"]:
+                assert index.capability(cap["id"]) == cap
+                record = index.capability_record(cap["id"])
+                assert record["phase_id"] == phase["id"]
+                assert record["phase_name"] == phase["name"]
+                assert record["agentic_goal"] == phase["agentic_goal"]
+        assert index.capability("missing") is None
+        assert len(index.capability_ids()) == 42
+
+    def test_phases(self, knowledge_base, index):
+        phase = knowledge_base["phases"][0]
+
+        assert index.phase(phase["id"]) == phase
+        assert [cap["id"] for cap in index.phase_capabilities(phase["id"])] == [
+            cap["id"] for cap in phase["capabilities"]
+        ]
+        assert index.phase_capabilities("missing") == ()
+
+    def test_agents(self, knowledge_base, index):
+        cap = knowledge_base["phases"][0]["capabilities"][0]
+        agent = cap["agent_mapping"]["primary_agents"][0]
+
+        expected = [
+            c["id"] for phase in knowledge_base["phases"] for c in phase["capabilities"]
+            if agent in c["agent_mapping"].get("primary_agents", []) + c["agent_mapping"].get("supporting_agents", [])
+        ]
+        assert list(index.agent_capabilities(agent)) == list(dict.fromkeys(expected))
+        assert index.agent_capabilities("Imaginary Agent") == ()
+
+    def test_grid_matches_grid_layout(self, index):
+        for phase in PHASES:
+            assert [dict(cell) for cell in index.grid_phase(phase["id"])] == get_capabilities_by_phase(phase["id"])
+        first = get_capabilities_by_phase(PHASES[0]["id"])[0]
+        assert index.grid_cell(first["row"], first["col"])["id"] == first["id"]
+
+
+class TestMappingAndImmutability:
+    """Test the raw-KB view."""
+
+    def test_reads_like_raw_kb(self, knowledge_base, index):
+        assert index["phases"] is knowledge_base["phases"]
+        assert index.get("agent_inventory") == knowledge_base.get("agent_inventory")
+        assert set(index) == set(knowledge_base)
+        assert library_fingerprint(index) == library_fingerprint(knowledge_base)
+
+    def test_tables_are_read_only(self, index):
+        cap_id = index.capability_ids()[0]
+        with pytest.raises(TypeError):
+            index.capability(cap_id)["name"] = "Changed"
+        with pytest.raises(TypeError):
+            index._capabilities["new"] = {}
+
+    def test_of_reuses_index(self, knowledge_base, index):
+        assert KnowledgeBaseIndex.of(index) is index
+        first = KnowledgeBaseIndex.of(knowledge_base)
+        assert KnowledgeBaseIndex.of(knowledge_base) is first
+        assert KnowledgeBaseIndex.of(json.loads(json.dumps(knowledge_base))) is not first
+
+
+class TestCallers:
+    """Test modules that take either form."""
+
+    def test_same_results_raw_and_indexed(self, knowledge_base, index):
+        scores = [
+            {"capability_id": cap_id, "importance": 9, "readiness": 2}
+            for cap_id in index.capability_ids()[:5]
+        ] + [{"capability_id": "missing", "importance": 5, "readiness": 5}]
+
+        assert analyze_capabilities(scores, index) == analyze_capabilities(scores, knowledge_base)
+        cap_id = index.capability_ids()[3]
+        assert find_capability_in_kb(cap_id, index) == find_capability_in_kb(cap_id, knowledge_base)
+        assert find_capability_in_kb("missing", index) is None
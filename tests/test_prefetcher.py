@@ -0,0 +1,141 @@
+"""
+Test suite for speculative urgent_gap synthesis while the user is scoring.
+
+Tests:
+- Urgent gaps are synthesized after the debounce and kept by score tuple
+- Changing scores inside the debounce cancels the call before it is sent
+- Non-urgent and unscored capabilities are ignored
+- The pending cap keeps the most urgent gaps
+- Reports use prefetched sections instead of requesting them again
+"""
+
+import time
+
+import pytest
+
+from modules import concurrent_generator
+from modules.fake_claude import FakeAsyncAnthropic, FakeClaude, FakeProfile
+from modules.prefetcher import SynthesisPrefetcher
+from modules.synthesis_engine import SynthesisEngine
+from modules.synthesis_library import load_knowledge_base_file
+
+
+class RecordingResponder:
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, request, output_tokens):
+        self.requests.append(request)
+        return "Prefetched synthesis"
+
+
+@pytest.fixture
+def knowledge_base():
+    return load_knowledge_base_file()
+
+
+@pytest.fixture
+def cap_ids(knowledge_base):
+    return [cap["id"] for phase in knowledge_base["phases"] for cap in phase["capabilities"]]
+
+
+@pytest.fixture
+def responder():
+    return RecordingResponder()
+
+
+@pytest.fixture
+def engine(responder):
+    engine = SynthesisEngine(max_in_flight=8)
+    engine.client = FakeAsyncAnthropic(FakeClaude(
+        FakeProfile(ttft_median=0.001, ttft_sigma=0.1, tokens_per_second=100000,
+                    rate_limit_rate=0.0, overload_rate=0.0, seed=1),
+        responder=responder
+    ))
+    return engine
+
+
+def wait_until_idle(prefetcher, timeout=5.0):
+    end = time.time() + timeout
+    while prefetcher.snapshot()["pending"] and time.time() < end:
+        time.sleep(0.01)
+
+
+class TestPrefetch:
+    """Test speculative synthesis from score updates."""
+
+    def test_urgent_gap_prefetched_by_score_tuple(self, knowledge_base, cap_ids, engine, responder):
+        prefetcher = SynthesisPrefetcher(knowledge_base, engine=engine, debounce_seconds=0.01)
+
+        prefetcher.update({cap_ids[0]: {"importance": 9, "readiness": 2}})
+        wait_until_idle(prefetcher)
+
+        assert len(responder.requests) == 1
+        assert prefetcher.lookup(cap_ids[0], 9, 2) == "Prefetched synthesis"
+        assert prefetcher.lookup(cap_ids[0], 9, 3) is None
+
+    def test_score_change_cancels_before_request(self, knowledge_base, cap_ids, engine, responder):
+        prefetcher = SynthesisPrefetcher(knowledge_base, engine=engine, debounce_seconds=0.3)
+
+        prefetcher.update({cap_ids[0]: {"importance": 9, "readiness": 2}})
+        prefetcher.update({cap_ids[0]: {"importance": 9, "readiness": 3}})
+        wait_until_idle(prefetcher)
+
+        assert len(responder.requests) == 1
+        assert prefetcher.lookup(cap_ids[0], 9, 2) is None
+        assert prefetcher.lookup(cap_ids[0], 9, 3) == "Prefetched synthesis"
+        assert prefetcher.snapshot()["cancelled"] == 1
+
+    def test_non_urgent_scores_ignored(self, knowledge_base, cap_ids, engine, responder):
+        prefetcher = SynthesisPrefetcher(knowledge_base, engine=engine, debounce_seconds=0.01)
+
+        prefetcher.update({
+            cap_ids[0]: {"importance": 9, "readiness": 9},
+            cap_ids[1]: {"importance": 2, "readiness": 1},
+            cap_ids[2]: {"importance": 9, "readiness": 0},
+        })
+
+        assert prefetcher.snapshot()["started"] == 0
+
+    def test_repeated_update_does_not_restart(self, knowledge_base, cap_ids, engine, responder):
+        prefetcher = SynthesisPrefetcher(knowledge_base, engine=engine, debounce_seconds=0.05)
+        scores = {cap_ids[0]: {"importance": 9, "readiness": 2}}
+
+        prefetcher.update(scores)
+        prefetcher.update(scores)
+        wait_until_idle(prefetcher)
+        prefetcher.update(scores)
+
+        assert prefetcher.snapshot()["started"] == 1
+        assert len(responder.requests) == 1
+
+    def test_pending_cap_keeps_most_urgent(self, knowledge_base, cap_ids, engine):
+        prefetcher = SynthesisPrefetcher(knowledge_base, engine=engine, debounce_seconds=0.3, max_pending=1)
+
+        prefetcher.update({
+            cap_ids[0]: {"importance": 7, "readiness": 4},
+            cap_ids[1]: {"importance": 10, "readiness": 1},
+        })
+
+        assert list(prefetcher._pending) == [cap_ids[1]]
+        prefetcher.cancel_all()
+        assert prefetcher.snapshot()["pending"] == 0
+
+
+def test_report_uses_prefetched_sections(monkeypatch, knowledge_base, cap_ids, engine, responder):
+    monkeypatch.setattr(concurrent_generator, "synthesis_engine", engine)
+    prefetcher = SynthesisPrefetcher(knowledge_base, engine=engine, debounce_seconds=0.01)
+    scores = {cap_id: {"importance": 9, "readiness": 2} for cap_id in cap_ids[:2]}
+
+    prefetcher.update(scores)
+    wait_until_idle(prefetcher)
+    assert len(responder.requests) == 2
+
+    report = concurrent_generator.generate_report_concurrent(
+        [{"capability_id": cap_id, **data} for cap_id, data in scores.items()],
+        knowledge_base, "Tester", batch_size=1, prefetcher=prefetcher
+    )
+
+    # Only the executive summary is left to synthesize
+    assert len(responder.requests) == 3
+    assert report.count("Prefetched synthesis") == 3
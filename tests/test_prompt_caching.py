@@ -0,0 +1,119 @@
+"""
+Test suite for prompt caching of the static synthesis prefix.
+
+Tests:
+- Static instructions come first and carry cache breakpoints
+- The cached prefix is identical across contexts
+- Cache creation/read tokens are recorded from response.usage
+- Usage totals are batched in memory and flushed per report
+- Cache reads are refunded to the input-token rate limit
+"""
+
+from unittest.mock import Mock, patch
+
+from modules.report_generator import (
+    build_synthesis_messages,
+    build_synthesis_system,
+    synthesize_with_claude,
+    SYNTHESIS_SYSTEM_PROMPT,
+    VALID_AGENTS
+)
+from modules.usage_tracker import UsageTracker, cache_read_ratio, usage_tracker
+
+
+def make_response(text="Result", **usage):
+    response = Mock()
+    response.content = [Mock(text=text)]
+    response.usage = Mock(
+        input_tokens=usage.get("input_tokens", 0),
+        output_tokens=usage.get("output_tokens", 0),
+        cache_creation_input_tokens=usage.get("cache_creation_input_tokens", 0),
+        cache_read_input_tokens=usage.get("cache_read_input_tokens", 0)
+    )
+    return response
+
+
+class TestCachedPrefixLayout:
+    """Test the request layout used for prompt caching."""
+
+    def test_system_prompt_is_cache_breakpoint(self):
+        system = build_synthesis_system()
+        assert system[0]["text"] == SYNTHESIS_SYSTEM_PROMPT
+        assert system[0]["cache_control"] == {"type": "ephemeral"}
+
+    def test_static_instructions_precede_context(self):
+        content = build_synthesis_messages("urgent_gap", "UNIQUE CONTEXT", VALID_AGENTS)[0]["content"]
+
+        static, dynamic = content
+        assert static["cache_control"] == {"type": "ephemeral"}
+        assert "VALID AGENT NAMES" in static["text"]
+        assert "UNIQUE CONTEXT" not in static["text"]
+        assert "UNIQUE CONTEXT" in dynamic["text"]
+        assert "cache_control" not in dynamic
+
+    def test_prefix_identical_across_contexts(self):
+        a = build_synthesis_messages("urgent_gap", "Context A", VALID_AGENTS)[0]["content"][0]
+        b = build_synthesis_messages("urgent_gap", "Context B", VALID_AGENTS)[0]["content"][0]
+        assert a == b
+
+    def test_caching_can_be_disabled(self, monkeypatch):
+        monkeypatch.setattr("config.PROMPT_CACHING_ENABLED", False)
+        content = build_synthesis_messages("urgent_gap", "Context", VALID_AGENTS)[0]["content"]
+        assert all("cache_control" not in block for block in content)
+
+
+class TestUsageTracking:
+    """Test recording of prompt-cache token counts."""
+
+    @patch('modules.report_generator.client')
+    def test_cache_tokens_recorded(self, mock_client):
+        mock_client.messages.create.return_value = make_response(
+            input_tokens=50, output_tokens=200,
+            cache_creation_input_tokens=0, cache_read_input_tokens=950
+        )
+
+        synthesize_with_claude("urgent_gap", "Context", VALID_AGENTS)
+
+        stats = usage_tracker.stats()
+        assert stats["totals"]["cache_read_input_tokens"] == 950
+        assert stats["totals"]["requests"] == 1
+        assert stats["by_section"]["urgent_gap"]["input_tokens"] == 50
+        assert stats["cache_read_ratio"] == 0.95
+
+    def test_missing_usage_is_ignored(self, tmp_path):
+        tracker = UsageTracker(str(tmp_path / "usage.json"))
+        response = Mock(spec=["content"])
+
+        assert tracker.record(response)["input_tokens"] == 0
+        assert tracker.stats()["totals"] == {}
+
+    def test_usage_batched_until_flush(self, tmp_path):
+        tracker = UsageTracker(str(tmp_path / "usage.json"), flush_every=100)
+        for _ in range(3):
+            tracker.record(make_response(input_tokens=10, output_tokens=5), "strength")
+
+        assert not tracker.state_path.exists()
+        assert tracker.stats()["totals"]["requests"] == 3
+
+        tracker.record_user_report("user@example.com", {"requests": 3, "totals": {}})
+
+        reopened = UsageTracker(str(tracker.state_path))
+        assert reopened.stats()["totals"]["input_tokens"] == 30
+        assert reopened.stats()["by_section"]["strength"]["requests"] == 3
+        assert tracker.stats()["totals"]["requests"] == 3
+
+    def test_cache_read_ratio_without_tokens(self):
+        assert cache_read_ratio({}) == 0.0
+
+    @patch('modules.report_generator.claude_rate_limiter')
+    @patch('modules.report_generator.client')
+    def test_rate_limit_charged_for_uncached_input_only(self, mock_client, mock_limiter):
+        mock_limiter.acquire.return_value = (1000, 2000)
+        mock_client.messages.create.return_value = make_response(
+            input_tokens=50, output_tokens=200,
+            cache_creation_input_tokens=100, cache_read_input_tokens=850
+        )
+
+        synthesize_with_claude("urgent_gap", "Context", VALID_AGENTS)
+
+        mock_limiter.record_usage.assert_called_once_with((1000, 2000), 150, 200)
@@ -0,0 +1,100 @@
+"""
+Test suite for the shared token-bucket rate limiter.
+
+Tests:
+- Requests within capacity pass immediately
+- Exhausted buckets report a wait time
+- Reservations are settled against real usage
+- State is shared between limiter instances (i.e. processes)
+- Async acquire does its file-locked state update off the event loop
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from modules.rate_limiter import TokenBucketRateLimiter, estimate_tokens
+
+
+@pytest.fixture
+def state_path(tmp_path):
+    return tmp_path / "rate_limits" / "claude.json"
+
+
+def make_limiter(state_path, rpm=60, itpm=6000, otpm=600):
+    return TokenBucketRateLimiter(
+        state_path=str(state_path),
+        requests_per_minute=rpm,
+        input_tokens_per_minute=itpm,
+        output_tokens_per_minute=otpm
+    )
+
+
+class TestTokenBucketRateLimiter:
+    """Test RPM/ITPM/OTPM accounting."""
+
+    def test_within_capacity_passes(self, state_path):
+        limiter = make_limiter(state_path)
+        assert limiter.try_acquire(100, 100) == 0
+
+    def test_request_bucket_exhaustion_waits(self, state_path):
+        limiter = make_limiter(state_path, rpm=2)
+        assert limiter.try_acquire(1, 1) == 0
+        assert limiter.try_acquire(1, 1) == 0
+
+        wait = limiter.try_acquire(1, 1)
+        # One request refills every 30 seconds at 2 RPM
+        assert 0 < wait <= 30
+
+    def test_output_tokens_reserved_then_refunded(self, state_path):
+        limiter = make_limiter(state_path, otpm=600)
+        reservation = (10, 600)
+        assert limiter.try_acquire(*reservation) == 0
+        assert limiter.try_acquire(10, 600) > 0
+
+        # The call only produced 100 tokens - 500 go back in the bucket
+        limiter.record_usage(reservation, input_tokens=10, output_tokens=100)
+        assert limiter.snapshot()["output_tokens"] >= 499
+
+    def test_oversized_request_waits_for_full_bucket(self, state_path):
+        limiter = make_limiter(state_path, itpm=1000)
+        assert limiter.try_acquire(5000, 1) == 0
+        assert limiter.snapshot()["input_tokens"] < 1
+
+    def test_state_shared_across_instances(self, state_path):
+        first = make_limiter(state_path, rpm=1)
+        second = make_limiter(state_path, rpm=1)
+
+        assert first.try_acquire(1, 1) == 0
+        assert second.try_acquire(1, 1) > 0
+
+    def test_disabled_bucket_never_waits(self, state_path):
+        limiter = make_limiter(state_path, rpm=0)
+        for _ in range(10):
+            assert limiter.try_acquire(1, 1) == 0
+
+
+def test_acquire_async_runs_file_work_off_loop(state_path):
+    limiter = make_limiter(state_path)
+    threads = []
+    try_acquire = limiter.try_acquire
+
+    def recording_try_acquire(input_tokens, output_tokens):
+        threads.append(threading.get_ident())
+        return try_acquire(input_tokens, output_tokens)
+
+    limiter.try_acquire = recording_try_acquire
+
+    async def acquire():
+        return threading.get_ident(), await limiter.acquire_async(10, 10)
+
+    loop_thread, reservation = asyncio.run(acquire())
+
+    assert reservation == (10, 10)
+    assert threads and loop_thread not in threads
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 1
+    assert estimate_tokens("x" * 400) == 101
@@ -0,0 +1,170 @@
+"""
+Test suite for the section-DAG report engine.
+
+Tests:
+- Sections finish in dependency order and assemble in document order
+- Ready LLM sections are synthesized together; precomputed ones are not sent
+- Each section is validated and post-processed as it finishes
+- Streaming announces sections in order and ends with the cleaned section
+- Both report generators run on the DAG and are post-processed
+"""
+
+from unittest.mock import Mock
+
+import pytest
+
+from modules import concurrent_generator, synthesis_engine as synthesis_engine_module
+from modules.fake_claude import FakeAsyncAnthropic, FakeClaude, FakeProfile
+from modules.report_dag import ReportDAG, SYNTHESIZING
+from modules.report_generator import generate_strategic_report, sanitize_branding
+from modules.synthesis_engine import SynthesisEngine
+from modules.synthesis_library import load_knowledge_base_file
+
+
+def make_engine(results):
+    engine = Mock()
+    engine.synthesize_many.side_effect = lambda tasks, agents, on_update=None, **options: {
+        key: results[key] for key in tasks if key in results
+    }
+    return engine
+
+
+class TestDAG:
+    """Test running sections."""
+
+    def test_sections_assembled_in_document_order(self):
+        dag = ReportDAG()
+        dag.static("title", "# Title\n")
+        dag.llm("summary", "executive_summary", "Context", wrap=lambda text: f"{text}\n")
+        dag.template("count", lambda results: f"{len(results)} sections before\n", depends_on=("title", "summary"))
+
+        dag.run(make_engine({"summary": "Summary"}))
+
+        assert dag.assemble() == "# Title\nSummary\n2 sections before\n"
+
+    def test_ready_llm_sections_synthesized_together(self):
+        engine = make_engine({"a": "A", "b": "B"})
+        dag = ReportDAG()
+        dag.llm("a", "urgent_gap", "Context A")
+        dag.llm("b", "urgent_gap", "Context B")
+        dag.llm("c", "urgent_gap", "Context C", precomputed="C")
+
+        dag.run(engine, batch_size=4)
+
+        assert engine.synthesize_many.call_count == 1
+        tasks = engine.synthesize_many.call_args[0][0]
+        assert tasks == {"a": ("urgent_gap", "Context A"), "b": ("urgent_gap", "Context B")}
+        assert engine.synthesize_many.call_args[1]["batch_size"] == 4
+        assert dag.texts == {"c": "C", "a": "A", "b": "B"}
+
+    def test_failed_section_uses_wrap_fallback(self):
+        dag = ReportDAG()
+        dag.llm("summary", "executive_summary", "Context", wrap=lambda text: text or "Unavailable")
+        dag.llm("gap", "urgent_gap", "Context", wrap=lambda text: f"### Gap\n{text}" if text else "")
+
+        dag.run(make_engine({}))
+
+        assert dag.assemble() == "Unavailable"
+
+    def test_unknown_dependency_rejected(self):
+        dag = ReportDAG()
+        with pytest.raises(ValueError):
+            dag.template("later", lambda results: "", depends_on=("missing",))
+
+
+class TestPostProcessing:
+    """Test per-section validation and clean-up."""
+
+    def test_sections_sanitized_and_validated(self):
+        dag = ReportDAG()
+        dag.llm("summary", "executive_summary", "Context")
+        dag.static("guide", "Use Zuora MCP with Zuora Billing.\n")
+        dag.add_validation()
+
+        dag.run(make_engine({"summary": "Use Imaginary Agent; it could potentially help."}))
+        report = dag.assemble()
+
+        assert "Use Zuora MCP with Billing." in report
+        assert "## Report Validation Warnings" in report
+        assert "Unknown agent referenced: 'Use Imaginary Agent'" in report
+        assert "Speculative language detected: 'could potentially'" in report
+
+    def test_no_warnings_block_when_clean(self):
+        dag = ReportDAG()
+        dag.static("guide", "Nothing to flag.\n")
+        dag.add_validation()
+
+        dag.run(make_engine({}))
+
+        assert dag.assemble() == "Nothing to flag.\n"
+
+    def test_code_block_indentation_preserved(self):
+        text = "Zuora  Billing\n```json\n{\n  \"a\": 1\n}\n```"
+        assert sanitize_branding(text) == "Billing\n```json\n{\n  \"a\": 1\n}\n```"
+
+
+def test_streaming_announces_then_cleans():
+    updates = []
+
+    def synthesize_many(tasks, agents, on_update=None, **options):
+        on_update("gap", "Partial Zuora", False)
+        on_update("gap", "Final Zuora text", True)
+        return {"gap": "Final Zuora text"}
+
+    engine = Mock()
+    engine.synthesize_many.side_effect = synthesize_many
+    dag = ReportDAG()
+    dag.llm("summary", "executive_summary", "Context", precomputed="Saved summary")
+    dag.llm("gap", "urgent_gap", "Context", wrap=lambda text: f"### Gap\n{text}")
+
+    dag.run(engine, on_section_update=lambda key, markdown: updates.append((key, markdown)))
+
+    assert updates == [
+        ("summary", "Saved summary"),
+        ("gap", f"### Gap\n{SYNTHESIZING}"),
+        ("gap", "### Gap\nPartial Zuora"),
+        ("gap", "### Gap\nFinal text"),
+    ]
+
+
+class TestGenerators:
+    """Test both report paths on the DAG."""
+
+    @pytest.fixture
+    def engine(self, monkeypatch):
+        engine = SynthesisEngine(max_in_flight=8)
+        engine.client = FakeAsyncAnthropic(FakeClaude(
+            FakeProfile(ttft_median=0.001, ttft_sigma=0.1, tokens_per_second=100000,
+                        rate_limit_rate=0.0, overload_rate=0.0, seed=1),
+            responder=lambda request, output_tokens: "Zuora Billing could potentially help."
+        ))
+        monkeypatch.setattr(synthesis_engine_module, "synthesis_engine", engine)
+        monkeypatch.setattr(concurrent_generator, "synthesis_engine", engine)
+        return engine
+
+    @pytest.fixture
+    def knowledge_base(self):
+        return load_knowledge_base_file()
+
+    @pytest.fixture
+    def scores(self, knowledge_base):
+        caps = [cap["id"] for phase in knowledge_base["phases"] for cap in phase["capabilities"]]
+        return [{"capability_id": cap_id, "importance": 9, "readiness": 2} for cap_id in caps[:3]]
+
+    def test_strategic_report_synthesizes_concurrently(self, engine, knowledge_base, scores):
+        report = generate_strategic_report(scores, knowledge_base, {"user": "Tester"})
+
+        assert engine.client.fake.stats()["requests"] >= 2
+        assert "Billing could potentially help." in report
+        assert "Zuora Billing" not in report
+        assert "## Report Validation Warnings" in report
+        assert "The following 3 capabilities require immediate attention" in report
+
+    def test_concurrent_report_is_post_processed(self, engine, knowledge_base, scores):
+        report = concurrent_generator.generate_report_concurrent(scores, knowledge_base, "Tester", batch_size=1)
+
+        assert "Zuora Billing" not in report
+        assert "### Phase-Level Summary" in report
+        assert "Speculative language detected: 'could potentially'" in report
+        assert "Unknown agent referenced" not in report
+        assert '  "mcpServers"' in report
@@ -0,0 +1,203 @@
+"""
+Test suite for the background report job queue.
+
+Tests:
+- Submitted jobs run the full pipeline and save the assessment
+- Streamed sections and final status are persisted for polling
+- The worker pool caps concurrent generations; later jobs wait queued
+- Failures and jobs orphaned by a restart are reported as failed
+- Staleness comes from the owner's heartbeat; old job files are cleaned up
+- A new session finds the user's latest job
+"""
+
+import threading
+import time
+
+import pytest
+
+from modules import concurrent_generator, report_jobs as report_jobs_module
+from modules.fake_claude import FakeAsyncAnthropic, FakeClaude, FakeProfile
+from modules.file_lock import write_json_atomic
+from modules.report_jobs import ReportJobQueue
+from modules.storage import load_assessment
+from modules.synthesis_engine import SynthesisEngine
+from modules.synthesis_library import load_knowledge_base_file
+
+USER = {"name": "Tester", "email": "tester@example.com"}
+
+
+@pytest.fixture
+def knowledge_base():
+    return load_knowledge_base_file()
+
+
+@pytest.fixture
+def scores(knowledge_base):
+    caps = [cap["id"] for phase in knowledge_base["phases"] for cap in phase["capabilities"]]
+    return [{"capability_id": cap_id, "importance": 9, "readiness": 2} for cap_id in caps[:2]]
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    engine = SynthesisEngine(max_in_flight=8)
+    engine.client = FakeAsyncAnthropic(FakeClaude(
+        FakeProfile(ttft_median=0.001, ttft_sigma=0.1, tokens_per_second=100000,
+                    rate_limit_rate=0.0, overload_rate=0.0, seed=1),
+        responder=lambda request, output_tokens: "Synthesized section"
+    ))
+    monkeypatch.setattr(concurrent_generator, "synthesis_engine", engine)
+    return engine
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = ReportJobQueue(tmp_path / "report_jobs", max_workers=1, progress_interval=0, stale_seconds=60)
+    yield queue
+    # Every job must finish while storage is still isolated
+    queue.shutdown()
+
+
+def wait_for(queue, job_id, statuses=("done", "failed"), timeout=5.0):
+    end = time.time() + timeout
+    while time.time() < end:
+        job = queue.status(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} still {job['status']}")
+
+
+class TestJobLifecycle:
+    """Test running jobs to completion."""
+
+    def test_job_runs_pipeline_and_saves(self, queue, engine, knowledge_base, scores):
+        finished = []
+
+        job_id = queue.submit(USER, scores, {"raw": "scores"}, knowledge_base, on_done=finished.append)
+        job = wait_for(queue, job_id)
+
+        assert job["status"] == "done"
+        assert job["priority_matrix"]["URGENT_GAP"] == 2
+        assert set(job["section_artifacts"]) == {"executive_summary"} | {s["capability_id"] for s in scores}
+        assert list(job["sections"])[0] == "executive_summary"
+        assert "Synthesized section" in job["sections"][scores[0]["capability_id"]]
+
+        loaded = load_assessment(USER["email"], job["assessment_id"])
+        assert loaded["scores"] == {"raw": "scores"}
+        assert "Synthesized section" in loaded["report"]
+        assert [done["job_id"] for done in finished] == [job_id]
+
+    def test_failure_recorded(self, queue, knowledge_base, scores, monkeypatch):
+        def fail(**kwargs):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(report_jobs_module, "generate_report_concurrent", fail)
+
+        job = wait_for(queue, queue.submit(USER, scores, {}, knowledge_base))
+
+        assert job["status"] == "failed"
+        assert job["error"] == "boom"
+        assert job["assessment_id"] is None
+
+    def test_workers_cap_concurrent_generations(self, queue, knowledge_base, scores, monkeypatch):
+        release = threading.Event()
+
+        def slow(**kwargs):
+            release.wait(5)
+            return "# Report"
+
+        monkeypatch.setattr(report_jobs_module, "generate_report_concurrent", slow)
+
+        first = queue.submit(USER, scores, {}, knowledge_base)
+        second = queue.submit(USER, scores, {}, knowledge_base)
+        wait_for(queue, first, statuses=("running",))
+
+        assert queue.status(second)["status"] == "queued"
+        assert queue.snapshot() == {"active": 2, "workers": 1}
+
+        release.set()
+        assert wait_for(queue, second)["status"] == "done"
+
+
+class TestResume:
+    """Test finding jobs from a new session."""
+
+    def test_latest_job_for_user(self, queue, engine, knowledge_base, scores):
+        assert queue.latest(USER["email"]) is None
+
+        first = queue.submit(USER, scores, {}, knowledge_base)
+        wait_for(queue, first)
+        second = queue.submit(USER, scores, {}, knowledge_base)
+        other = queue.submit({"name": "Other", "email": "other@example.com"}, scores, {}, knowledge_base)
+        wait_for(queue, second)
+        wait_for(queue, other)
+
+        assert queue.latest(USER["email"])["job_id"] == second
+
+    def test_orphaned_job_reported_failed(self, queue):
+        write_json_atomic(queue.job_path("orphan"), {
+            "job_id": "orphan", "status": "running", "updated_at": time.time() - 120,
+            "sections": {}, "error": None
+        })
+
+        job = queue.status("orphan")
+
+        assert job["status"] == "failed"
+        assert "Interrupted" in job["error"]
+        assert queue.status("orphan")["status"] == "failed"
+
+    def test_recent_job_not_orphaned(self, queue):
+        write_json_atomic(queue.job_path("recent"), {
+            "job_id": "recent", "status": "running", "updated_at": time.time(),
+            "sections": {}, "error": None
+        })
+
+        assert queue.status("recent")["status"] == "running"
+
+    def test_stale_heartbeat_fails_job(self, queue):
+        write_json_atomic(queue.job_path("silent"), {
+            "job_id": "silent", "status": "queued", "owner": "elsewhere",
+            "updated_at": time.time(), "heartbeat_at": time.time() - 120,
+            "sections": {}, "error": None
+        })
+
+        assert queue.status("silent")["status"] == "failed"
+
+    def test_heartbeat_keeps_own_jobs_alive(self, queue, knowledge_base, scores, monkeypatch):
+        release = threading.Event()
+
+        def slow(**kwargs):
+            release.wait(5)
+            return "# Report"
+
+        monkeypatch.setattr(report_jobs_module, "generate_report_concurrent", slow)
+        first = queue.submit(USER, scores, {}, knowledge_base)
+        second = queue.submit(USER, scores, {}, knowledge_base)
+        wait_for(queue, first, statuses=("running",))
+
+        queued = queue.status(second)
+        assert queued["owner"] == queue.owner
+        queued["heartbeat_at"] = time.time() - 59
+        write_json_atomic(queue.job_path(second), queued)
+
+        queue.heartbeat()
+        assert time.time() - queue.status(second)["heartbeat_at"] < 5
+
+        release.set()
+        wait_for(queue, second)
+
+
+class TestRetention:
+    """Test removal of old job files."""
+
+    def test_cleanup_removes_old_jobs(self, queue):
+        for job_id, age in (("old", 3600), ("new", 10)):
+            write_json_atomic(queue.job_path(job_id), {
+                "job_id": job_id, "status": "done", "updated_at": time.time() - age,
+                "sections": {}, "error": None
+            })
+        queue.retention_seconds = 600
+
+        assert queue.cleanup() == 1
+        assert queue.status("old") is None
+        assert queue.status("new")["status"] == "done"
@@ -0,0 +1,161 @@
+"""
+Test suite for the Claude retry policy.
+
+Tests:
+- Error classification (status codes, connection errors, x-should-retry)
+- retry-after / retry-after-ms parsing
+- Decorrelated jitter bounds
+- Per-report retry budget
+- synthesize_with_claude retries transient errors then succeeds
+- Async retries back off on the event loop
+"""
+
+import asyncio
+from unittest.mock import Mock, patch
+
+import anthropic
+import pytest
+
+from modules.report_generator import synthesize_with_claude, VALID_AGENTS
+from modules.retry_policy import (
+    RetryBudget,
+    RetryPolicy,
+    is_retryable,
+    retry_after_seconds
+)
+
+
+def api_error(status_code, headers=None):
+    response = Mock(status_code=status_code, headers=headers or {})
+    return anthropic.APIStatusError(f"Error {status_code}", response=response, body=None)
+
+
+def connection_error():
+    return anthropic.APIConnectionError(request=Mock())
+
+
+@pytest.fixture
+def policy():
+    return RetryPolicy(max_attempts=4, base_delay=0.01, max_delay=0.05)
+
+
+class TestClassification:
+    """Test which failures are retried."""
+
+    @pytest.mark.parametrize("status_code", [408, 429, 500, 502, 503, 529])
+    def test_transient_statuses_retryable(self, status_code):
+        assert is_retryable(api_error(status_code))
+
+    @pytest.mark.parametrize("status_code", [400, 401, 403, 404, 413])
+    def test_client_errors_not_retryable(self, status_code):
+        assert not is_retryable(api_error(status_code))
+
+    def test_connection_errors_retryable(self):
+        assert is_retryable(connection_error())
+
+    def test_should_retry_header_wins(self):
+        assert not is_retryable(api_error(529, {"x-should-retry": "false"}))
+        assert is_retryable(api_error(400, {"x-should-retry": "true"}))
+
+    def test_plain_exceptions_not_retryable(self):
+        assert not is_retryable(ValueError("bad"))
+
+
+class TestRetryAfter:
+    """Test retry-after header parsing."""
+
+    def test_seconds(self):
+        assert retry_after_seconds(api_error(429, {"retry-after": "7"})) == 7.0
+
+    def test_milliseconds_preferred(self):
+        error = api_error(429, {"retry-after-ms": "250", "retry-after": "7"})
+        assert retry_after_seconds(error) == 0.25
+
+    def test_missing_or_invalid(self):
+        assert retry_after_seconds(api_error(429)) is None
+        assert retry_after_seconds(api_error(429, {"retry-after": "soon"})) is None
+        assert retry_after_seconds(ValueError("no response")) is None
+
+    def test_retry_after_is_minimum_delay(self, policy):
+        error = api_error(429, {"retry-after": "0.04"})
+        assert policy.retry_delay(error, attempt=1, previous_delay=0.01) >= 0.04
+
+    def test_retry_after_beyond_cap_gives_up(self, policy):
+        error = api_error(429, {"retry-after": "60"})
+        assert policy.retry_delay(error, attempt=1, previous_delay=0.01) is None
+
+
+class TestBackoff:
+    """Test jitter bounds, attempt limits and the retry budget."""
+
+    def test_decorrelated_jitter_bounds(self, policy):
+        for previous in (0.01, 0.02, 0.04):
+            for _ in range(50):
+                delay = policy.next_delay(previous)
+                assert policy.base_delay <= delay <= min(policy.max_delay, previous * 3)
+
+    def test_gives_up_after_max_attempts(self, policy):
+        fn = Mock(side_effect=api_error(529))
+        with pytest.raises(anthropic.APIStatusError):
+            policy.call(fn)
+        assert fn.call_count == 4
+
+    def test_non_retryable_raises_immediately(self, policy):
+        fn = Mock(side_effect=api_error(400))
+        with pytest.raises(anthropic.APIStatusError):
+            policy.call(fn)
+        assert fn.call_count == 1
+
+    def test_budget_shared_across_calls(self, policy):
+        budget = RetryBudget(max_retries=3)
+        fn = Mock(side_effect=api_error(503))
+
+        for _ in range(2):
+            with pytest.raises(anthropic.APIStatusError):
+                policy.call(fn, budget)
+
+        # First call spends 3 retries (4 attempts), second gets none
+        assert fn.call_count == 5
+        assert budget.remaining == 0
+
+    def test_async_retry_succeeds(self, policy):
+        attempts = []
+
+        async def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise connection_error()
+            return "ok"
+
+        assert asyncio.run(policy.call_async(flaky)) == "ok"
+        assert len(attempts) == 3
+
+
+class TestSynthesisRetries:
+    """Test retries wired into synthesize_with_claude."""
+
+    @patch('modules.retry_policy.time.sleep')
+    @patch('modules.report_generator.client')
+    def test_overloaded_then_success(self, mock_client, mock_sleep):
+        response = Mock()
+        response.content = [Mock(text="Recovered synthesis")]
+        mock_client.messages.create.side_effect = [api_error(529), api_error(429), response]
+
+        result = synthesize_with_claude("urgent_gap", "Context", VALID_AGENTS)
+
+        assert result == "Recovered synthesis"
+        assert mock_client.messages.create.call_count == 3
+        assert mock_sleep.call_count == 2
+
+    @patch('modules.retry_policy.time.sleep')
+    @patch('modules.report_generator.client')
+    def test_exhausted_budget_falls_back(self, mock_client, mock_sleep):
+        mock_client.messages.create.side_effect = api_error(529)
+
+        result = synthesize_with_claude(
+            "urgent_gap", "Raw context", VALID_AGENTS, retry_budget=RetryBudget(0)
+        )
+
+        assert result == "Raw context"
+        assert mock_client.messages.create.call_count == 1
+        mock_sleep.assert_not_called()
@@ -0,0 +1,122 @@
+"""
+Test suite for incremental report regeneration from per-section artifacts.
+
+Tests:
+- Sections are reused only while their input hash matches
+- Template fallbacks are not kept as artifacts
+- Regenerating unchanged scores sends no requests
+- Moving one gap's scores resynthesizes that gap and the executive summary only
+- Artifacts round-trip through save_assessment / load_assessment
+"""
+
+import pytest
+
+from modules import concurrent_generator
+from modules.fake_claude import FakeAsyncAnthropic, FakeClaude, FakeProfile
+from modules.report_generator import render_template_section
+from modules.section_artifacts import SectionArtifacts
+from modules.storage import load_assessment, save_assessment
+from modules.synthesis_cache import synthesis_cache
+from modules.synthesis_engine import SynthesisEngine
+from modules.synthesis_library import load_knowledge_base_file
+
+USER = {"name": "Tester", "email": "tester@example.com"}
+
+
+class TestSectionArtifacts:
+    """Test reuse decisions."""
+
+    def test_reused_while_inputs_match(self):
+        first = SectionArtifacts()
+        first.record("gap", "urgent_gap", "Context", "Synthesized gap")
+
+        second = SectionArtifacts(first.to_dict())
+
+        assert second.reuse("gap", "urgent_gap", "Context") == "Synthesized gap"
+        assert second.reuse("gap", "urgent_gap", "Changed context") is None
+        assert second.reuse("other", "urgent_gap", "Context") is None
+        assert second.reused == 1
+
+    def test_template_fallback_not_recorded(self):
+        artifacts = SectionArtifacts()
+        context = "**Capability:** Billing\n**Description:** Something"
+
+        artifacts.record("gap", "urgent_gap", context, render_template_section("urgent_gap", context))
+        artifacts.record("summary", "executive_summary", "Summary context", "Summary context")
+
+        assert artifacts.to_dict() == {}
+
+
+class TestIncrementalRegeneration:
+    """Test regenerating a report from a previous one's artifacts."""
+
+    @pytest.fixture
+    def requests(self, monkeypatch):
+        requests = []
+
+        def responder(request, output_tokens):
+            requests.append(request)
+            return f"Synthesis {len(requests)}"
+
+        engine = SynthesisEngine(max_in_flight=8)
+        engine.client = FakeAsyncAnthropic(FakeClaude(
+            FakeProfile(ttft_median=0.001, ttft_sigma=0.1, tokens_per_second=100000,
+                        rate_limit_rate=0.0, overload_rate=0.0, seed=1),
+            responder=responder
+        ))
+        monkeypatch.setattr(concurrent_generator, "synthesis_engine", engine)
+        # Take the synthesis cache out of the picture
+        monkeypatch.setattr(synthesis_cache, "enabled", False)
+        return requests
+
+    @pytest.fixture
+    def knowledge_base(self):
+        return load_knowledge_base_file()
+
+    @pytest.fixture
+    def scores(self, knowledge_base):
+        caps = [cap["id"] for phase in knowledge_base["phases"] for cap in phase["capabilities"]]
+        return [{"capability_id": cap_id, "importance": 9, "readiness": 2} for cap_id in caps[:3]]
+
+    def generate(self, scores, knowledge_base, artifacts):
+        return concurrent_generator.generate_report_concurrent(
+            scores, knowledge_base, "Tester", batch_size=1, artifacts=artifacts
+        )
+
+    def test_unchanged_scores_send_no_requests(self, requests, knowledge_base, scores):
+        first = SectionArtifacts()
+        report = self.generate(scores, knowledge_base, first)
+        assert len(requests) == 4
+
+        second = SectionArtifacts(first.to_dict())
+        regenerated = self.generate(scores, knowledge_base, second)
+
+        assert len(requests) == 4
+        assert second.reused == 4
+        assert regenerated.split("*Generated:")[1].split("\n", 1)[1] == report.split("*Generated:")[1].split("\n", 1)[1]
+
+    def test_only_changed_sections_resynthesized(self, requests, knowledge_base, scores):
+        first = SectionArtifacts()
+        self.generate(scores, knowledge_base, first)
+
+        scores[1] = {**scores[1], "readiness": 3}
+        second = SectionArtifacts(first.to_dict())
+        self.generate(scores, knowledge_base, second)
+
+        # The moved gap, plus the executive summary whose metrics changed
+        assert len(requests) == 6
+        assert second.reused == 2
+        sections = second.to_dict()
+        assert set(sections) == {"executive_summary"} | {score["capability_id"] for score in scores}
+        assert sections[scores[0]["capability_id"]] == first.to_dict()[scores[0]["capability_id"]]
+
+
+def test_artifacts_saved_with_assessment():
+    artifacts = SectionArtifacts()
+    artifacts.record("gap", "urgent_gap", "Context", "Synthesized gap")
+
+    assessment_id = save_assessment(USER, {"cap": 1}, "# Report", sections=artifacts.to_dict())
+    loaded = load_assessment(USER["email"], assessment_id)
+
+    assert SectionArtifacts(loaded["sections"]).reuse("gap", "urgent_gap", "Context") == "Synthesized gap"
+    assert "sections" not in load_assessment(USER["email"], save_assessment(USER, {}, "# Report"))
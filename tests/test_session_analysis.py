@@ -0,0 +1,95 @@
+"""
+Test suite for the running per-session score analysis.
+
+Tests:
+- Counts built from a scores dict match a full rescan
+- set() re-analyzes only a changed capability and keeps every count in step
+- Unchanged scores are a no-op; writes go through to the session's scores dict
+- Per-capability categories and per-phase totals
+"""
+
+import random
+
+from modules.score_analyzer import categorize_priority
+from modules.session_analysis import SessionAnalysis
+
+
+def rescan(scores):
+    """The per-rerun loops the running counts replace."""
+    scored = {cap_id: data for cap_id, data in scores.items()
+              if data["importance"] > 0 and data["readiness"] > 0}
+    categories = {}
+    phase_urgent = {}
+    for data in scored.values():
+        category = categorize_priority(data["importance"], data["readiness"])
+        categories[category] = categories.get(category, 0) + 1
+        if category == "URGENT_GAP":
+            phase_urgent[data["phase_id"]] = phase_urgent.get(data["phase_id"], 0) + 1
+    return len(scored), categories, phase_urgent
+
+
+def assert_matches_rescan(analysis):
+    scored, categories, phase_urgent = rescan(analysis.scores)
+    assert analysis.scored == scored
+    assert analysis.unscored == len(analysis.scores) - scored
+    assert +analysis.categories == categories
+    assert +analysis.phase_urgent == phase_urgent
+
+
+def random_scores(rng, count=42):
+    return {
+        f"cap_{i}": {"importance": rng.randint(0, 10), "readiness": rng.randint(0, 10), "phase_id": f"phase_{i % 8}"}
+        for i in range(count)
+    }
+
+
+class TestSessionAnalysis:
+    """Test incremental maintenance."""
+
+    def test_build_matches_rescan(self):
+        analysis = SessionAnalysis(random_scores(random.Random(1)))
+
+        assert analysis.total == 42
+        assert_matches_rescan(analysis)
+
+    def test_random_edits_stay_consistent(self):
+        rng = random.Random(2)
+        analysis = SessionAnalysis(random_scores(rng))
+
+        for _ in range(500):
+            cap_id = f"cap_{rng.randrange(42)}"
+            analysis.set(cap_id, rng.randint(0, 10), rng.randint(0, 10), analysis.scores[cap_id]["phase_id"])
+
+        assert_matches_rescan(analysis)
+
+    def test_set_writes_through_and_skips_unchanged(self):
+        scores = {"a": {"importance": 9, "readiness": 2, "phase_id": "p1"}}
+        analysis = SessionAnalysis(scores)
+        before = analysis.states["a"]
+
+        assert analysis.set("a", 9, 2, "p1") is False
+        assert analysis.states["a"] is before
+
+        assert analysis.set("a", 9, 8, "p1") is True
+        assert scores["a"] == {"importance": 9, "readiness": 8, "phase_id": "p1"}
+        assert analysis.urgent == 0 and analysis.categories["STRENGTH"] == 1
+
+        assert analysis.set("b", 0, 3, "p2") is True
+        assert scores["b"]["phase_id"] == "p2"
+        assert analysis.unscored == 1
+
+    def test_category_and_phase_totals(self):
+        analysis = SessionAnalysis({
+            "a": {"importance": 8, "readiness": 5, "phase_id": "p1"},
+            "b": {"importance": 0, "readiness": 0, "phase_id": "p2"},
+        })
+
+        assert analysis.category("a") == "CRITICAL_GAP"
+        assert analysis.category("b") is None
+        assert analysis.category("missing") is None
+        # Unscored capabilities still put their phase in the sidebar
+        assert analysis.phase_total == {"p1": 1, "p2": 1}
+        assert analysis.phase_scored["p2"] == 0
+
+        analysis.set("b", 0, 0, "p1")
+        assert analysis.phase_total == {"p1": 2, "p2": 0}
@@ -0,0 +1,222 @@
+"""
+Test suite for single-flight coalescing of identical synthesis requests.
+
+Tests:
+- Concurrent callers with the same key share one execution (sync and async)
+- Different keys run independently; errors are shared with waiters
+- A cancelled or timed-out leader hands the work back to its waiters
+- A report's own deadline or failure never becomes another report's template
+- Waiters honour their own timeout
+- Identical sections across reports send one API request
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+import pytest
+
+from modules.report_generator import synthesize_with_claude, VALID_AGENTS
+from modules.single_flight import SingleFlight
+from modules.synthesis_engine import SynthesisEngine
+from modules.usage_tracker import ReportUsage
+
+
+class CountingWork:
+    def __init__(self, delay=0.1, result="Result"):
+        self.delay = delay
+        self.result = result
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return self.result
+
+    async def run_async(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.result
+
+
+class TestSyncFlights:
+    """Test coalescing across threads."""
+
+    def test_identical_calls_share_one_execution(self):
+        flights = SingleFlight()
+        work = CountingWork()
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            outcomes = list(pool.map(lambda _: flights.do("key", work), range(5)))
+
+        assert work.calls == 1
+        assert all(result == "Result" for result, _ in outcomes)
+        assert sorted(shared for _, shared in outcomes) == [False, True, True, True, True]
+        assert flights.in_flight() == 0
+
+    def test_different_keys_run_separately(self):
+        flights = SingleFlight()
+        work = CountingWork(delay=0.05)
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            list(pool.map(lambda key: flights.do(key, work), ["a", "b", "c"]))
+
+        assert work.calls == 3
+
+    def test_error_shared_with_waiters(self):
+        flights = SingleFlight()
+
+        def fail():
+            time.sleep(0.1)
+            raise ValueError("boom")
+
+        def call(_):
+            try:
+                flights.do("key", fail)
+            except ValueError as e:
+                return str(e)
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            assert list(pool.map(call, range(3))) == ["boom"] * 3
+
+    def test_completed_flights_are_not_reused(self):
+        flights = SingleFlight()
+        work = CountingWork(delay=0)
+
+        flights.do("key", work)
+        flights.do("key", work)
+
+        assert work.calls == 2
+
+
+class TestAsyncFlights:
+    """Test coalescing on the event loop."""
+
+    def test_identical_calls_share_one_execution(self):
+        flights = SingleFlight()
+        work = CountingWork()
+
+        async def scenario():
+            return await asyncio.gather(*(flights.do_async("key", work.run_async) for _ in range(5)))
+
+        outcomes = asyncio.run(scenario())
+        assert work.calls == 1
+        assert [shared for _, shared in outcomes].count(True) == 4
+
+    def test_cancelled_leader_hands_work_to_waiter(self):
+        flights = SingleFlight()
+        work = CountingWork(delay=0.1)
+
+        async def scenario():
+            leader = asyncio.ensure_future(flights.do_async("key", work.run_async))
+            await asyncio.sleep(0.01)
+            waiter = asyncio.ensure_future(flights.do_async("key", work.run_async))
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            return await waiter
+
+        assert asyncio.run(scenario()) == ("Result", False)
+        assert work.calls == 2
+
+    def test_timed_out_leader_hands_work_to_waiter(self):
+        flights = SingleFlight()
+        work = CountingWork(delay=0.1)
+
+        async def scenario():
+            leader = asyncio.ensure_future(
+                flights.do_async("key", lambda: asyncio.wait_for(work.run_async(), 0.03))
+            )
+            await asyncio.sleep(0.01)
+            waiter = await flights.do_async("key", work.run_async)
+            with pytest.raises(asyncio.TimeoutError):
+                await leader
+            return waiter
+
+        assert asyncio.run(scenario()) == ("Result", False)
+        assert work.calls == 2
+
+    def test_waiter_timeout_leaves_leader_running(self):
+        flights = SingleFlight()
+        work = CountingWork(delay=0.3)
+
+        async def scenario():
+            leader = asyncio.ensure_future(flights.do_async("key", work.run_async))
+            await asyncio.sleep(0.01)
+            with pytest.raises(asyncio.TimeoutError):
+                await flights.do_async("key", work.run_async, timeout=0.05)
+            return await leader
+
+        assert asyncio.run(scenario()) == ("Result", False)
+
+
+class SlowMessages:
+    """Async client.messages answering every call after a delay."""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        response = Mock()
+        response.content = [Mock(text="Shared synthesis")]
+        return response
+
+
+class TestCoalescedSynthesis:
+    """Test identical sections across concurrent reports."""
+
+    def test_engine_sends_one_request(self):
+        messages = SlowMessages()
+        engine = SynthesisEngine(max_in_flight=8)
+        engine.client = Mock(messages=messages)
+        usages = [ReportUsage(), ReportUsage()]
+
+        def report(report_usage):
+            return engine.synthesize_many(
+                {"gap": ("urgent_gap", "Same context")}, VALID_AGENTS, report_usage=report_usage
+            )
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(report, usages))
+
+        assert messages.calls == 1
+        assert results[0] == results[1] == {"gap": "Shared synthesis"}
+        assert sum(usage.summary()["coalesced"] for usage in usages) == 1
+
+    @patch('modules.report_generator.client')
+    def test_threads_send_one_request(self, mock_client):
+        def create(**kwargs):
+            time.sleep(0.2)
+            response = Mock()
+            response.content = [Mock(text="Shared synthesis")]
+            return response
+
+        mock_client.messages.create.side_effect = create
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(
+                lambda _: synthesize_with_claude("urgent_gap", "Same context", VALID_AGENTS), range(4)
+            ))
+
+        assert mock_client.messages.create.call_count == 1
+        assert results == ["Shared synthesis"] * 4
+
+    def test_leader_deadline_not_shared(self):
+        messages = SlowMessages(delay=0.3)
+        engine = SynthesisEngine(max_in_flight=8)
+        engine.client = Mock(messages=messages)
+        context = "Same context"
+
+        hurried = engine.submit(engine.synthesize("urgent_gap", context, VALID_AGENTS, deadline=time.time() + 0.1))
+        time.sleep(0.02)
+        patient = engine.submit(engine.synthesize("urgent_gap", context, VALID_AGENTS))
+
+        assert hurried.result(timeout=5) == context
+        assert patient.result(timeout=5) == "Shared synthesis"
+        assert messages.calls == 2
@@ -0,0 +1,146 @@
+"""
+Test suite for the persistent synthesis response cache.
+
+Tests:
+- Key stability
+- Hit/miss behaviour and counters
+- Lookups batch index metadata instead of rewriting it
+- TTL expiry
+- Size-bounded, cost-weighted eviction
+- Integration with synthesize_with_claude
+"""
+
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from modules.synthesis_cache import SynthesisCache, make_cache_key
+from modules.report_generator import synthesize_with_claude, VALID_AGENTS
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SynthesisCache(str(tmp_path / "cache"), max_bytes=10_000, ttl_seconds=3600)
+
+
+class TestCacheKeys:
+    """Test content-addressed key generation."""
+
+    def test_same_inputs_same_key(self):
+        a = make_cache_key("urgent_gap", "ctx", ["Agent"], "model", 100)
+        b = make_cache_key("urgent_gap", "ctx", ["Agent"], "model", 100)
+        assert a == b
+
+    def test_any_input_changes_key(self):
+        base = make_cache_key("urgent_gap", "ctx", ["Agent"], "model", 100)
+        assert base != make_cache_key("strength", "ctx", ["Agent"], "model", 100)
+        assert base != make_cache_key("urgent_gap", "ctx2", ["Agent"], "model", 100)
+        assert base != make_cache_key("urgent_gap", "ctx", ["Other"], "model", 100)
+        assert base != make_cache_key("urgent_gap", "ctx", ["Agent"], "model-2", 100)
+        assert base != make_cache_key("urgent_gap", "ctx", ["Agent"], "model", 200)
+
+
+class TestSynthesisCache:
+    """Test cache storage, expiry and eviction."""
+
+    def test_miss_then_hit(self, cache):
+        assert cache.get("k1") is None
+        cache.put("k1", "cached text", section_type="urgent_gap", input_tokens=100, output_tokens=50)
+        assert cache.get("k1") == "cached text"
+
+        stats = cache.stats()
+        assert stats["process"]["hits"] == 1
+        assert stats["process"]["misses"] == 1
+        assert stats["totals"]["hits"] == 1
+        assert stats["entries"] == 1
+
+    def test_lookups_do_not_rewrite_index(self, cache):
+        cache.put("k1", "cached text")
+        written = cache.index_file.stat().st_mtime_ns
+        time.sleep(0.01)
+
+        for _ in range(3):
+            assert cache.get("k1") == "cached text"
+        assert cache.get("k2") is None
+
+        assert cache.index_file.stat().st_mtime_ns == written
+        assert cache.stats()["totals"]["hits"] == 3
+
+        cache.flush()
+        index = cache._load_index()
+        assert (index["totals"]["hits"], index["totals"]["misses"]) == (3, 1)
+        assert index["entries"]["k1"]["hits"] == 4
+
+    def test_put_merges_pending_lookups(self, cache):
+        cache.put("k1", "cached text")
+        cache.get("k1")
+        cache.put("k2", "other text")
+
+        assert cache._load_index()["entries"]["k1"]["hits"] == 2
+
+    def test_flushes_after_enough_lookups(self, cache):
+        cache.flush_every = 2
+        cache.get("k1")
+        cache.get("k2")
+
+        deadline = time.time() + 2
+        while cache._load_index()["totals"].get("misses") != 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert cache._load_index()["totals"]["misses"] == 2
+
+    def test_persists_across_instances(self, cache):
+        cache.put("k1", "cached text")
+        reopened = SynthesisCache(str(cache.cache_dir), max_bytes=10_000, ttl_seconds=3600)
+        assert reopened.get("k1") == "cached text"
+
+    def test_ttl_expiry(self, cache):
+        cache.put("k1", "old text")
+        cache.ttl_seconds = 0
+        time.sleep(0.01)
+        assert cache.get("k1") is None
+        assert cache.stats()["process"]["expirations"] == 1
+
+    def test_evicts_cheapest_entries_first(self, cache):
+        cache.max_bytes = 1_000
+        cache.put("cheap", "x" * 300, input_tokens=1, output_tokens=1)
+        cache.put("expensive", "y" * 300, input_tokens=5000, output_tokens=2000)
+        cache.put("newest", "z" * 300, input_tokens=5000, output_tokens=2000)
+
+        assert cache.get("cheap") is None
+        assert cache.get("expensive") == "y" * 300
+        assert cache.get("newest") == "z" * 300
+        assert cache.stats()["total_bytes"] <= cache.max_bytes
+
+    def test_disabled_cache_is_noop(self, cache):
+        cache.enabled = False
+        cache.put("k1", "text")
+        assert cache.get("k1") is None
+
+
+class TestSynthesisUsesCache:
+    """Test that synthesize_with_claude serves repeated prompts from cache."""
+
+    @patch('modules.report_generator.client')
+    def test_repeated_prompt_skips_api(self, mock_client):
+        mock_response = Mock()
+        mock_response.content = [Mock(text="Synthesized once")]
+        mock_client.messages.create.return_value = mock_response
+
+        first = synthesize_with_claude("urgent_gap", "Repeated context", VALID_AGENTS)
+        second = synthesize_with_claude("urgent_gap", "Repeated context", VALID_AGENTS)
+
+        assert first == second == "Synthesized once"
+        assert mock_client.messages.create.call_count == 1
+
+    @patch('modules.report_generator.client')
+    def test_fallbacks_are_not_cached(self, mock_client):
+        mock_client.messages.create.side_effect = Exception("API Error")
+        assert synthesize_with_claude("urgent_gap", "Fallback", VALID_AGENTS) == "Fallback"
+
+        mock_response = Mock()
+        mock_response.content = [Mock(text="Recovered")]
+        mock_client.messages.create.side_effect = None
+        mock_client.messages.create.return_value = mock_response
+
+        assert synthesize_with_claude("urgent_gap", "Fallback", VALID_AGENTS) == "Recovered"
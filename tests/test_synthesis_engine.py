@@ -0,0 +1,141 @@
+"""
+Test suite for the asyncio synthesis engine.
+
+Tests:
+- Sync facade returns per-key results
+- In-flight requests are bounded by the semaphore
+- Calls wait on the rate limiter before taking a concurrency slot
+- API failures fall back to raw context
+- Streamed sections report partial text in the calling thread
+"""
+
+import asyncio
+import threading
+from unittest.mock import Mock
+
+from modules.rate_limiter import claude_rate_limiter
+from modules.report_generator import VALID_AGENTS, message_text
+from modules.synthesis_engine import SynthesisEngine
+
+
+class FakeMessages:
+    """Async stand-in for client.messages that tracks concurrency."""
+
+    def __init__(self, delay=0.05, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail:
+                raise Exception("API Error")
+            response = Mock()
+            response.content = [Mock(text=f"Synthesized: {message_text(kwargs['messages'])[-20:]}")]
+            return response
+        finally:
+            self.in_flight -= 1
+
+    def stream(self, **kwargs):
+        return FakeStream(["Why ", "this ", "matters."], self.delay)
+
+
+class FakeStream:
+    """Async context manager mimicking client.messages.stream."""
+
+    def __init__(self, chunks, delay):
+        self.chunks = chunks
+        self.delay = delay
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    async def text_stream(self):
+        for chunk in self.chunks:
+            await asyncio.sleep(self.delay / len(self.chunks))
+            yield chunk
+
+    async def get_final_message(self):
+        response = Mock()
+        response.content = [Mock(text="".join(self.chunks))]
+        return response
+
+
+def make_engine(messages, max_in_flight=4):
+    engine = SynthesisEngine(max_in_flight=max_in_flight)
+    engine.client = Mock(messages=messages)
+    return engine
+
+
+class TestSynthesisEngine:
+    """Test the async engine and its sync facade."""
+
+    def test_synthesize_many_returns_all_keys(self):
+        messages = FakeMessages()
+        engine = make_engine(messages)
+
+        tasks = {f"gap_{i}": ("urgent_gap", f"Context {i}") for i in range(5)}
+        results = engine.synthesize_many(tasks, VALID_AGENTS)
+
+        assert set(results) == set(tasks)
+        assert all(text.startswith("Synthesized") for text in results.values())
+        assert messages.calls == 5
+
+    def test_in_flight_requests_are_bounded(self):
+        messages = FakeMessages(delay=0.05)
+        engine = make_engine(messages, max_in_flight=2)
+
+        tasks = {f"gap_{i}": ("urgent_gap", f"Context {i}") for i in range(8)}
+        engine.synthesize_many(tasks, VALID_AGENTS)
+
+        assert messages.peak_in_flight == 2
+
+    def test_rate_limit_wait_holds_no_slot(self, monkeypatch):
+        engine = make_engine(FakeMessages(), max_in_flight=1)
+        acquire_async = claude_rate_limiter.acquire_async
+        in_flight_while_waiting = []
+
+        async def observed(*args):
+            in_flight_while_waiting.append(engine.concurrency.in_flight)
+            return await acquire_async(*args)
+
+        monkeypatch.setattr(claude_rate_limiter, "acquire_async", observed)
+        engine.synthesize_many({"gap": ("urgent_gap", "Context")}, VALID_AGENTS)
+
+        assert in_flight_while_waiting == [0]
+        assert engine.concurrency.in_flight == 0
+
+    def test_api_failure_falls_back_to_context(self):
+        engine = make_engine(FakeMessages(fail=True))
+
+        results = engine.synthesize_many({"gap": ("urgent_gap", "Raw context")}, VALID_AGENTS)
+
+        assert results["gap"] == "Raw context"
+
+    def test_streaming_updates_arrive_in_calling_thread(self):
+        engine = make_engine(FakeMessages(delay=0.6))
+        caller = threading.get_ident()
+        updates = []
+
+        def on_update(key, text, done):
+            updates.append((key, text, done, threading.get_ident()))
+
+        results = engine.synthesize_many(
+            {"gap": ("urgent_gap", "Streamed context")}, VALID_AGENTS, on_update=on_update
+        )
+
+        assert results["gap"] == "Why this matters."
+        assert all(thread == caller for *_, thread in updates)
+        assert updates[-1][:3] == ("gap", "Why this matters.", True)
+        # At least one partial update was delivered before completion
+        assert any(not done for _, _, done, _ in updates)
@@ -0,0 +1,123 @@
+"""
+Test suite for the precomputed synthesis library.
+
+Tests:
+- Score bands follow the configured thresholds
+- Building writes one entry per capability x section
+- Lookups only serve scores inside the built band
+- Stale artifacts are ignored
+- Report generation skips the API for library hits
+"""
+
+import json
+from unittest.mock import Mock
+
+import pytest
+
+import config
+from modules import concurrent_generator
+from modules import synthesis_engine as engine_module
+from modules.synthesis_engine import SynthesisEngine
+from modules.synthesis_library import (
+    SynthesisLibrary,
+    band_ranges,
+    build_library,
+    format_band_context,
+    iter_library_capabilities,
+    load_knowledge_base_file
+)
+
+
+class FakeMessages:
+    def __init__(self):
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        response = Mock()
+        response.content = [Mock(text=f"Library synthesis {self.calls}")]
+        return response
+
+
+@pytest.fixture
+def fake_engine(monkeypatch):
+    messages = FakeMessages()
+    engine = SynthesisEngine(max_in_flight=8)
+    engine.client = Mock(messages=messages)
+    monkeypatch.setattr(engine_module, "synthesis_engine", engine)
+    monkeypatch.setattr(concurrent_generator, "synthesis_engine", engine)
+    return messages
+
+
+@pytest.fixture
+def knowledge_base():
+    return load_knowledge_base_file()
+
+
+class TestBands:
+    """Test score band derivation."""
+
+    def test_urgent_band_matches_thresholds(self):
+        importances, readinesses = band_ranges("URGENT_GAP")
+        assert importances == range(config.IMPORTANCE_HIGH_THRESHOLD, 11)
+        assert readinesses == range(1, config.READINESS_LOW_THRESHOLD + 1)
+
+    def test_band_context_uses_ranges(self, knowledge_base):
+        cap, phase = next(iter_library_capabilities(knowledge_base))
+        context = format_band_context("urgent_gap", cap, phase)
+        assert "Importance=7-10" in context
+        assert "Readiness=1-4" in context
+        assert cap["name"] in context
+
+
+class TestBuildAndLookup:
+    """Test building the artifact and serving from it."""
+
+    def test_build_and_lookup(self, tmp_path, fake_engine, knowledge_base):
+        path = tmp_path / "library.json"
+        artifact = build_library(str(path), ["urgent_gap"], knowledge_base)
+
+        capability_ids = [cap["id"] for cap, _ in iter_library_capabilities(knowledge_base)]
+        assert len(artifact["entries"]) == len(capability_ids)
+
+        library = SynthesisLibrary(str(path))
+        cap_id = capability_ids[0]
+        assert library.lookup("urgent_gap", cap_id, 9, 2).startswith("Library synthesis")
+        # Outside the urgent band, or a section that was not built
+        assert library.lookup("urgent_gap", cap_id, 9, 6) is None
+        assert library.lookup("strength", cap_id, 9, 9) is None
+
+    def test_rebuild_only_fills_missing_entries(self, tmp_path, fake_engine, knowledge_base):
+        path = tmp_path / "library.json"
+        build_library(str(path), ["urgent_gap"], knowledge_base)
+        calls_after_first = fake_engine.calls
+
+        build_library(str(path), ["urgent_gap"], knowledge_base)
+        assert fake_engine.calls == calls_after_first
+
+    def test_stale_artifact_is_ignored(self, tmp_path, fake_engine, knowledge_base):
+        path = tmp_path / "library.json"
+        build_library(str(path), ["urgent_gap"], knowledge_base)
+
+        artifact = json.loads(path.read_text())
+        artifact["fingerprint"] = "outdated"
+        path.write_text(json.dumps(artifact))
+
+        library = SynthesisLibrary(str(path))
+        cap_id = next(iter_library_capabilities(knowledge_base))[0]["id"]
+        assert library.lookup("urgent_gap", cap_id, 9, 2) is None
+
+
+def test_report_uses_library_for_gaps(fake_engine, knowledge_base):
+    from modules.synthesis_library import synthesis_library
+
+    build_library(str(synthesis_library.path), ["urgent_gap"], knowledge_base)
+    calls_after_build = fake_engine.calls
+
+    cap, phase = next(iter_library_capabilities(knowledge_base))
+    scores = [{"capability_id": cap["id"], "phase_id": phase["id"], "importance": 9, "readiness": 2}]
+    report = concurrent_generator.generate_report_concurrent(scores, knowledge_base, "Tester")
+
+    # Only the executive summary needed Claude
+    assert fake_engine.calls == calls_after_build + 1
+    assert "Library synthesis" in report
@@ -0,0 +1,164 @@
+"""
+Test suite for the section-aware output token budget.
+
+Tests:
+- Per-section max_tokens start from defaults and follow observed lengths
+- Plans fit MAX_REPORT_LENGTH by scaling, then by dropping low-priority sections
+- Synthesis calls and rate-limit reservations use the planned max_tokens
+- Truncated answers are not cached; complete ones serve any budget
+- Reports list gaps that did not fit the budget
+"""
+
+from unittest.mock import Mock, patch
+
+import pytest
+
+from modules import concurrent_generator
+from modules.fake_claude import FakeAsyncAnthropic, FakeClaude, FakeProfile
+from modules.report_generator import synthesize_with_claude, VALID_AGENTS
+from modules.synthesis_engine import SynthesisEngine
+from modules.synthesis_library import load_knowledge_base_file
+from modules.token_budget import DEFAULT_SECTION_TOKENS, TokenBudgetPlanner, token_planner
+
+
+@pytest.fixture
+def planner():
+    return TokenBudgetPlanner(
+        report_budget=3000, min_section_tokens=200, max_section_tokens=2000,
+        percentile=0.9, headroom=1.25, min_samples=5
+    )
+
+
+def make_response(text="Result", output_tokens=300, stop_reason="end_turn"):
+    response = Mock()
+    response.content = [Mock(text=text)]
+    response.stop_reason = stop_reason
+    response.usage = Mock(input_tokens=100, output_tokens=output_tokens,
+                          cache_creation_input_tokens=0, cache_read_input_tokens=0)
+    return response
+
+
+class TestSectionNeeds:
+    """Test per-section max_tokens estimates."""
+
+    def test_defaults_before_samples(self, planner):
+        assert planner.section_need("urgent_gap") == DEFAULT_SECTION_TOKENS["urgent_gap"]
+        assert planner.section_need("unknown_section") == 2000
+
+    def test_learned_from_observed_lengths(self, planner):
+        for _ in range(10):
+            planner.record("strength", 400)
+        assert planner.section_need("strength") == 500
+
+    def test_clamped_to_floor_and_ceiling(self, planner):
+        for _ in range(10):
+            planner.record("strength", 50)
+            planner.record("urgent_gap", 5000)
+        assert planner.section_need("strength") == 200
+        assert planner.section_need("urgent_gap") == 2000
+
+
+class TestPlan:
+    """Test splitting the report budget."""
+
+    def test_fits_without_scaling(self, planner):
+        plan = planner.plan([("executive_summary", "executive_summary"), ("gap_a", "urgent_gap")])
+        assert plan == {"executive_summary": 700, "gap_a": 600}
+
+    def test_scaled_to_budget(self, planner):
+        sections = [("executive_summary", "executive_summary")] + [(f"gap_{i}", "urgent_gap") for i in range(6)]
+
+        plan = planner.plan(sections)
+
+        assert len(plan) == 7
+        assert sum(plan.values()) <= 3000
+        assert min(plan.values()) >= 200
+        assert plan["executive_summary"] > plan["gap_0"]
+
+    def test_lowest_priority_dropped(self, planner):
+        sections = [("executive_summary", "executive_summary")] + [(f"gap_{i}", "urgent_gap") for i in range(20)]
+
+        plan = planner.plan(sections)
+
+        assert list(plan) == ["executive_summary"] + [f"gap_{i}" for i in range(14)]
+        assert sum(plan.values()) <= 3000
+
+    def test_reserved_tokens_reduce_budget(self, planner):
+        sections = [(f"gap_{i}", "urgent_gap") for i in range(5)]
+        assert len(planner.plan(sections, reserved=2400)) == 3
+
+    def test_first_section_never_dropped(self, planner):
+        plan = planner.plan([("executive_summary", "executive_summary")], reserved=5000)
+        assert plan == {"executive_summary": 200}
+
+
+class TestPlannedCalls:
+    """Test max_tokens reaching the API."""
+
+    @patch('modules.report_generator.claude_rate_limiter')
+    @patch('modules.report_generator.client')
+    def test_planned_max_tokens_used(self, mock_client, mock_limiter):
+        mock_client.messages.create.return_value = make_response()
+
+        synthesize_with_claude("strength", "Context", VALID_AGENTS, max_tokens=321)
+
+        assert mock_client.messages.create.call_args[1]["max_tokens"] == 321
+        assert mock_limiter.acquire.call_args[0][1] == 321
+
+    @patch('modules.report_generator.client')
+    def test_default_comes_from_planner(self, mock_client):
+        mock_client.messages.create.return_value = make_response(output_tokens=300)
+
+        synthesize_with_claude("strength", "Context", VALID_AGENTS)
+
+        assert mock_client.messages.create.call_args[1]["max_tokens"] == token_planner.section_need("strength")
+        assert token_planner.observed.snapshot()["strength"]["samples"] == 1
+
+    @patch('modules.report_generator.client')
+    def test_truncated_answer_not_cached(self, mock_client):
+        mock_client.messages.create.return_value = make_response(stop_reason="max_tokens")
+
+        synthesize_with_claude("strength", "Context", VALID_AGENTS)
+        synthesize_with_claude("strength", "Context", VALID_AGENTS)
+
+        assert mock_client.messages.create.call_count == 2
+
+    @patch('modules.report_generator.client')
+    def test_cache_shared_across_budgets(self, mock_client):
+        mock_client.messages.create.return_value = make_response()
+
+        synthesize_with_claude("strength", "Context", VALID_AGENTS, max_tokens=400)
+        synthesize_with_claude("strength", "Context", VALID_AGENTS, max_tokens=200)
+
+        # A complete answer serves any budget; the planned budget keeps moving
+        assert mock_client.messages.create.call_count == 1
+
+def test_report_lists_gaps_over_budget(monkeypatch):
+    requests = []
+
+    def responder(request, output_tokens):
+        requests.append(request["max_tokens"])
+        return "Synthesized section"
+
+    engine = SynthesisEngine(max_in_flight=8)
+    engine.client = FakeAsyncAnthropic(FakeClaude(
+        FakeProfile(ttft_median=0.001, ttft_sigma=0.1, tokens_per_second=100000,
+                    rate_limit_rate=0.0, overload_rate=0.0, seed=1),
+        responder=responder
+    ))
+    monkeypatch.setattr(concurrent_generator, "synthesis_engine", engine)
+    monkeypatch.setattr(token_planner, "report_budget", 1000)
+    monkeypatch.setattr(token_planner, "min_section_tokens", 250)
+
+    knowledge_base = load_knowledge_base_file()
+    scores = [
+        {"capability_id": cap["id"], "phase_id": phase["id"], "importance": 9, "readiness": 2}
+        for phase in knowledge_base["phases"] for cap in phase["capabilities"]
+    ][:6]
+
+    report = concurrent_generator.generate_report_concurrent(scores, knowledge_base, "Tester")
+
+    assert len(requests) == 4
+    assert sum(requests) <= 1000
+    assert "3 highest-priority gaps are detailed above" in report
+    assert "3 more also need attention" in report
@@ -0,0 +1,116 @@
+"""
+Test suite for per-call, per-report and per-user-day usage accounting.
+
+Tests:
+- Cost is estimated from all four token counters
+- Each call's tokens, latency and cost land in the report's usage
+- Cached syntheses count as cache hits, not calls
+- save_assessment stores usage next to the scores and rolls it up per user per day
+"""
+
+import json
+from datetime import date
+from unittest.mock import patch
+
+from modules.report_generator import synthesize_with_claude, VALID_AGENTS
+from modules.storage import get_user_storage_path, load_assessment, save_assessment
+from modules.usage_tracker import ReportUsage, estimate_cost, usage_tracker
+from tests.test_prompt_caching import make_response
+
+
+USER = {"name": "Test User", "email": "test@example.com"}
+
+
+class TestCostEstimate:
+    """Test per-MTok cost estimates."""
+
+    def test_all_counters_priced(self, monkeypatch):
+        monkeypatch.setattr("config.CLAUDE_PRICE_INPUT_PER_MTOK", 3.0)
+        monkeypatch.setattr("config.CLAUDE_PRICE_OUTPUT_PER_MTOK", 15.0)
+        monkeypatch.setattr("config.CLAUDE_PRICE_CACHE_WRITE_PER_MTOK", 3.75)
+        monkeypatch.setattr("config.CLAUDE_PRICE_CACHE_READ_PER_MTOK", 0.30)
+
+        cost = estimate_cost({
+            "input_tokens": 1_000_000,
+            "output_tokens": 1_000_000,
+            "cache_creation_input_tokens": 1_000_000,
+            "cache_read_input_tokens": 1_000_000,
+        })
+
+        assert abs(cost - 22.05) < 1e-9
+
+
+class TestReportUsage:
+    """Test usage collected across one report's calls."""
+
+    @patch('modules.report_generator.client')
+    def test_calls_recorded_with_latency(self, mock_client):
+        mock_client.messages.create.return_value = make_response(
+            input_tokens=100, output_tokens=300, cache_read_input_tokens=900
+        )
+        report_usage = ReportUsage()
+
+        synthesize_with_claude("urgent_gap", "Context A", VALID_AGENTS, report_usage=report_usage)
+        synthesize_with_claude("executive_summary", "Context B", VALID_AGENTS, report_usage=report_usage)
+
+        summary = report_usage.summary()
+        assert summary["requests"] == 2
+        assert summary["totals"]["output_tokens"] == 600
+        assert summary["totals"]["cost_usd"] > 0
+        assert summary["by_section"]["urgent_gap"]["cache_read_input_tokens"] == 900
+        assert all(call["latency_seconds"] >= 0 for call in summary["calls"])
+
+        totals = usage_tracker.stats()["totals"]
+        assert totals["cost_usd"] == summary["totals"]["cost_usd"]
+
+    @patch('modules.report_generator.client')
+    def test_cached_synthesis_counts_as_hit(self, mock_client):
+        mock_client.messages.create.return_value = make_response(input_tokens=100, output_tokens=300)
+        report_usage = ReportUsage()
+
+        synthesize_with_claude("urgent_gap", "Same context", VALID_AGENTS, report_usage=report_usage)
+        synthesize_with_claude("urgent_gap", "Same context", VALID_AGENTS, report_usage=report_usage)
+
+        summary = report_usage.summary()
+        assert summary["requests"] == 1
+        assert summary["cache_hits"] == 1
+
+
+class TestStoredUsage:
+    """Test usage saved with the assessment."""
+
+    def make_summary(self):
+        report_usage = ReportUsage()
+        report_usage.add("urgent_gap", {
+            "input_tokens": 100, "output_tokens": 200,
+            "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0
+        }, 2.5, 0.01)
+        return report_usage.summary()
+
+    def test_usage_saved_next_to_scores(self):
+        assessment_id = save_assessment(USER, {"cap": 1}, "# Report", usage=self.make_summary())
+
+        usage_file = get_user_storage_path(USER["email"]) / f"usage_{assessment_id}.json"
+        saved = json.loads(usage_file.read_text())
+        assert saved["assessment_id"] == assessment_id
+        assert saved["totals"]["output_tokens"] == 200
+        assert load_assessment(USER["email"], assessment_id)["usage"]["requests"] == 1
+
+    def test_without_usage_no_file(self):
+        assessment_id = save_assessment(USER, {"cap": 1}, "# Report")
+
+        assert not (get_user_storage_path(USER["email"]) / f"usage_{assessment_id}.json").exists()
+        assert usage_tracker.daily() == []
+
+    def test_daily_rollup_per_user(self):
+        save_assessment(USER, {"cap": 1}, "# Report", usage=self.make_summary())
+        save_assessment(USER, {"cap": 2}, "# Report", usage=self.make_summary())
+        save_assessment({"name": "Other", "email": "other@example.com"}, {}, "# Report",
+                        usage=self.make_summary())
+
+        rows = {row["email"]: row for row in usage_tracker.daily(days=1)}
+        assert rows["test@example.com"]["reports"] == 2
+        assert rows["test@example.com"]["output_tokens"] == 400
+        assert abs(rows["test@example.com"]["cost_usd"] - 0.02) < 1e-9
+        assert rows["test@example.com"]["date"] == date.today().isoformat()
+        assert rows["other@example.com"]["reports"] == 1